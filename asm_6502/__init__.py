@@ -1,4 +1,19 @@
+__version__ = '0.1.1'
+
 from .grammar import *
+from .cache import *
+from .include import *
+from .table import *
+from .source_map import *
+from .symbols import *
+from .opcodes import *
+from .listing import *
+from .pages import *
 from .assemble import *
-
-__version__ = '0.1.1'
+from .disassemble import *
+from .batch import *
+from .incremental import *
+from .link import *
+from .section import *
+from .output import *
+from .patch import *
@@ -1,7 +1,18 @@
-from typing import Union, List, Iterable
+import os
+import mmap
+from typing import Union, List, Iterable, Optional
 from functools import wraps
+from collections import namedtuple
+from contextlib import contextmanager
 
-from .grammar import get_parser, Integer, Addressing, Arithmetic, Instruction
+from .grammar import parse_source, Integer, Addressing, Arithmetic, Instruction
+from .include import IncludeCache
+from .table import evaluate_table
+from .source_map import SourceMap
+from .symbols import SymbolIndex
+from .listing import Listing
+from .pages import PageCrossing, find_page_crossings
+from .opcodes import ENCODINGS
 
 
 __all__ = ['Assembler', 'AssembleError']
@@ -20,197 +31,179 @@ class AssembleError(Exception):
         return f'AssembleError("{self.info}")'
 
 
-CODE_MAP_IMPLIED = {
-    'CLC': 0x18, 'CLD': 0xD8, 'CLI': 0x58, 'CLV': 0xB8, 'DEX': 0xCA,
-    'DEY': 0x88, 'INX': 0xE8, 'INY': 0xC8, 'PHA': 0x48, 'PHP': 0x08,
-    'PLA': 0x68, 'PLP': 0x28, 'RTI': 0x40, 'RTS': 0x60, 'SEC': 0x38,
-    'SED': 0xF8, 'SEI': 0x78, 'TAX': 0xAA, 'TAY': 0xA8, 'TSX': 0xBA,
-    'TXA': 0x8A, 'TXS': 0x9A, 'TYA': 0x98, 'JAM': 0x02,
-}
-
-CODE_MAP_RELATIVE = {
-    'BCC': 0x90, 'BCS': 0xB0, 'BEQ': 0xF0, 'BMI': 0x30, 'BNE': 0xD0,
-    'BPL': 0x10, 'BVC': 0x50, 'BVS': 0x70,
-}
-
-CODE_MAP_IMMEDIATE = {
-    'ANC': 0x0B, 'ARR': 0x6B, 'ASR': 0x4B, 'SBX': 0xCB, 'XAA': 0x8B,
-}
-
-CODE_MAP_ABSOLUTE_Y = {
-    'LAS': 0xBB, 'SHS': 0x9B, 'SHX': 0x9E,
-}
-
-CODE_MAPS_LOAD_A = {
-    'ADC': {
-        Addressing.IMMEDIATE: 0x69,
-        Addressing.ZERO_PAGE: 0x65,
-        Addressing.ZERO_PAGE_X: 0x75,
-        Addressing.ABSOLUTE: 0x6D,
-        Addressing.ABSOLUTE_X: 0x7D,
-        Addressing.ABSOLUTE_Y: 0x79,
-        Addressing.INDEXED_INDIRECT: 0x61,
-        Addressing.INDIRECT_INDEXED: 0x71,
-    },
-    'AND': {
-        Addressing.IMMEDIATE: 0x29,
-        Addressing.ZERO_PAGE: 0x25,
-        Addressing.ZERO_PAGE_X: 0x35,
-        Addressing.ABSOLUTE: 0x2D,
-        Addressing.ABSOLUTE_X: 0x3D,
-        Addressing.ABSOLUTE_Y: 0x39,
-        Addressing.INDEXED_INDIRECT: 0x21,
-        Addressing.INDIRECT_INDEXED: 0x31,
-    },
-    'CMP': {
-        Addressing.IMMEDIATE: 0xC9,
-        Addressing.ZERO_PAGE: 0xC5,
-        Addressing.ZERO_PAGE_X: 0xD5,
-        Addressing.ABSOLUTE: 0xCD,
-        Addressing.ABSOLUTE_X: 0xDD,
-        Addressing.ABSOLUTE_Y: 0xD9,
-        Addressing.INDEXED_INDIRECT: 0xC1,
-        Addressing.INDIRECT_INDEXED: 0xD1,
-    },
-    'EOR': {
-        Addressing.IMMEDIATE: 0x49,
-        Addressing.ZERO_PAGE: 0x45,
-        Addressing.ZERO_PAGE_X: 0x55,
-        Addressing.ABSOLUTE: 0x4D,
-        Addressing.ABSOLUTE_X: 0x5D,
-        Addressing.ABSOLUTE_Y: 0x59,
-        Addressing.INDEXED_INDIRECT: 0x41,
-        Addressing.INDIRECT_INDEXED: 0x51,
-    },
-    'LDA': {
-        Addressing.IMMEDIATE: 0xA9,
-        Addressing.ZERO_PAGE: 0xA5,
-        Addressing.ZERO_PAGE_X: 0xB5,
-        Addressing.ABSOLUTE: 0xAD,
-        Addressing.ABSOLUTE_X: 0xBD,
-        Addressing.ABSOLUTE_Y: 0xB9,
-        Addressing.INDEXED_INDIRECT: 0xA1,
-        Addressing.INDIRECT_INDEXED: 0xB1,
-    },
-    'ORA': {
-        Addressing.IMMEDIATE: 0x09,
-        Addressing.ZERO_PAGE: 0x05,
-        Addressing.ZERO_PAGE_X: 0x15,
-        Addressing.ABSOLUTE: 0x0D,
-        Addressing.ABSOLUTE_X: 0x1D,
-        Addressing.ABSOLUTE_Y: 0x19,
-        Addressing.INDEXED_INDIRECT: 0x01,
-        Addressing.INDIRECT_INDEXED: 0x11,
-    },
-    'SBC': {
-        Addressing.IMMEDIATE: 0xE9,
-        Addressing.ZERO_PAGE: 0xE5,
-        Addressing.ZERO_PAGE_X: 0xF5,
-        Addressing.ABSOLUTE: 0xED,
-        Addressing.ABSOLUTE_X: 0xFD,
-        Addressing.ABSOLUTE_Y: 0xF9,
-        Addressing.INDEXED_INDIRECT: 0xE1,
-        Addressing.INDIRECT_INDEXED: 0xF1,
-    },
-}
-
-CODE_MAPS_STORE_A = {
-    'STA': {
-        Addressing.ZERO_PAGE: 0x85,
-        Addressing.ZERO_PAGE_X: 0x95,
-        Addressing.ABSOLUTE: 0x8D,
-        Addressing.ABSOLUTE_X: 0x9D,
-        Addressing.ABSOLUTE_Y: 0x99,
-        Addressing.INDEXED_INDIRECT: 0x81,
-        Addressing.INDIRECT_INDEXED: 0x91,
-    },
-    'DCP': {
-        Addressing.ZERO_PAGE: 0xC7,
-        Addressing.ZERO_PAGE_X: 0xD7,
-        Addressing.ABSOLUTE: 0xCF,
-        Addressing.ABSOLUTE_X: 0xDF,
-        Addressing.ABSOLUTE_Y: 0xDB,
-        Addressing.INDEXED_INDIRECT: 0xC3,
-        Addressing.INDIRECT_INDEXED: 0xD3,
-    },
-    'ISC': {
-        Addressing.ZERO_PAGE: 0xE7,
-        Addressing.ZERO_PAGE_X: 0xF7,
-        Addressing.ABSOLUTE: 0xEF,
-        Addressing.ABSOLUTE_X: 0xFF,
-        Addressing.ABSOLUTE_Y: 0xFB,
-        Addressing.INDEXED_INDIRECT: 0xE3,
-        Addressing.INDIRECT_INDEXED: 0xF3,
-    },
-    'RLA': {
-        Addressing.ZERO_PAGE: 0x27,
-        Addressing.ZERO_PAGE_X: 0x37,
-        Addressing.ABSOLUTE: 0x2F,
-        Addressing.ABSOLUTE_X: 0x3F,
-        Addressing.ABSOLUTE_Y: 0x3B,
-        Addressing.INDEXED_INDIRECT: 0x23,
-        Addressing.INDIRECT_INDEXED: 0x33,
-    },
-    'RRA': {
-        Addressing.ZERO_PAGE: 0x67,
-        Addressing.ZERO_PAGE_X: 0x77,
-        Addressing.ABSOLUTE: 0x6F,
-        Addressing.ABSOLUTE_X: 0x7F,
-        Addressing.ABSOLUTE_Y: 0x7B,
-        Addressing.INDEXED_INDIRECT: 0x63,
-        Addressing.INDIRECT_INDEXED: 0x73,
-    },
-    'SLO': {
-        Addressing.ZERO_PAGE: 0x07,
-        Addressing.ZERO_PAGE_X: 0x17,
-        Addressing.ABSOLUTE: 0x0F,
-        Addressing.ABSOLUTE_X: 0x1F,
-        Addressing.ABSOLUTE_Y: 0x1B,
-        Addressing.INDEXED_INDIRECT: 0x03,
-        Addressing.INDIRECT_INDEXED: 0x13,
-    },
-    'SRE': {
-        Addressing.ZERO_PAGE: 0x47,
-        Addressing.ZERO_PAGE_X: 0x57,
-        Addressing.ABSOLUTE: 0x4F,
-        Addressing.ABSOLUTE_X: 0x5F,
-        Addressing.ABSOLUTE_Y: 0x5B,
-        Addressing.INDEXED_INDIRECT: 0x43,
-        Addressing.INDIRECT_INDEXED: 0x53,
-    },
-}
-
-
-CODE_MAPS_A_M = {
-    'ASL': {
-        Addressing.ACCUMULATOR: 0x0A,
-        Addressing.ZERO_PAGE: 0x06,
-        Addressing.ZERO_PAGE_X: 0x16,
-        Addressing.ABSOLUTE: 0x0E,
-        Addressing.ABSOLUTE_X: 0x1E,
-    },
-    'LSR': {
-        Addressing.ACCUMULATOR: 0x4A,
-        Addressing.ZERO_PAGE: 0x46,
-        Addressing.ZERO_PAGE_X: 0x56,
-        Addressing.ABSOLUTE: 0x4E,
-        Addressing.ABSOLUTE_X: 0x5E,
-    },
-    'ROL': {
-        Addressing.ACCUMULATOR: 0x2A,
-        Addressing.ZERO_PAGE: 0x26,
-        Addressing.ZERO_PAGE_X: 0x36,
-        Addressing.ABSOLUTE: 0x2E,
-        Addressing.ABSOLUTE_X: 0x3E,
-    },
-    'ROR': {
-        Addressing.ACCUMULATOR: 0x6A,
-        Addressing.ZERO_PAGE: 0x66,
-        Addressing.ZERO_PAGE_X: 0x76,
-        Addressing.ABSOLUTE: 0x6E,
-        Addressing.ABSOLUTE_X: 0x7E,
-    },
-}
+def _code_map(ops: List[str], mode: str) -> dict:
+    return {op: ENCODINGS[op][mode] for op in ops}
+
+
+def _code_maps(ops: List[str], modes: List[str]) -> dict:
+    return {op: {mode: ENCODINGS[op][mode] for mode in modes} for op in ops}
+
+
+# The instructions that share the same forms of addressing, the opcodes are derived from `OPCODES`
+CODE_MAP_IMPLIED = _code_map([
+    'CLC', 'CLD', 'CLI', 'CLV', 'DEX',
+    'DEY', 'INX', 'INY', 'PHA', 'PHP',
+    'PLA', 'PLP', 'RTI', 'RTS', 'SEC',
+    'SED', 'SEI', 'TAX', 'TAY', 'TSX',
+    'TXA', 'TXS', 'TYA', 'JAM',
+], Addressing.IMPLIED)
+
+CODE_MAP_RELATIVE = _code_map([
+    'BCC', 'BCS', 'BEQ', 'BMI', 'BNE',
+    'BPL', 'BVC', 'BVS',
+], Addressing.RELATIVE)
+
+CODE_MAP_IMMEDIATE = _code_map([
+    'ANC', 'ARR', 'ASR', 'SBX', 'XAA',
+], Addressing.IMMEDIATE)
+
+CODE_MAP_ABSOLUTE_Y = _code_map([
+    'LAS', 'SHS', 'SHX',
+], Addressing.ABSOLUTE_Y)
+
+CODE_MAPS_LOAD_A = _code_maps([
+    'ADC', 'AND', 'CMP', 'EOR', 'LDA', 'ORA', 'SBC',
+], [
+    Addressing.IMMEDIATE,
+    Addressing.ZERO_PAGE,
+    Addressing.ZERO_PAGE_X,
+    Addressing.ABSOLUTE,
+    Addressing.ABSOLUTE_X,
+    Addressing.ABSOLUTE_Y,
+    Addressing.INDEXED_INDIRECT,
+    Addressing.INDIRECT_INDEXED,
+])
+
+CODE_MAPS_STORE_A = _code_maps([
+    'STA', 'DCP', 'ISC', 'RLA', 'RRA', 'SLO', 'SRE',
+], [
+    Addressing.ZERO_PAGE,
+    Addressing.ZERO_PAGE_X,
+    Addressing.ABSOLUTE,
+    Addressing.ABSOLUTE_X,
+    Addressing.ABSOLUTE_Y,
+    Addressing.INDEXED_INDIRECT,
+    Addressing.INDIRECT_INDEXED,
+])
+
+CODE_MAPS_A_M = _code_maps([
+    'ASL', 'LSR', 'ROL', 'ROR',
+], [
+    Addressing.ACCUMULATOR,
+    Addressing.ZERO_PAGE,
+    Addressing.ZERO_PAGE_X,
+    Addressing.ABSOLUTE,
+    Addressing.ABSOLUTE_X,
+])
+
+
+_INCLUDE_CACHE = IncludeCache()  # Shared by the assemblers without their own caches
+
+
+def _collect_references(arithmetic: Union[Integer, Arithmetic], labels: set) -> bool:
+    # Collects the labels used by the arithmetic and returns whether the current offset is used
+    if arithmetic is None or isinstance(arithmetic, Integer):
+        return False
+    if arithmetic.mode == Arithmetic.CURRENT:
+        return True
+    if arithmetic.mode == Arithmetic.LABEL:
+        labels.add(arithmetic.param)
+        return False
+    if arithmetic.mode == Arithmetic.STRING:
+        return False
+    if arithmetic.mode in {Arithmetic.NEG, Arithmetic.LOW_BYTE, Arithmetic.HIGH_BYTE}:
+        return _collect_references(arithmetic.param, labels)
+    if arithmetic.mode == Arithmetic.BLOCK:
+        # The variable and the labels defined in the block are not the references outside the block
+        count, variable, body = arithmetic.param
+        use_current, inner = _collect_references(count, labels), set()
+        for inst in body:
+            use_current = _collect_references(inst.addressing.address, inner) or use_current
+        labels.update(inner - {variable} - {inst.label for inst in body})
+        return use_current
+    use_current = False
+    for param in arithmetic.param:
+        use_current = _collect_references(param, labels) or use_current
+    return use_current
+
+
+def _substitute(arithmetic: Union[Integer, Arithmetic], replacements: dict) -> Union[Integer, Arithmetic]:
+    # Replaces the labels with the given arithmetics
+    if arithmetic is None or isinstance(arithmetic, Integer):
+        return arithmetic
+    if arithmetic.mode == Arithmetic.LABEL:
+        return replacements.get(arithmetic.param, arithmetic)
+    if arithmetic.mode in {Arithmetic.CURRENT, Arithmetic.STRING}:
+        return arithmetic
+    if arithmetic.mode in {Arithmetic.NEG, Arithmetic.LOW_BYTE, Arithmetic.HIGH_BYTE}:
+        return Arithmetic(arithmetic.mode, _substitute(arithmetic.param, replacements))
+    if arithmetic.mode == Arithmetic.BLOCK:
+        count, variable, body = arithmetic.param
+        inner = {label: value for label, value in replacements.items() if label != variable}
+        return Arithmetic(arithmetic.mode, (_substitute(count, replacements), variable,
+                                            tuple(_substitute_instruction(inst, inner, inst.label) for inst in body)))
+    params = [_substitute(param, replacements) for param in arithmetic.param]
+    return Arithmetic(arithmetic.mode, params if arithmetic.mode == Arithmetic.LIST else tuple(params))
+
+
+def _position_independent(instructions: Iterable[Instruction]) -> bool:
+    # Whether the bytes of the instructions are the same at any address and in one segment, `.RES` starts a new
+    # segment
+    for inst in instructions:
+        if inst.label is not None or inst.op in CODE_MAP_RELATIVE or inst.op in {'.END', '.RES'}:
+            return False
+        if _collect_references(inst.addressing.address, set()):
+            return False
+        if inst.op == '.REPT' and not _position_independent(inst.addressing.address.param[2]):
+            return False
+    return True
+
+
+def _layout_dependent(inst: Instruction) -> bool:
+    # Whether the size of the instruction may change with the offsets and the labels
+    if inst.op == '.ALIGN':
+        return True
+    if inst.op in {'.FILL', '.RES'}:
+        count = inst.addressing.address
+        if inst.addressing.mode == Addressing.LIST:
+            count = count.param[0]
+        return not isinstance(count, Integer)
+    return False
+
+
+def _substitute_instruction(inst: Instruction, replacements: dict, label: Optional[str]) -> Instruction:
+    # The instruction is shared if nothing is replaced
+    labels = set()
+    _collect_references(inst.addressing.address, labels)
+    if label == inst.label and labels.isdisjoint(replacements):
+        return inst
+    addressing = inst.addressing
+    mode, address = addressing.mode, _substitute(addressing.address, replacements)
+    # A file name can be passed to the macros
+    if mode == Addressing.ADDRESS and isinstance(address, Arithmetic) and address.mode == Arithmetic.STRING:
+        mode, address = Addressing.STRING, Arithmetic(Arithmetic.LIST, [address])
+    elif mode == Addressing.LIST and isinstance(address.param[0], Arithmetic) and \
+            address.param[0].mode == Arithmetic.STRING:
+        mode = Addressing.STRING
+    return Instruction(label, inst.op, Addressing(mode, address, addressing.register), inst.line_num, inst.file_name)
+
+
+class _MacroExpansion(namedtuple('_MacroExpansion', ['instructions', 'local_indices', 'local_labels'])):
+    # The expanded instructions of a macro with the same arguments, the local labels are `LABEL@MACRO` before renaming
+
+    __slots__ = ()
+
+    def rename(self, suffix: str) -> List[Instruction]:
+        # Appends the suffix to the local labels, the instructions without local labels are shared
+        if not self.local_indices:
+            return self.instructions
+        replacements = {label: Arithmetic(Arithmetic.LABEL, label + suffix) for label in self.local_labels}
+        instructions = list(self.instructions)
+        for index in self.local_indices:
+            inst = instructions[index]
+            label = inst.label + suffix if inst.label in self.local_labels else inst.label
+            instructions[index] = _substitute_instruction(inst, replacements, label)
+        return instructions
 
 
 class Assembler(object):
@@ -218,99 +211,494 @@ class Assembler(object):
     def __init__(self,
                  max_memory=0x10000,
                  program_entry=0xfffc,
-                 brk_size=2):
+                 brk_size=2,
+                 include_paths: Optional[List[str]] = None,
+                 include_cache: Optional[IncludeCache] = None,
+                 defines: Optional[dict] = None,
+                 strict_pages: bool = False):
         self.max_memory = max_memory
         self.program_entry = program_entry
         self.brk_size = brk_size
         assert brk_size in {1, 2}, 'The size of BRK should be in {1, 2}'
+        self.include_paths = ['.'] if include_paths is None else list(include_paths)
+        self.include_cache = _INCLUDE_CACHE if include_cache is None else include_cache
+        self.defines = dict(defines or {})  # The names used by the conditions
+        self.strict_pages = strict_pages  # Whether the page crossings in the `.HOT` regions are errors
 
         self.code_start = -1  # The offset of the first instruction that can be executed
         self.code_offset = 0  # Current offset
         self.line_number = -1  # Current line number
+        self.file_name = None  # Current included file, None for the main source
         self.code_offsets = []  # The offsets of all the instructions
         self.fit_zero_pages = []  # Whether the addresses fit zero-page
+        self.code_sizes = []  # The number of bytes of all the instructions
         self.label_offsets = {}  # The resolved labels
+        self.label_references = {}  # The indices of the instructions that use each label
+        self.included_files = []  # The path and the instruction indices of each included file
+        self.block_variables = {}  # The values of the variables of the current blocks
+        self.instructions = []  # The assembled instructions, kept for the source map
         self.codes = []  # The generated codes
 
     def reset(self):
         self.code_start = -1
         self.code_offset = 0
         self.line_number = -1
+        self.file_name = None
         self.code_offsets = []
         self.fit_zero_pages = []
+        self.code_sizes = []
         self.label_offsets = {}
+        self.label_references = {}
+        self.included_files = []
+        self.block_variables = {}
+        self.instructions = []
         self.codes = []
 
     def assemble(self,
                  instructions: Union[str, List],
                  add_entry: bool = True):
         if isinstance(instructions, str):
-            parser = get_parser()
-            instructions = parser.parse(instructions)
-        # Preprocess and calculate offsets
+            instructions = parse_source(instructions, self.defines)
         self.reset()
-        for i, inst in enumerate(instructions):
-            self.line_number = inst.line_num
-            if inst.label is not None and not inst.op.endswith('ORG'):
-                self.label_offsets[inst.label] = self.code_offset
-            op_name = inst.op.lower()
-            if op_name.startswith('.'):
-                op_name = op_name[1:]
-            if inst.op in CODE_MAP_IMPLIED:
-                offset = self._get_num_bytes_type_implied(inst.addressing, op_name)
-            elif inst.op in CODE_MAP_IMMEDIATE:
-                offset = self._get_num_bytes_type_immediate(inst.addressing, op_name)
-            elif inst.op in CODE_MAP_RELATIVE:
-                offset = self._get_num_bytes_type_relative(inst.addressing, op_name)
-            elif inst.op in CODE_MAP_ABSOLUTE_Y:
-                offset = self._get_num_bytes_type_absolute_y(inst.addressing, op_name)
-            elif inst.op in CODE_MAPS_LOAD_A:
-                offset = self._get_num_bytes_type_load_a(inst.addressing, op_name)
-            elif inst.op in CODE_MAPS_STORE_A:
-                offset = self._get_num_bytes_type_store_a(inst.addressing, op_name)
-            elif inst.op in CODE_MAPS_A_M:
-                offset = self._get_num_bytes_type_a_m(inst.addressing, op_name)
-            else:
-                offset = getattr(self, f'pre_{op_name}')(inst.addressing, op_name)
-            if inst.label is not None and inst.op.endswith('ORG'):
-                self.label_offsets[inst.label] = self.code_offset
-            if self.code_start == -1 and inst.op in Instruction.KEYWORDS:
-                self.code_start = self.code_offset
-            self.code_offsets.append(self.code_offset)
-            self.code_offset += offset
-            if self.code_offset >= self.max_memory:
-                raise AssembleError(f"The assembled code will exceed the "
-                                    f"max memory {hex(self.max_memory)} "
+        try:
+            instructions = self._include(instructions)
+            self._assemble_included(instructions)
+        except AssembleError as e:
+            raise self._file_error(e)
+        if add_entry:
+            self._add_entry()
+        return self.codes
+
+    def assemble_file(self,
+                      path: str,
+                      add_entry: bool = True):
+        # The parsing and sizing results of the file and its included files are cached by `include_cache`
+        self.reset()
+        path = os.path.normpath(path)
+        try:
+            instructions = []
+            self._include_file(path, (), instructions)
+            self._assemble_included(self._collect_blocks(self._expand_macros(instructions)))
+        except AssembleError as e:
+            raise self._file_error(e)
+        if add_entry:
+            self._add_entry()
+        return self.codes
+
+    def _assemble_included(self, instructions: List[Instruction]):
+        sizes, sized = None, set()
+        if self.included_files:
+            sizes = [None] * len(instructions)
+            for path, indices in self.included_files:
+                cached = self.include_cache.load_sizes(path, self.brk_size, self.defines)
+                if cached is not None:
+                    sized.add(path)
+                    for index, size in zip(indices, cached):
+                        sizes[index] = size
+        self._preprocess(instructions, sizes)
+        for path, indices in self.included_files:
+            # The sizes of `.INCBIN`s depend on the binary files
+            if path not in sized and all(instructions[index].op != '.INCBIN' for index in indices):
+                # The sizes of `ORG`s and alignments are not cached as the offsets may depend on the labels
+                self.include_cache.save_sizes(path, self.brk_size, [
+                    None if instructions[index].op.endswith('ORG') or _layout_dependent(instructions[index]) else
+                    (self.code_sizes[index], self.fit_zero_pages[index])
+                    for index in indices
+                ], self.defines)
+        self.instructions = instructions
+        self._generate(instructions)
+        if self.strict_pages:
+            self._check_pages(instructions)
+
+    def source_map(self) -> SourceMap:
+        # The addresses and the lines of the instructions that emit codes in the last assembly
+        return SourceMap.from_instructions(self.code_offsets, self.code_sizes, self.instructions)
+
+    def symbol_index(self) -> SymbolIndex:
+        # The labels sorted by the addresses, the addresses are final after the first pass
+        return SymbolIndex(self.label_offsets)
+
+    def listing(self) -> Listing:
+        # The addresses, codes and cycles of the instructions in the last assembly
+        return Listing.from_instructions(self.codes, self.code_offsets, self.code_sizes, self.instructions,
+                                         self.brk_size)
+
+    def page_crossings(self) -> List[PageCrossing]:
+        # The branches and the accesses of the tables that cost one more cycle for crossing pages
+        return find_page_crossings(self.codes, self.code_offsets, self.code_sizes, self.instructions,
+                                   self.label_references)
+
+    def _check_pages(self, instructions: List[Instruction]):
+        for crossing in find_page_crossings(self.codes, self.code_offsets, self.code_sizes, instructions,
+                                            self.label_references):
+            if not crossing.hot:
+                continue
+            self.line_number, self.file_name = crossing.line_num, crossing.file_name
+            if crossing.kind == PageCrossing.BRANCH:
+                raise AssembleError(f"The branch to {hex(crossing.target)} crosses a page in a hot region "
                                     f"at line {self.line_number}")
+            raise AssembleError(f"The access to the table '{crossing.label}' crosses a page in a hot region "
+                                f"at line {self.line_number}")
+
+    def _include(self, instructions: List[Instruction], including: tuple = ()) -> List[Instruction]:
+        # Replaces the `.INCLUDE`s with the instructions of the included files, then expands the macros
+        self.included_files = []
+        if any(inst.op == '.INCLUDE' for inst in instructions):
+            results = []
+            self._include_recur(instructions, including, results)
+            instructions = results
+        return self._collect_blocks(self._expand_macros(instructions))
+
+    def _include_recur(self, instructions: List[Instruction], including: tuple, results: List[Instruction]) -> list:
+        # Returns the indices of the instructions that are not included from the other files
+        indices = []
+        for inst in instructions:
+            if inst.op != '.INCLUDE':
+                indices.append(len(results))
+                results.append(inst)
+                continue
+            self.line_number, self.file_name = inst.line_num, inst.file_name
+            addressing = inst.addressing
+            if addressing.mode != Addressing.STRING or len(addressing.address.param) != 1:
+                raise AssembleError(f"`.INCLUDE` only accepts a file name at line {self.line_number}")
+            if inst.label is not None:
+                raise AssembleError(f"Label is not allowed for `.INCLUDE` at line {self.line_number}")
+            path = self._find_file(addressing.address.param[0].param)
+            if path in including:
+                raise AssembleError(f"Recursive inclusion of '{path}' at line {self.line_number}")
+            self._include_file(path, including, results)
+        return indices
+
+    def _include_file(self, path: str, including: tuple, results: List[Instruction]):
+        try:
+            instructions = self.include_cache.load(path, self.defines)
+        except OSError as e:
+            raise AssembleError(f"Can not read the file '{path}': {e.strerror} at line {self.line_number}")
+        self.included_files.append((path, self._include_recur(instructions, including + (path,), results)))
+
+    def _find_file(self, name: str) -> str:
+        # The directory of the current file is searched before the search path
+        directories = self.include_paths if self.file_name is None else \
+            [os.path.dirname(self.file_name)] + self.include_paths
+        for directory in directories:
+            path = os.path.normpath(os.path.join(directory, name))
+            if os.path.isfile(path):
+                return path
+        raise AssembleError(f"Can not find the file '{name}' at line {self.line_number}")
+
+    def _expand_macros(self, instructions: List[Instruction]) -> List[Instruction]:
+        # Replaces the invocations of the macros with the instructions in their definitions
+        if all(inst.op not in {'.MACRO', '.ENDM'} for inst in instructions):
+            return instructions
+        macros, outside, definition = {}, [], None
+        for index, inst in enumerate(instructions):
+            if inst.op == '.MACRO':
+                self.line_number, self.file_name = inst.line_num, inst.file_name
+                if definition is not None:
+                    raise AssembleError(f"Nested `.MACRO` is not allowed at line {self.line_number}")
+                definition = inst, []
+            elif inst.op == '.ENDM':
+                self.line_number, self.file_name = inst.line_num, inst.file_name
+                if definition is None:
+                    raise AssembleError(f"`.ENDM` without `.MACRO` at line {self.line_number}")
+                if inst.label is not None:
+                    # The label of the end of the macro
+                    definition[1].append(Instruction(inst.label, '.MACRO', Addressing(Addressing.IMPLIED),
+                                                     inst.line_num, inst.file_name))
+                self._define_macro(macros, *definition)
+                definition = None
+            elif definition is not None:
+                definition[1].append(inst)
+            else:
+                outside.append(index)
+        if definition is not None:
+            self.line_number, self.file_name = definition[0].line_num, definition[0].file_name
+            raise AssembleError(f"`.MACRO` without `.ENDM` at line {self.line_number}")
+
+        results, moved = [], {}  # The new indices of the instructions that are not expanded
+        expansions = {}  # The expansions of each macro and arguments
+        count = 0  # The number of expansions with local labels
+        for index in outside:
+            inst = instructions[index]
+            if inst.op[1:] not in macros or not inst.op.startswith('.'):
+                moved[index] = len(results)
+                results.append(inst)
+                continue
+            self.line_number, self.file_name = inst.line_num, inst.file_name
+            if inst.label is not None:
+                results.append(Instruction(inst.label, '.MACRO', Addressing(Addressing.IMPLIED),
+                                           inst.line_num, inst.file_name))
+            expansion = self._expand_macro(inst, macros, expansions, ())
+            if expansion.local_indices:
+                count += 1
+            results.extend(expansion.rename(f'.{count}'))
+        # The sizes of the files that define or invoke macros are not cached
+        self._move_included_files(moved)
+        return results
+
+    def _move_included_files(self, moved: dict):
+        # Only keeps the included files whose instructions are all moved to the new indices
+        self.included_files = [(path, [moved[index] for index in indices])
+                               for path, indices in self.included_files
+                               if all(index in moved for index in indices)]
+
+    def _define_macro(self, macros: dict, inst: Instruction, body: List[Instruction]):
+        self.line_number, self.file_name = inst.line_num, inst.file_name
+        addressing = inst.addressing
+        names = [addressing.address] if addressing.mode == Addressing.ADDRESS else \
+            addressing.address.param if addressing.mode == Addressing.LIST else []
+        if not names or not all(isinstance(name, Arithmetic) and name.mode == Arithmetic.LABEL for name in names):
+            raise AssembleError(f"`.MACRO` only accepts a name and the names of the parameters "
+                                f"at line {self.line_number}")
+        if inst.label is not None:
+            raise AssembleError(f"Label is not allowed for `.MACRO` at line {self.line_number}")
+        name, params = names[0].param, [param.param for param in names[1:]]
+        if f'.{name.upper()}' in Instruction.PSEUDOS:
+            raise AssembleError(f"The macro '{name}' conflicts with `.{name.upper()}` at line {self.line_number}")
+        if name in macros:
+            raise AssembleError(f"The macro '{name}' is defined multiple times at line {self.line_number}")
+        if len(set(params)) != len(params):
+            raise AssembleError(f"The parameters of the macro '{name}' are not unique at line {self.line_number}")
+        macros[name] = params, body
+
+    def _macro_arguments(self, inst: Instruction) -> list:
+        addressing = inst.addressing
+        if addressing.mode == Addressing.IMPLIED:
+            return []
+        if addressing.mode == Addressing.ADDRESS:
+            return [addressing.address]
+        if addressing.mode in {Addressing.LIST, Addressing.STRING}:
+            return addressing.address.param
+        raise AssembleError(f"`{inst.op}` only accepts the arguments of the macro at line {self.line_number}")
+
+    def _expand_macro(self,
+                      inst: Instruction,
+                      macros: dict,
+                      expansions: dict,
+                      expanding: tuple) -> _MacroExpansion:
+        # The expansions are shared by the invocations with the same arguments
+        name, args = inst.op[1:], self._macro_arguments(inst)
+        key = (name, tuple(args))
+        expansion = expansions.get(key)
+        if expansion is not None:
+            return expansion
+        if name in expanding:
+            raise AssembleError(f"Recursive expansion of the macro '{name}' at line {self.line_number}")
+        params, body = macros[name]
+        if len(args) != len(params):
+            raise AssembleError(f"The macro '{name}' expects {len(params)} arguments, found {len(args)} "
+                                f"at line {self.line_number}")
+        # The labels defined in the macro are local to each expansion
+        renamed = {inst.label: f'{inst.label}@{name}' for inst in body if inst.label is not None}
+        replacements = {label: Arithmetic(Arithmetic.LABEL, local) for label, local in renamed.items()}
+        replacements.update(zip(params, args))
+        local_labels, instructions, count = set(renamed.values()), [], 0
+        for inst in body:
+            label = renamed.get(inst.label)
+            inst = _substitute_instruction(inst, replacements, label)
+            if inst.op[1:] not in macros or not inst.op.startswith('.'):
+                instructions.append(inst)
+                continue
+            self.line_number, self.file_name = inst.line_num, inst.file_name
+            if label is not None:
+                instructions.append(Instruction(label, '.MACRO', Addressing(Addressing.IMPLIED),
+                                                inst.line_num, inst.file_name))
+            nested = self._expand_macro(inst, macros, expansions, expanding + (name,))
+            count += 1
+            local_labels.update(f'{label}.{count}' for label in nested.local_labels)
+            instructions.extend(nested.rename(f'.{count}'))
+        local_indices = []
+        for index, inst in enumerate(instructions):
+            labels = set()
+            _collect_references(inst.addressing.address, labels)
+            if inst.label in local_labels or not labels.isdisjoint(local_labels):
+                local_indices.append(index)
+        expansion = expansions[key] = _MacroExpansion(instructions, local_indices, local_labels)
+        return expansion
+
+    def _collect_blocks(self, instructions: List[Instruction]) -> List[Instruction]:
+        # Replaces each `.REPT` block with one instruction that holds the instructions in the block
+        if all(inst.op not in {'.REPT', '.ENDR'} for inst in instructions):
+            return instructions
+        results, moved, blocks = [], {}, []
+        for index, inst in enumerate(instructions):
+            self.line_number, self.file_name = inst.line_num, inst.file_name
+            if inst.op == '.REPT':
+                blocks.append((inst, []))
+            elif inst.op == '.ENDR':
+                if not blocks:
+                    raise AssembleError(f"`.ENDR` without `.REPT` at line {self.line_number}")
+                if inst.label is not None:
+                    raise AssembleError(f"Label is not allowed for `.ENDR` at line {self.line_number}")
+                block = self._block_instruction(*blocks.pop())
+                (blocks[-1][1] if blocks else results).append(block)
+            elif blocks:
+                if inst.op.endswith('ORG'):
+                    raise AssembleError(f"`ORG` is not allowed in `.REPT` at line {self.line_number}")
+                if inst.op == '.ALIGN':
+                    raise AssembleError(f"`.ALIGN` is not allowed in `.REPT` at line {self.line_number}")
+                blocks[-1][1].append(inst)
+            else:
+                moved[index] = len(results)
+                results.append(inst)
+        if blocks:
+            self.line_number, self.file_name = blocks[-1][0].line_num, blocks[-1][0].file_name
+            raise AssembleError(f"`.REPT` without `.ENDR` at line {self.line_number}")
+        # The sizes of the files with blocks are not cached
+        self._move_included_files(moved)
+        return results
+
+    def _block_instruction(self, inst: Instruction, body: List[Instruction]) -> Instruction:
+        self.line_number, self.file_name = inst.line_num, inst.file_name
+        addressing = inst.addressing
+        params = [addressing.address] if addressing.mode == Addressing.ADDRESS else \
+            addressing.address.param if addressing.mode == Addressing.LIST else []
+        if not 1 <= len(params) <= 2 or \
+                len(params) == 2 and not (isinstance(params[1], Arithmetic) and params[1].mode == Arithmetic.LABEL):
+            raise AssembleError(f"`.REPT` only accepts a count and the name of the variable at line {self.line_number}")
+        variable = params[1].param if len(params) == 2 else None
+        block = Arithmetic(Arithmetic.BLOCK, (params[0], variable, tuple(body)))
+        return Instruction(inst.label, inst.op, Addressing(Addressing.BLOCK, address=block),
+                           inst.line_num, inst.file_name)
+
+    def _unroll_blocks(self, instructions: List[Instruction]) -> List[Instruction]:
+        # Repeats the instructions in the blocks, the labels in the blocks are renamed for each iteration
+        results = []
+        for inst in instructions:
+            if inst.op != '.REPT':
+                results.append(inst)
+                continue
+            self.line_number, self.file_name = inst.line_num, inst.file_name
+            count, variable, body = self._block_params(inst.addressing)
+            if inst.label is not None:
+                results.append(Instruction(inst.label, '.MACRO', Addressing(Addressing.IMPLIED),
+                                           inst.line_num, inst.file_name))
+            labels = {inst.label for inst in body if inst.label is not None}
+            for i in range(count):
+                replacements = {label: Arithmetic(Arithmetic.LABEL, f'{label}.{i}') for label in labels}
+                if variable is not None:
+                    replacements[variable] = Integer(is_word=i > 0xFF, value=i)
+                results.extend(self._unroll_blocks([
+                    _substitute_instruction(inst, replacements, None if inst.label is None else f'{inst.label}.{i}')
+                    for inst in body
+                ]))
+        return results
+
+    def _file_error(self, e: AssembleError) -> AssembleError:
+        # Reports the included file that causes the error
+        if self.file_name is not None:
+            e.info = f"{e.info} in '{self.file_name}'"
+        return e
+
+    def _preprocess(self, instructions: List[Instruction], sizes: Optional[list] = None):
+        # Preprocess and calculate offsets, the sizes of the instructions are calculated if not given
+        if sizes is None:
+            for inst in instructions:
+                self._preprocess_instruction(inst)
+        else:
+            for inst, size in zip(instructions, sizes):
+                if size is None:
+                    self._preprocess_instruction(inst)
+                else:
+                    self._preprocess_sized_instruction(inst, *size)
+
+    def _preprocess_instruction(self, inst: Instruction):
+        self.line_number, self.file_name = inst.line_num, inst.file_name
+        if inst.label is not None and not inst.op.endswith('ORG'):
+            self.label_offsets[inst.label] = self.code_offset
+        offset = self._instruction_size(inst)
+        if inst.label is not None and inst.op.endswith('ORG'):
+            self.label_offsets[inst.label] = self.code_offset
+        self._place_instruction(inst, offset)
+
+    def _instruction_size(self, inst: Instruction) -> int:
+        # Returns the size of the instruction and appends whether its address fits zero-page
+        op_name = inst.op.lower()
+        if op_name.startswith('.'):
+            op_name = op_name[1:]
+        if inst.op in CODE_MAP_IMPLIED:
+            offset = self._get_num_bytes_type_implied(inst.addressing, op_name)
+        elif inst.op in CODE_MAP_IMMEDIATE:
+            offset = self._get_num_bytes_type_immediate(inst.addressing, op_name)
+        elif inst.op in CODE_MAP_RELATIVE:
+            offset = self._get_num_bytes_type_relative(inst.addressing, op_name)
+        elif inst.op in CODE_MAP_ABSOLUTE_Y:
+            offset = self._get_num_bytes_type_absolute_y(inst.addressing, op_name)
+        elif inst.op in CODE_MAPS_LOAD_A:
+            offset = self._get_num_bytes_type_load_a(inst.addressing, op_name)
+        elif inst.op in CODE_MAPS_STORE_A:
+            offset = self._get_num_bytes_type_store_a(inst.addressing, op_name)
+        elif inst.op in CODE_MAPS_A_M:
+            offset = self._get_num_bytes_type_a_m(inst.addressing, op_name)
+        else:
+            offset = getattr(self, f'pre_{op_name}')(inst.addressing, op_name)
+        return offset
+
+    def _preprocess_sized_instruction(self, inst: Instruction, size: int, fit_zero_page: bool):
+        # The size is known, only the offsets are calculated
+        self.line_number, self.file_name = inst.line_num, inst.file_name
+        if inst.label is not None:
+            self.label_offsets[inst.label] = self.code_offset
+        self.fit_zero_pages.append(fit_zero_page)
+        self._place_instruction(inst, size)
+
+    def _place_instruction(self, inst: Instruction, size: int):
+        if self.code_start == -1 and inst.op in Instruction.KEYWORDS:
+            self.code_start = self.code_offset
+        elif self.code_start == -1 and inst.op == '.REPT' and size > 0:
+            line = self.line_number, self.file_name
+            start = self._block_code_start(inst.addressing)
+            if start is not None:
+                self.code_start = self.code_offset + start
+            self.line_number, self.file_name = line
+        labels = set()
+        _collect_references(inst.addressing.address, labels)
+        for label in labels:
+            self.label_references.setdefault(label, []).append(len(self.code_offsets))
+        self.code_offsets.append(self.code_offset)
+        self.code_sizes.append(size)
+        self.code_offset += size
+        self._check_max_memory()
+
+    def _check_max_memory(self):
+        if self.code_offset >= self.max_memory:
+            raise AssembleError(f"The assembled code will exceed the "
+                                f"max memory {hex(self.max_memory)} "
+                                f"at line {self.line_number}")
+
+    def _generate(self, instructions: List[Instruction]):
         # Generate codes
         for i, inst in enumerate(instructions):
-            self.line_number = inst.line_num
-            self.code_offset = self.code_offsets[i]
-            if inst.op in CODE_MAP_IMPLIED:
-                self._extend_address_type_implied(i, inst.addressing, inst.op)
-            elif inst.op in CODE_MAP_IMMEDIATE:
-                self._extend_address_type_immediate(i, inst.addressing, inst.op)
-            elif inst.op in CODE_MAP_RELATIVE:
-                self._extend_address_type_relative(i, inst.addressing, inst.op)
-            elif inst.op in CODE_MAP_ABSOLUTE_Y:
-                self._extend_address_type_absolute_y(i, inst.addressing, inst.op)
-            elif inst.op in CODE_MAPS_LOAD_A:
-                self._extend_address_type_load_a(i, inst.addressing, inst.op)
-            elif inst.op in CODE_MAPS_STORE_A:
-                self._extend_address_type_store_a(i, inst.addressing, inst.op)
-            elif inst.op in CODE_MAPS_A_M:
-                self._extend_address_type_a_m(i, inst.addressing, inst.op)
-            else:
-                op_name = inst.op.lower()
-                if op_name.startswith('.'):
-                    op_name = op_name[1:]
-                getattr(self, f'gen_{op_name}')(i, inst.addressing)
+            self._generate_instruction(i, inst)
         while len(self.codes) and len(self.codes[-1][1]) == 0:
             del self.codes[-1]
-        if add_entry:
-            self.code_offset = 0xFFFC
-            self.gen_entry(None, Addressing(Addressing.ADDRESS, address=Integer(is_word=True, value=self.code_start)))
-        return self.codes
+
+    def _generate_instruction(self, index: int, inst: Instruction):
+        self.line_number, self.file_name = inst.line_num, inst.file_name
+        self.code_offset = self.code_offsets[index]
+        if inst.op in CODE_MAP_IMPLIED:
+            self._extend_address_type_implied(index, inst.addressing, inst.op)
+        elif inst.op in CODE_MAP_IMMEDIATE:
+            self._extend_address_type_immediate(index, inst.addressing, inst.op)
+        elif inst.op in CODE_MAP_RELATIVE:
+            self._extend_address_type_relative(index, inst.addressing, inst.op)
+        elif inst.op in CODE_MAP_ABSOLUTE_Y:
+            self._extend_address_type_absolute_y(index, inst.addressing, inst.op)
+        elif inst.op in CODE_MAPS_LOAD_A:
+            self._extend_address_type_load_a(index, inst.addressing, inst.op)
+        elif inst.op in CODE_MAPS_STORE_A:
+            self._extend_address_type_store_a(index, inst.addressing, inst.op)
+        elif inst.op in CODE_MAPS_A_M:
+            self._extend_address_type_a_m(index, inst.addressing, inst.op)
+        else:
+            op_name = inst.op.lower()
+            if op_name.startswith('.'):
+                op_name = op_name[1:]
+            getattr(self, f'gen_{op_name}')(index, inst.addressing)
+
+    def _add_entry(self):
+        self.code_offset = self.program_entry
+        self.gen_entry(None, Addressing(Addressing.ADDRESS, address=Integer(is_word=True, value=self.code_start)))
 
     def _addressing_guard(allowed: Iterable[str]):
         def deco(func):
@@ -354,6 +742,8 @@ class Assembler(object):
         if arithmetic.mode == Arithmetic.CURRENT:
             return Integer(is_word=True, value=self.code_offset)
         if arithmetic.mode == Arithmetic.LABEL:
+            if self.block_variables and arithmetic.param in self.block_variables:
+                return self.block_variables[arithmetic.param]
             if arithmetic.param not in self.label_offsets:
                 raise AssembleError(f"Can not resolve label '{arithmetic.param}' at line {self.line_number}")
             return Integer(is_word=True, value=self.label_offsets[arithmetic.param])
@@ -373,6 +763,8 @@ class Assembler(object):
             return self._resolve_address_recur(arithmetic.param).high_byte()
         if arithmetic.mode == Arithmetic.LIST:
             return [self._resolve_address_recur(p) for p in arithmetic.param]
+        if arithmetic.mode == Arithmetic.STRING:
+            return arithmetic.param
 
     def _resolve_address(self, addressing: Addressing) -> Addressing:
         return Addressing(mode=addressing.mode,
@@ -410,7 +802,7 @@ class Assembler(object):
 
     @_assemble_guard
     def _extend_address_type_relative(self, index, addressing: Addressing, op: str):
-        address = addressing.address.value - (self.codes[-1][0] + 2)
+        address = addressing.address.value - (self.code_offset + 2)
         if address < -0x80 or 0x7F < address:
             raise AssembleError(f"The offset {hex(address)} is out of range for relative addressing "
                                 f"at line {self.line_number}")
@@ -525,8 +917,9 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_end(self, index, addressing: Addressing):
-        address = Integer(is_word=True, value=self.codes[-1][0])
-        self.codes[-1][1].extend([0x4C, address.low_byte().value, address.high_byte().value])
+        address = Integer(is_word=True, value=self.code_offset)
+        self.codes[-1][1].extend([ENCODINGS['JMP'][Addressing.ABSOLUTE],
+                                  address.low_byte().value, address.high_byte().value])
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.LIST})
     def pre_byte(self, addressing: Addressing):
@@ -562,13 +955,269 @@ class Assembler(object):
         else:
             self.codes[-1][1].extend([addressing.address.low_byte().value, addressing.address.high_byte().value])
 
+    def _fill_count(self, addressing: Addressing, op: str) -> int:
+        # The count or the boundary should be known in the first pass, the fill value may use any label
+        count = addressing.address.param[0] if addressing.mode == Addressing.LIST else addressing.address
+        count = self._resolve_address_recur(count)
+        if not isinstance(count, Integer) or count.value < 0:
+            raise AssembleError(f"The count of `{op}` should be a non-negative number at line {self.line_number}")
+        return count.value
+
+    def _extend_fill(self, index, value: Integer):
+        if value.value > 0xFF:
+            raise AssembleError(f"{hex(value.value)} can not fit in a byte at line {self.line_number}")
+        self.codes[-1][1].extend([value.value] * self.code_sizes[index])
+
+    @_addressing_guard(allowed={Addressing.LIST})
+    def pre_fill(self, addressing: Addressing):
+        if len(addressing.address.param) != 2:
+            raise AssembleError(f"`.FILL` only accepts a count and a value at line {self.line_number}")
+        return self._fill_count(addressing, '.FILL')
+
+    @_assemble_guard
+    def gen_fill(self, index, addressing: Addressing):
+        self._extend_fill(index, addressing.address[1])
+
+    @_addressing_guard(allowed={Addressing.ADDRESS})
+    def pre_res(self, addressing: Addressing):
+        return self._fill_count(addressing, '.RES')
+
+    @_assemble_guard
+    def gen_res(self, index, addressing: Addressing):
+        # The reserved bytes are not emitted, the following codes start a new segment
+        pass
+
+    @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.LIST})
+    def pre_align(self, addressing: Addressing):
+        if addressing.mode == Addressing.LIST and len(addressing.address.param) != 2:
+            raise AssembleError(f"`.ALIGN` only accepts a boundary and a fill value at line {self.line_number}")
+        boundary = self._fill_count(addressing, '.ALIGN')
+        if boundary == 0:
+            raise AssembleError(f"The boundary of `.ALIGN` should be a positive number at line {self.line_number}")
+        return -self.code_offset % boundary
+
+    @_assemble_guard
+    def gen_align(self, index, addressing: Addressing):
+        if addressing.mode == Addressing.LIST:
+            self._extend_fill(index, addressing.address[1])
+        else:
+            self._extend_fill(index, Integer(is_word=False, value=0))
+
+    def _get_binary_slice(self, name: str, params: List[Integer]):
+        # Returns the path, offset and length of `.INCBIN` without reading the file
+        path = self._find_file(name)
+        size = os.path.getsize(path)
+        offset = params[0].value if len(params) > 0 else 0
+        length = params[1].value if len(params) > 1 else size - offset
+        if offset < 0 or length < 0 or offset + length > size:
+            raise AssembleError(f"The slice [{offset}, {offset + length}) is out of the file of size {size} "
+                                f"at line {self.line_number}")
+        return path, offset, length
+
+    @_addressing_guard(allowed={Addressing.STRING})
+    def pre_incbin(self, addressing: Addressing):
+        # The size should not depend on the labels, so that it is known in the first pass
+        params = addressing.address.param
+        if len(params) > 3 or not all(isinstance(param, Integer) for param in params[1:]):
+            raise AssembleError(f"`.INCBIN` only accepts a file name, a constant offset and a constant length "
+                                f"at line {self.line_number}")
+        return self._get_binary_slice(params[0].param, params[1:])[2]
+
+    @_assemble_guard
+    def gen_incbin(self, index, addressing: Addressing):
+        path, offset, length = self._get_binary_slice(addressing.address[0], addressing.address[1:])
+        if length != self.code_sizes[index]:
+            raise AssembleError(f"The size of '{path}' is changed during assembling at line {self.line_number}")
+        if length == 0:
+            return
+        with open(path, 'rb') as reader, mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            self.codes[-1][1].extend(memoryview(mapped)[offset:offset + length])
+
+    def _table_count(self, params: list, op: str) -> int:
+        # The count should be known in the first pass
+        if len(params) != 2 or not isinstance(params[1], Integer):
+            raise AssembleError(f"`{op}` only accepts an expression and a constant count at line {self.line_number}")
+        return params[1].value
+
+    def _extend_table(self, addressing: Addressing, op: str, is_word: bool):
+        expression, count = addressing.address[0], self._table_count(addressing.address, op)
+        try:
+            self.codes[-1][1].extend(evaluate_table(expression, count, is_word=is_word))
+        except ValueError as e:
+            raise AssembleError(f"{e} at line {self.line_number}")
+
+    @_addressing_guard(allowed={Addressing.STRING})
+    def pre_table(self, addressing: Addressing):
+        return self._table_count(addressing.address.param, '.TABLE')
+
+    @_assemble_guard
+    def gen_table(self, index, addressing: Addressing):
+        self._extend_table(addressing, '.TABLE', is_word=False)
+
+    @_addressing_guard(allowed={Addressing.STRING})
+    def pre_wtable(self, addressing: Addressing):
+        return self._table_count(addressing.address.param, '.WTABLE') * 2
+
+    @_assemble_guard
+    def gen_wtable(self, index, addressing: Addressing):
+        self._extend_table(addressing, '.WTABLE', is_word=True)
+
+    @_addressing_guard(allowed={Addressing.IMPLIED})
+    def pre_macro(self, addressing: Addressing):
+        # The labels of the expanded macros and blocks
+        return 0
+
+    @_assemble_guard
+    def gen_macro(self, index, addressing: Addressing):
+        pass
+
+    def pre_rept(self, addressing: Addressing, op_name: str):
+        # The size is the count times the size of the instructions if the variable is not used in the block
+        count, variable, body = self._block_params(addressing)
+        line = self.line_number, self.file_name
+        if not self._block_varying(variable, body):
+            size = count * sum(self._block_sizes(body)[0]) if count else 0
+        else:
+            size = 0
+            for i in range(count):
+                with self._block_variable(variable, i):
+                    size += sum(self._block_sizes(body)[0])
+        self.line_number, self.file_name = line
+        self.fit_zero_pages.append(False)
+        return size
+
+    def gen_rept(self, index, addressing: Addressing):
+        count, variable, body = self._block_params(addressing)
+        line = self.line_number, self.file_name
+        # The labels in the block are local to each iteration
+        labels = {inst.label for inst in body if inst.label is not None}
+        outer_labels = {label: self.label_offsets[label] for label in labels if label in self.label_offsets}
+        varying = self._block_varying(variable, body)
+        repeatable = not varying and _position_independent(body)
+        sizes = fits = None
+        for i in range(count):
+            with self._block_variable(variable, i):
+                if sizes is None or varying:
+                    sizes, fits = self._block_sizes(body)
+                offset = start = self.code_offset
+                for inst, size in zip(body, sizes):
+                    if inst.label is not None:
+                        self.label_offsets[inst.label] = offset
+                    offset += size
+                for inst, size, fit in zip(body, sizes, fits):
+                    self._generate_block_instruction(inst, size, fit)
+            if repeatable and self.code_offset > start:
+                # The following iterations have the same bytes
+                size = self.code_offset - start
+                segment = self.codes[-1][1]
+                segment.extend(segment[-size:] * (count - 1))
+                self.code_offset += size * (count - 1)
+                break
+        for label in labels:
+            self.label_offsets.pop(label, None)
+        self.label_offsets.update(outer_labels)
+        self.line_number, self.file_name = line
+
+    def _block_params(self, addressing: Addressing) -> tuple:
+        count, variable, body = addressing.address.param
+        count = self._resolve_address_recur(count)
+        if not isinstance(count, Integer) or count.value < 0:
+            raise AssembleError(f"The count of `.REPT` should be a non-negative number at line {self.line_number}")
+        return count.value, variable, body
+
+    @staticmethod
+    def _block_varying(variable: Optional[str], body: Iterable[Instruction]) -> bool:
+        # Whether the instructions in the block depend on the variable
+        if variable is None:
+            return False
+        labels = set()
+        for inst in body:
+            _collect_references(inst.addressing.address, labels)
+        return variable in labels
+
+    @contextmanager
+    def _block_variable(self, variable: Optional[str], i: int):
+        # The variable is resolved before the labels, and the variable of the outer block is restored
+        if variable is None:
+            yield
+            return
+        outer = self.block_variables.get(variable)
+        self.block_variables[variable] = Integer(is_word=i > 0xFF, value=i)
+        try:
+            yield
+        finally:
+            if outer is None:
+                del self.block_variables[variable]
+            else:
+                self.block_variables[variable] = outer
+
+    def _block_code_start(self, addressing: Addressing) -> Optional[int]:
+        # The offset of the first instruction that can be executed in the block
+        count, variable, body = self._block_params(addressing)
+        if count == 0:
+            return None
+        offset = 0
+        with self._block_variable(variable, 0):
+            for inst, size in zip(body, self._block_sizes(body)[0]):
+                if inst.op in Instruction.KEYWORDS:
+                    return offset
+                if inst.op == '.REPT':
+                    start = self._block_code_start(inst.addressing)
+                    if start is not None:
+                        return offset + start
+                offset += size
+        return None
+
+    def _block_sizes(self, body: Iterable[Instruction]) -> tuple:
+        # The sizes and the zero-page fits of the instructions in the block, the instructions are not placed
+        sizes, fits = [], []
+        for inst in body:
+            self.line_number, self.file_name = inst.line_num, inst.file_name
+            sizes.append(self._instruction_size(inst))
+            fits.append(self.fit_zero_pages.pop())
+        return sizes, fits
+
+    def _generate_block_instruction(self, inst: Instruction, size: int, fit: bool):
+        # The instruction uses a temporary index
+        index, offset = len(self.code_offsets), self.code_offset
+        self.code_offsets.append(offset)
+        self.code_sizes.append(size)
+        self.fit_zero_pages.append(fit)
+        try:
+            self._generate_instruction(index, inst)
+        finally:
+            del self.code_offsets[index:], self.code_sizes[index:], self.fit_zero_pages[index:]
+        self.code_offset = offset + size
+
+    @_addressing_guard(allowed={Addressing.IMPLIED})
+    def pre_hot(self, addressing: Addressing):
+        # The regions where the page crossings are checked
+        return 0
+
+    @_assemble_guard
+    def gen_hot(self, index, addressing: Addressing):
+        pass
+
+    @_addressing_guard(allowed={Addressing.IMPLIED})
+    def pre_endhot(self, addressing: Addressing):
+        return 0
+
+    @_assemble_guard
+    def gen_endhot(self, index, addressing: Addressing):
+        pass
+
+    def pre_section(self, addressing: Addressing, op_name: str):
+        raise AssembleError(f"`.SECTION` is only allowed when the sections are placed by `assemble_sections` "
+                            f"at line {self.line_number}")
+
     @_addressing_guard(allowed={Addressing.IMPLIED})
     def pre_brk(self, addressing: Addressing):
         return self.brk_size
 
     @_assemble_guard
     def gen_brk(self, index, addressing: Addressing):
-        for i in range(self.brk_size):
+        self._extend_byte(ENCODINGS['BRK'][Addressing.IMPLIED])
+        for i in range(self.brk_size - 1):
             self._extend_byte(0x00)
 
     @_addressing_guard(allowed={Addressing.IMPLIED, Addressing.IMMEDIATE, Addressing.ADDRESS, Addressing.INDEXED})
@@ -581,22 +1230,23 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_nop(self, index, addressing: Addressing):
+        code_map = ENCODINGS['NOP']
         if addressing.mode == Addressing.IMPLIED:
-            self._extend_byte(0xEA)
+            self._extend_byte(code_map[Addressing.IMPLIED])
         elif addressing.mode == Addressing.IMMEDIATE:
-            self._extend_byte_address(0x80, addressing)
+            self._extend_byte_address(code_map[Addressing.IMMEDIATE], addressing)
         elif addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0x04, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0x0C, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'Y':
                 raise AssembleError(f"Can not use Y as the index register in NOP at line {self.line_number}")
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0x14, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE_X], addressing)
             else:
-                self._extend_word_address(0x1C, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE_X], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.INDIRECT})
     def pre_jmp(self, addressing: Addressing):
@@ -604,10 +1254,11 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_jmp(self, index, addressing: Addressing):
+        code_map = ENCODINGS['JMP']
         if addressing.mode == Addressing.ADDRESS:
-            self._extend_word_address(0x4C, addressing)
+            self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDIRECT:
-            self._extend_word_address(0x6C, addressing)
+            self._extend_word_address(code_map[Addressing.INDIRECT], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS})
     def pre_jsr(self, addressing: Addressing):
@@ -615,7 +1266,7 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_jsr(self, index, addressing: Addressing):
-        self._extend_word_address(0x20, addressing)
+        self._extend_word_address(ENCODINGS['JSR'][Addressing.ABSOLUTE], addressing)
 
     @_addressing_guard(allowed={Addressing.IMMEDIATE, Addressing.ADDRESS, Addressing.INDEXED})
     def pre_ldx(self, addressing: Addressing):
@@ -625,20 +1276,21 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_ldx(self, index, addressing: Addressing):
+        code_map = ENCODINGS['LDX']
         if addressing.mode == Addressing.IMMEDIATE:
-            self._extend_byte_address(0xA2, addressing)
+            self._extend_byte_address(code_map[Addressing.IMMEDIATE], addressing)
         elif addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xA6, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xAE, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'X':
                 raise AssembleError(f"Can not use X as the index register in LDX at line {self.line_number}")
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xB6, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE_Y], addressing)
             else:
-                self._extend_word_address(0xBE, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE_Y], addressing)
 
     @_addressing_guard(allowed={Addressing.IMMEDIATE, Addressing.ADDRESS, Addressing.INDEXED})
     def pre_ldy(self, addressing: Addressing):
@@ -648,20 +1300,21 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_ldy(self, index, addressing: Addressing):
+        code_map = ENCODINGS['LDY']
         if addressing.mode == Addressing.IMMEDIATE:
-            self._extend_byte_address(0xA0, addressing)
+            self._extend_byte_address(code_map[Addressing.IMMEDIATE], addressing)
         elif addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xA4, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xAC, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'Y':
                 raise AssembleError(f"Can not use Y as the index register in LDY at line {self.line_number}")
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xB4, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE_X], addressing)
             else:
-                self._extend_word_address(0xBC, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE_X], addressing)
 
     @_addressing_guard(allowed={Addressing.IMMEDIATE, Addressing.ADDRESS, Addressing.INDEXED,
                                 Addressing.INDIRECT_INDEXED, Addressing.INDEXED_INDIRECT})
@@ -672,24 +1325,25 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_lax(self, index, addressing: Addressing):
+        code_map = ENCODINGS['LAX']
         if addressing.mode == Addressing.IMMEDIATE:
-            self._extend_byte_address(0xAB, addressing)
+            self._extend_byte_address(code_map[Addressing.IMMEDIATE], addressing)
         elif addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xA7, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xAF, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'X':
                 raise AssembleError(f"Can not use X as the index register in LAX at line {self.line_number}")
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xB7, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE_Y], addressing)
             else:
-                self._extend_word_address(0xBF, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE_Y], addressing)
         elif addressing.mode == Addressing.INDEXED_INDIRECT:
-            self._extend_byte_address(0xA3, addressing)
+            self._extend_byte_address(code_map[Addressing.INDEXED_INDIRECT], addressing)
         elif addressing.mode == Addressing.INDIRECT_INDEXED:
-            self._extend_byte_address(0xB3, addressing)
+            self._extend_byte_address(code_map[Addressing.INDIRECT_INDEXED], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.INDEXED})
     def pre_stx(self, addressing: Addressing):
@@ -697,18 +1351,19 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_stx(self, index, addressing: Addressing):
+        code_map = ENCODINGS['STX']
         if addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0x86, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0x8E, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'X':
                 raise AssembleError(f"Can not use X as the index register in STX at line {self.line_number}")
             if addressing.address.value > 0xFF:
                 raise AssembleError(f"Absolute indexed addressing is not allowed for STX "
                                     f"at line {self.line_number}")
-            self._extend_byte_address(0x96, addressing)
+            self._extend_byte_address(code_map[Addressing.ZERO_PAGE_Y], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.INDEXED})
     def pre_sty(self, addressing: Addressing):
@@ -716,18 +1371,19 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_sty(self, index, addressing: Addressing):
+        code_map = ENCODINGS['STY']
         if addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0x84, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0x8C, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'Y':
                 raise AssembleError(f"Can not use Y as the index register in STY at line {self.line_number}")
             if addressing.address.value > 0xFF:
                 raise AssembleError(f"Absolute indexed addressing is not allowed for STY "
                                     f"at line {self.line_number}")
-            self._extend_byte_address(0x94, addressing)
+            self._extend_byte_address(code_map[Addressing.ZERO_PAGE_X], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.INDEXED, Addressing.INDEXED_INDIRECT})
     def pre_sax(self, addressing: Addressing):
@@ -737,20 +1393,21 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_sax(self, index, addressing: Addressing):
+        code_map = ENCODINGS['SAX']
         if addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0x87, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0x8F, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'X':
                 raise AssembleError(f"Can not use X as the index register in SAX at line {self.line_number}")
             if addressing.address.value > 0xFF:
                 raise AssembleError(f"Absolute indexed addressing is not allowed for SAX "
                                     f"at line {self.line_number}")
-            self._extend_byte_address(0x97, addressing)
+            self._extend_byte_address(code_map[Addressing.ZERO_PAGE_Y], addressing)
         elif addressing.mode == Addressing.INDEXED_INDIRECT:
-            self._extend_byte_address(0x83, addressing)
+            self._extend_byte_address(code_map[Addressing.INDEXED_INDIRECT], addressing)
 
     @_addressing_guard(allowed={Addressing.INDEXED, Addressing.INDIRECT_INDEXED})
     def pre_sha(self, addressing: Addressing):
@@ -758,12 +1415,13 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_sha(self, index, addressing: Addressing):
+        code_map = ENCODINGS['SHA']
         if addressing.mode == Addressing.INDEXED:
             if addressing.register == 'X':
                 raise AssembleError(f"Can not use X as the index register in SHA at line {self.line_number}")
-            self._extend_word_address(0x9F, addressing)
+            self._extend_word_address(code_map[Addressing.ABSOLUTE_Y], addressing)
         elif addressing.mode == Addressing.INDIRECT_INDEXED:
-            self._extend_byte_address(0x93, addressing)
+            self._extend_byte_address(code_map[Addressing.INDIRECT_INDEXED], addressing)
 
     @_addressing_guard(allowed={Addressing.INDEXED})
     def pre_shy(self, addressing: Addressing):
@@ -774,7 +1432,7 @@ class Assembler(object):
         if addressing.mode == Addressing.INDEXED:
             if addressing.register == 'Y':
                 raise AssembleError(f"Can not use Y as the index register in SHY at line {self.line_number}")
-            self._extend_word_address(0x9C, addressing)
+            self._extend_word_address(ENCODINGS['SHY'][Addressing.ABSOLUTE_X], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS})
     def pre_bit(self, addressing: Addressing):
@@ -782,10 +1440,11 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_bit(self, index, addressing: Addressing):
+        code_map = ENCODINGS['BIT']
         if self.fit_zero_pages[index]:
-            self._extend_byte_address(0x24, addressing)
+            self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
         else:
-            self._extend_word_address(0x2C, addressing)
+            self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
 
     @_addressing_guard(allowed={Addressing.IMMEDIATE, Addressing.ADDRESS})
     def pre_cpx(self, addressing: Addressing):
@@ -795,13 +1454,14 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_cpx(self, index, addressing: Addressing):
+        code_map = ENCODINGS['CPX']
         if addressing.mode == Addressing.IMMEDIATE:
-            self._extend_byte_address(0xE0, addressing)
+            self._extend_byte_address(code_map[Addressing.IMMEDIATE], addressing)
         elif addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xE4, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xEC, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
 
     @_addressing_guard(allowed={Addressing.IMMEDIATE, Addressing.ADDRESS})
     def pre_cpy(self, addressing: Addressing):
@@ -811,13 +1471,14 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_cpy(self, index, addressing: Addressing):
+        code_map = ENCODINGS['CPY']
         if addressing.mode == Addressing.IMMEDIATE:
-            self._extend_byte_address(0xC0, addressing)
+            self._extend_byte_address(code_map[Addressing.IMMEDIATE], addressing)
         elif addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xC4, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xCC, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.INDEXED})
     def pre_inc(self, addressing: Addressing):
@@ -825,18 +1486,19 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_inc(self, index, addressing: Addressing):
+        code_map = ENCODINGS['INC']
         if addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xE6, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xEE, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'Y':
                 raise AssembleError(f"Can not use Y as the index register in INC at line {self.line_number}")
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xF6, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE_X], addressing)
             else:
-                self._extend_word_address(0xFE, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE_X], addressing)
 
     @_addressing_guard(allowed={Addressing.ADDRESS, Addressing.INDEXED})
     def pre_dec(self, addressing: Addressing):
@@ -844,15 +1506,16 @@ class Assembler(object):
 
     @_assemble_guard
     def gen_dec(self, index, addressing: Addressing):
+        code_map = ENCODINGS['DEC']
         if addressing.mode == Addressing.ADDRESS:
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xC6, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE], addressing)
             else:
-                self._extend_word_address(0xCE, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE], addressing)
         elif addressing.mode == Addressing.INDEXED:
             if addressing.register == 'Y':
                 raise AssembleError(f"Can not use Y as the index register in DEC at line {self.line_number}")
             if self.fit_zero_pages[index]:
-                self._extend_byte_address(0xD6, addressing)
+                self._extend_byte_address(code_map[Addressing.ZERO_PAGE_X], addressing)
             else:
-                self._extend_word_address(0xDE, addressing)
+                self._extend_word_address(code_map[Addressing.ABSOLUTE_X], addressing)
@@ -0,0 +1,70 @@
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Union, List, Dict
+
+from .grammar import parse_source
+from .assemble import Assembler, AssembleError
+
+
+__all__ = ['assemble_configs']
+
+
+def _check_memory(assembler: Assembler, max_ends: List[int], instructions: List):
+    index = bisect_left(max_ends, assembler.max_memory)
+    if index < len(max_ends):
+        assembler.file_name = instructions[index].file_name
+        raise assembler._file_error(AssembleError(f"The assembled code will exceed the "
+                                                  f"max memory {hex(assembler.max_memory)} "
+                                                  f"at line {instructions[index].line_num}"))
+
+
+def assemble_configs(instructions: Union[str, List],
+                     configs: List[Dict]) -> List[List]:
+    groups = {}
+    for i, config in enumerate(configs):
+        options = dict(config)
+        add_entry = options.pop('add_entry', True)
+        assembler = Assembler(**options)
+        key = (assembler.brk_size, tuple(assembler.include_paths), tuple(sorted(assembler.defines.items())))
+        groups.setdefault(key, []).append((i, assembler, add_entry))
+    results = [None] * len(configs)
+    for (brk_size, include_paths, defines), group in groups.items():
+        # Only the size of `BRK`, the included files and the conditions can change the layout,
+        # the other options share the two passes
+        layout = Assembler(max_memory=max(assembler.max_memory for _, assembler, _ in group),
+                           brk_size=brk_size,
+                           include_paths=include_paths,
+                           include_cache=group[0][1].include_cache,
+                           defines=dict(defines))
+        # The code is parsed for each group as the conditions depend on the defines
+        included = parse_source(instructions, layout.defines) if isinstance(instructions, str) else instructions
+        error = None
+        try:
+            included = layout._include(included)
+            layout._preprocess(included)
+            layout._generate(included)
+        except AssembleError as e:
+            error = layout._file_error(e)
+        max_ends = list(accumulate(map(sum, zip(layout.code_offsets, layout.code_sizes)), max))
+        for i, assembler, add_entry in group:
+            _check_memory(assembler, max_ends, included)
+            if error is not None:
+                raise error
+            # The layout is copied so that the assemblers of the configurations do not share mutable states
+            assembler.code_start = layout.code_start
+            assembler.code_offsets = list(layout.code_offsets)
+            assembler.fit_zero_pages = list(layout.fit_zero_pages)
+            assembler.code_sizes = list(layout.code_sizes)
+            assembler.label_offsets = dict(layout.label_offsets)
+            assembler.codes = [(offset, list(codes)) for offset, codes in layout.codes]
+            if assembler.strict_pages:
+                assembler.label_references = {label: list(indices) for label, indices
+                                              in layout.label_references.items()}
+                try:
+                    assembler._check_pages(included)
+                except AssembleError as e:
+                    raise assembler._file_error(e)
+            if add_entry:
+                assembler._add_entry()
+            results[i] = assembler.codes
+    return results
@@ -0,0 +1,140 @@
+import os
+import pickle
+import struct
+import hashlib
+from typing import Optional
+
+from . import __version__
+
+
+__all__ = ['BuildCache']
+
+
+class BuildCache(object):
+
+    MAGIC = b'A65C'
+    FORMAT = 1
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+    _HEADER = struct.Struct('<4sB32s')  # Magic, format and the SHA-256 of the payload
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size  # The entries are evicted from the least recently used when exceeded
+        self.hits = {}  # The number of hits of each kind of entries
+        self.misses = {}  # The number of misses of each kind of entries
+        self.evictions = 0
+        self._total_size = None  # The total size of the entries, scanned when first needed
+
+    def get(self, kind: str, *parts):
+        path = self._path(kind, parts)
+        try:
+            with open(path, 'rb') as reader:
+                data = reader.read()
+        except OSError:
+            return self._miss(kind)
+        found, value = self._decode(data)
+        if not found:
+            self._remove(path)
+            return self._miss(kind)
+        try:
+            # The modification time is the last used time
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits[kind] = self.hits.get(kind, 0) + 1
+        return value
+
+    def put(self, kind: str, value, *parts):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(kind, parts)
+        payload = pickle.dumps((__version__, kind, parts, value), protocol=pickle.HIGHEST_PROTOCOL)
+        data = self._HEADER.pack(self.MAGIC, self.FORMAT, hashlib.sha256(payload).digest()) + payload
+        total_size = self._get_total_size()
+        if os.path.exists(path):
+            total_size -= os.path.getsize(path)
+        # Write to a temporary file first so that a concurrent build never reads a partial entry
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as writer:
+            writer.write(data)
+        os.replace(temp_path, path)
+        self._total_size = total_size + len(data)
+        if self._total_size > self.max_size:
+            self._evict()
+
+    def clear(self):
+        for name in self._entry_names():
+            self._remove(os.path.join(self.cache_dir, name))
+        self._total_size = 0
+
+    def report(self) -> str:
+        kinds = sorted(set(self.hits.keys()) | set(self.misses.keys()))
+        stats = [f'{kind} {self.hits.get(kind, 0)} hits, {self.misses.get(kind, 0)} misses' for kind in kinds]
+        stats.append(f'{self.evictions} evictions')
+        return 'Build cache: ' + '; '.join(stats)
+
+    def _path(self, kind: str, parts: tuple) -> str:
+        key = hashlib.sha256(repr((self.FORMAT, __version__, kind, parts)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{key}.entry')
+
+    def _decode(self, data: bytes):
+        if len(data) < self._HEADER.size:
+            return False, None
+        magic, version, checksum = self._HEADER.unpack_from(data)
+        payload = data[self._HEADER.size:]
+        if magic != self.MAGIC or version != self.FORMAT or hashlib.sha256(payload).digest() != checksum:
+            return False, None
+        try:
+            package_version, _, _, value = pickle.loads(payload)
+        except (pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+            return False, None
+        if package_version != __version__:
+            return False, None
+        return True, value
+
+    def _miss(self, kind: str) -> Optional[object]:
+        self.misses[kind] = self.misses.get(kind, 0) + 1
+        return None
+
+    def _entry_names(self):
+        try:
+            return [name for name in os.listdir(self.cache_dir) if name.endswith('.entry')]
+        except OSError:
+            return []
+
+    def _get_total_size(self) -> int:
+        if self._total_size is None:
+            self._total_size = 0
+            for name in self._entry_names():
+                try:
+                    self._total_size += os.path.getsize(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return self._total_size
+
+    def _evict(self):
+        # Evicts down to 90% of the limit, so that the directory is not scanned for every new entry
+        entries = []
+        for name in self._entry_names():
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self.max_size * 0.9:
+                break
+            self._remove(path)
+            total_size -= size
+            self.evictions += 1
+        self._total_size = total_size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
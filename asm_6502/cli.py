@@ -0,0 +1,211 @@
+import os
+import sys
+import argparse
+from typing import Optional, List
+
+from .grammar import ParseError
+from .include import IncludeCache
+from .assemble import Assembler, AssembleError
+from .pages import PageCrossing
+from .output import OUTPUT_FORMATS, write_image
+from .patch import create_ips, create_bps
+from .symbols import SYMBOL_FORMATS
+
+
+__all__ = ['main']
+
+
+_EXTENSIONS = {
+    '.bin': 'raw',
+    '.rom': 'flat',
+    '.hex': 'ihex',
+    '.ihx': 'ihex',
+    '.srec': 'srec',
+    '.s19': 'srec',
+    '.mot': 'srec',
+    '.ips': 'ips',
+    '.bps': 'bps',
+}
+
+_DEFAULT_EXTENSIONS = {
+    'raw': '.bin',
+    'flat': '.rom',
+    'ihex': '.hex',
+    'srec': '.srec',
+    'ips': '.ips',
+    'bps': '.bps',
+}
+
+_SYMBOL_EXTENSIONS = {
+    '.lbl': 'vice',
+    '.vs': 'vice',
+    '.nl': 'fceux',
+    '.sym': 'sym',
+}
+
+_PATCH_FORMATS = {
+    'ips': create_ips,
+    'bps': create_bps,
+}
+
+
+def _integer(text: str) -> int:
+    # Accepts the numbers in the notation of the assembler and Python
+    if text.startswith('$'):
+        return int(text[1:], 16)
+    if text.startswith('%'):
+        return int(text[1:], 2)
+    return int(text, 0)
+
+
+def _define(text: str) -> tuple:
+    name, _, value = text.partition('=')
+    return name, _integer(value) if value else 1
+
+
+def _parse_args(argv: Optional[List[str]]):
+    parser = argparse.ArgumentParser(prog='asm_6502', description='Assemble a 6502 source file.')
+    parser.add_argument('source', nargs='?', default='-', help="the source file, '-' for stdin")
+    parser.add_argument('-o', '--output', help="the output file, '-' for stdout, "
+                                               "the default is the source with the extension of the format")
+    parser.add_argument('-f', '--format', choices=sorted(OUTPUT_FORMATS) + sorted(_PATCH_FORMATS),
+                        help='the output format, the default is decided by the extension of the output or raw')
+    parser.add_argument('-I', '--include', action='append', default=[], dest='include_paths', metavar='PATH',
+                        help='the directories of the included files')
+    parser.add_argument('-D', '--define', action='append', default=[], type=_define, dest='defines',
+                        metavar='NAME[=VALUE]', help='the names used by the conditions, the default value is 1')
+    parser.add_argument('--no-entry', action='store_true', help='do not write the address of the program entry')
+    parser.add_argument('--program-entry', type=_integer, default=0xFFFC, help='the address of the program entry')
+    parser.add_argument('--brk-size', type=int, choices=[1, 2], default=2, help='the size of BRK')
+    parser.add_argument('--max-memory', type=_integer, default=0x10000, help='the size of the memory')
+    parser.add_argument('--fill', type=_integer, default=0x00, help='the byte of the gaps in raw and flat outputs')
+    parser.add_argument('--patch-from', metavar='IMAGE',
+                        help='the previous flat image, the ips and bps outputs are the patches from it')
+    parser.add_argument('--source-map', metavar='PATH', help='write the binary source map of the addresses and lines')
+    parser.add_argument('--symbols', metavar='PATH', help='write the labels for the debuggers')
+    parser.add_argument('--listing', metavar='PATH',
+                        help='write the listing of the addresses, bytes and cycles of the instructions')
+    parser.add_argument('--symbol-format', choices=sorted(SYMBOL_FORMATS),
+                        help='the format of the labels, the default is decided by the extension or sym')
+    parser.add_argument('--page-crossings', action='store_true',
+                        help='print the branches and the table accesses that cross pages to stderr')
+    parser.add_argument('--strict-pages', action='store_true',
+                        help='the page crossings in the `.HOT` regions are errors')
+    parser.add_argument('--cache-dir', help='the directory of the build cache, the statistics are printed to stderr')
+    return parser.parse_args(argv)
+
+
+def _output_format(args) -> str:
+    if args.format is not None:
+        return args.format
+    if args.output is not None and args.output != '-':
+        return _EXTENSIONS.get(os.path.splitext(args.output)[1].lower(), 'raw')
+    return 'raw'
+
+
+def _write(args, output_format: str, assembler: Assembler, stream):
+    if output_format in _PATCH_FORMATS:
+        with open(args.patch_from, 'rb') as reader:
+            previous = reader.read()
+        stream.write(_PATCH_FORMATS[output_format](previous, assembler.codes, fill=args.fill, size=args.max_memory))
+        return
+    writer = OUTPUT_FORMATS[output_format]
+    if output_format in {'raw', 'flat'}:
+        kwargs = {'fill': args.fill}
+        if output_format == 'flat':
+            kwargs['size'] = args.max_memory
+        writer(assembler.codes, stream, **kwargs)
+    elif output_format == 'srec':
+        writer(assembler.codes, stream, entry=max(assembler.code_start, 0))
+    else:
+        writer(assembler.codes, stream)
+
+
+def _format_crossing(crossing: PageCrossing) -> str:
+    location = f"{crossing.file_name or '-'}:{crossing.line_num}"
+    if crossing.kind == PageCrossing.BRANCH:
+        return f"{location}: the branch at ${crossing.address:04X} to ${crossing.target:04X} crosses a page"
+    return f"{location}: the access at ${crossing.address:04X} to the table '{crossing.label}' crosses a page"
+
+
+def _write_listing(path: str, assembler: Assembler, main_source: Optional[str]):
+    # The source lines are read from the main source and the included files
+    listing = assembler.listing()
+    sources = {None: main_source}
+    for file_name in {entry.file_name for entry in listing.entries} - {None}:
+        try:
+            with open(file_name, encoding='utf-8') as reader:
+                sources[file_name] = reader.read()
+        except (OSError, UnicodeDecodeError):
+            pass
+    with open(path, 'w', encoding='utf-8') as writer:
+        writer.write(listing.format(sources))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    output_format = _output_format(args)
+    if output_format in _PATCH_FORMATS and args.patch_from is None:
+        print(f"The {output_format} output needs the previous image from `--patch-from`", file=sys.stderr)
+        return 1
+    include_cache = None if args.cache_dir is None else IncludeCache(args.cache_dir)
+    try:
+        return _build(args, output_format, include_cache)
+    finally:
+        # The statistics are also reported when the build fails
+        if include_cache is not None:
+            print(include_cache.report(), file=sys.stderr)
+
+
+def _build(args, output_format: str, include_cache: Optional[IncludeCache]) -> int:
+    assembler = Assembler(max_memory=args.max_memory,
+                          program_entry=args.program_entry,
+                          brk_size=args.brk_size,
+                          include_paths=args.include_paths or None,
+                          include_cache=include_cache,
+                          defines=dict(args.defines),
+                          strict_pages=args.strict_pages)
+    main_source = None
+    try:
+        if args.source == '-':
+            main_source = sys.stdin.read()
+            assembler.assemble(main_source, add_entry=not args.no_entry)
+        else:
+            assembler.assemble_file(args.source, add_entry=not args.no_entry)
+    except (ParseError, AssembleError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    except UnicodeDecodeError as e:
+        print(f"The source is not UTF-8: {e}", file=sys.stderr)
+        return 1
+
+    output = args.output
+    if output is None:
+        output = '-' if args.source == '-' else os.path.splitext(args.source)[0] + _DEFAULT_EXTENSIONS[output_format]
+    try:
+        if output == '-':
+            _write(args, output_format, assembler, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+        elif output_format == 'flat':
+            # The image file is written in place, the gaps are not written when the fill byte is zero
+            write_image(assembler.codes, output, fill=args.fill, size=args.max_memory)
+        else:
+            with open(output, 'wb', buffering=1 << 16) as writer:
+                _write(args, output_format, assembler, writer)
+        if args.source_map is not None:
+            with open(args.source_map, 'wb') as writer:
+                writer.write(assembler.source_map().to_bytes())
+        if args.symbols is not None:
+            symbol_format = args.symbol_format or \
+                _SYMBOL_EXTENSIONS.get(os.path.splitext(args.symbols)[1].lower(), 'sym')
+            with open(args.symbols, 'wb') as writer:
+                SYMBOL_FORMATS[symbol_format](assembler.symbol_index(), writer)
+        if args.listing is not None:
+            _write_listing(args.listing, assembler, main_source)
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.page_crossings:
+        for crossing in assembler.page_crossings():
+            print(_format_crossing(crossing), file=sys.stderr)
+    return 0
@@ -0,0 +1,249 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from typing import List, Optional, Iterable, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .grammar import Addressing
+from .opcodes import OPCODES, ENCODINGS
+
+
+__all__ = ['Disassembled', 'decode_table', 'disassemble', 'format_instruction', 'format_disassembly',
+           'instruction_lengths', 'instruction_chains', 'code_regions']
+
+
+class Disassembled(namedtuple('Disassembled', ['address', 'op', 'mode', 'operand', 'size'])):
+    # The operand is the address of the target for the branches and the value of the byte for `.BYTE`
+
+    __slots__ = ()
+
+
+_OPERAND_FORMATS = {
+    Addressing.IMPLIED: '',
+    Addressing.ACCUMULATOR: ' A',
+    Addressing.IMMEDIATE: ' #${:02X}',
+    Addressing.ZERO_PAGE: ' ${:02X}',
+    Addressing.ZERO_PAGE_X: ' ${:02X},X',
+    Addressing.ZERO_PAGE_Y: ' ${:02X},Y',
+    Addressing.ABSOLUTE: ' ${:04X}',
+    Addressing.ABSOLUTE_X: ' ${:04X},X',
+    Addressing.ABSOLUTE_Y: ' ${:04X},Y',
+    Addressing.INDIRECT: ' (${:04X})',
+    Addressing.INDEXED_INDIRECT: ' (${:02X},X)',
+    Addressing.INDIRECT_INDEXED: ' (${:02X}),Y',
+    Addressing.RELATIVE: ' ${:04X}',
+    Addressing.LIST: ' ${:02X}',
+}
+
+_STOPS = {'RTS', 'RTI', 'BRK', 'JAM', 'JMP'}  # The instructions that do not continue to the next one
+_COVERED = [b'\x01' * size for size in range(4)]
+
+# How the instructions change the control flow, the instructions after the jumps and the stops are not reached
+_FLOW_NEXT, _FLOW_BRANCH, _FLOW_CALL, _FLOW_JUMP, _FLOW_STOP = range(5)
+
+
+@lru_cache(maxsize=2)
+def decode_table(brk_size: int = 2) -> tuple:
+    # The mnemonic, the mode and the size of each opcode, None for the opcodes that are not generated by the
+    # assembler. The encoder is derived from the same `OPCODES`, so the table always agrees with it.
+    table = [None] * 256
+    for op, codes in ENCODINGS.items():
+        for mode, code in codes.items():
+            table[code] = (op, mode, brk_size if op == 'BRK' else OPCODES[code].size)
+    return tuple(table)
+
+
+def _flow(op: str, mode: str) -> int:
+    if mode == Addressing.RELATIVE:
+        return _FLOW_BRANCH
+    if op in {'JMP', 'JSR'} and mode == Addressing.ABSOLUTE:
+        return _FLOW_JUMP if op == 'JMP' else _FLOW_CALL
+    return _FLOW_STOP if op in _STOPS else _FLOW_NEXT
+
+
+@lru_cache(maxsize=2)
+def _decode_entries(brk_size: int) -> list:
+    # The entries of the decode table with the kinds of the operands (none, byte, word and relative) and the flows
+    return [None if entry is None else
+            entry + (0 if entry[2] == 1 else 3 if entry[1] == Addressing.RELATIVE else entry[2] - 1,
+                     _flow(entry[0], entry[1]))
+            for entry in decode_table(brk_size)]
+
+
+def _decode(data, origin: int, start: int, end: int, entries: list, results: list):
+    # Decodes [start, end) linearly, the incomplete instruction at the end is decoded as bytes
+    new, append = tuple.__new__, results.append
+    position = start
+    while position < end:
+        entry = entries[data[position]]
+        if entry is None or position + entry[2] > end:
+            append(new(Disassembled, (origin + position, '.BYTE', Addressing.LIST, data[position], 1)))
+            position += 1
+            continue
+        op, mode, size, kind, _ = entry
+        if kind == 0:
+            operand = None
+        elif kind == 1:
+            operand = data[position + 1]
+        elif kind == 2:
+            operand = data[position + 1] | data[position + 2] << 8
+        else:
+            operand = (origin + position + 2 + (data[position + 1] ^ 0x80) - 0x80) & 0xFFFF
+        append(new(Disassembled, (origin + position, op, mode, operand, size)))
+        position += size
+
+
+def disassemble(data: bytes,
+                origin: int = 0,
+                entries: Optional[Iterable[int]] = None,
+                brk_size: int = 2) -> List[Disassembled]:
+    # Without the entries, all the bytes are decoded as instructions from the start. With the entries, only the
+    # instructions reachable from the entries are decoded by following the branches, jumps and subroutine calls,
+    # the other bytes are decoded as `.BYTE`s
+    table = _decode_entries(brk_size)
+    results = []
+    if entries is None:
+        _decode(data, origin, 0, len(data), table, results)
+        return results
+    # The runs of the reachable instructions are found first, then each run is decoded linearly
+    end, runs, covered = len(data), [], bytearray(len(data))
+    pending = [entry - origin for entry in entries]
+    while pending:
+        position = start = pending.pop()
+        while 0 <= position < end and not covered[position]:
+            entry = table[data[position]]
+            if entry is None:
+                break
+            size, flow = entry[2], entry[4]
+            stop = position + size
+            if stop > end or size > 1 and (covered[position + 1] or size > 2 and covered[position + 2]):
+                break
+            covered[position:stop] = _COVERED[size]
+            if flow:
+                if flow == _FLOW_BRANCH:
+                    pending.append(position + 2 + (data[position + 1] ^ 0x80) - 0x80)
+                elif flow != _FLOW_STOP:
+                    pending.append((data[position + 1] | data[position + 2] << 8) - origin)
+                if flow >= _FLOW_JUMP:
+                    position = stop
+                    break
+            position = stop
+        if position > start:
+            runs.append((start, position))
+    new, position = tuple.__new__, 0
+    for start, stop in sorted(runs) + [(end, end)]:
+        for position in range(position, start):
+            results.append(new(Disassembled, (origin + position, '.BYTE', Addressing.LIST, data[position], 1)))
+        _decode(data, origin, start, stop, table, results)
+        position = stop
+    return results
+
+
+def format_instruction(inst: Disassembled) -> str:
+    # The source of the instruction, which is assembled to the same bytes
+    if inst.op == 'BRK':
+        return 'BRK'
+    return inst.op + _OPERAND_FORMATS[inst.mode].format(inst.operand)
+
+
+def format_disassembly(instructions: Iterable[Disassembled]) -> str:
+    # The source of the instructions, an `ORG` is inserted whenever the addresses are not continuous
+    lines, end = [], None
+    for inst in instructions:
+        if inst.address != end:
+            lines.append(f'ORG ${inst.address:04X}')
+        lines.append(f'    {format_instruction(inst)}')
+        end = inst.address + inst.size
+    return '\n'.join(lines)
+
+
+@lru_cache(maxsize=2)
+def _length_table(brk_size: int) -> bytes:
+    # The size of each opcode, 0 for the opcodes that are not generated by the assembler
+    return bytes(0 if entry is None else entry[2] for entry in decode_table(brk_size))
+
+
+@lru_cache(maxsize=2)
+def _stop_table(brk_size: int) -> bytes:
+    # Whether each opcode does not continue to the next instruction
+    return bytes(entry is not None and entry[4] >= _FLOW_JUMP for entry in _decode_entries(brk_size))
+
+
+def instruction_lengths(data: bytes, brk_size: int = 2) -> bytes:
+    # The size of the instruction at each offset, 0 if the byte is not an opcode. The bytes are translated by the
+    # table in C, which is faster than indexing a NumPy array
+    return bytes(data).translate(_length_table(brk_size))
+
+
+def instruction_chains(data: bytes, brk_size: int = 2, vectorized: Optional[bool] = None) -> Tuple[array, array]:
+    # The number of instructions decoded linearly from each offset and the offset after them. A chain stops after a
+    # jump, a return, `BRK` or `JAM`, and before a byte that is not an opcode or an instruction that is incomplete.
+    if vectorized is None:
+        vectorized = np is not None
+    size = len(data)
+    lengths = instruction_lengths(data, brk_size)
+    stops = bytes(data).translate(_stop_table(brk_size))
+    if vectorized:
+        # Pointer jumping, each step doubles the length of the chains that are followed. The offset `size` is the
+        # end of all the chains.
+        offsets = np.arange(size, dtype=np.int32)
+        nexts = offsets + np.frombuffer(lengths, dtype=np.uint8)
+        valid = (nexts > offsets) & (nexts <= size)
+        counts = np.zeros(size + 1, dtype=np.int32)
+        counts[:-1] = valid
+        ends = np.full(size + 1, size, dtype=np.int32)
+        ends[:-1] = np.where(valid, nexts, offsets)
+        jumps = np.full(size + 1, size, dtype=np.int32)
+        jumps[:-1] = np.where(valid & (np.frombuffer(stops, dtype=np.uint8) == 0), nexts, size)
+        active = np.flatnonzero(jumps != size).astype(np.int32)
+        while len(active):
+            targets = jumps.take(active)
+            counts[active] += counts.take(targets)
+            ends[active] = ends.take(targets)
+            jumps[active] = jumps.take(targets)
+            active = active[jumps.take(active) != size]
+        return array('q', counts[:-1].astype(np.int64).tobytes()), array('q', ends[:-1].astype(np.int64).tobytes())
+    counts, ends = array('q', bytes(8 * (size + 1))), array('q', range(size + 1))
+    for offset in range(size - 1, -1, -1):
+        length = lengths[offset]
+        following = offset + length
+        if length == 0 or following > size:
+            continue
+        if stops[offset]:
+            counts[offset], ends[offset] = 1, following
+        else:
+            counts[offset], ends[offset] = counts[following] + 1, ends[following]
+    return counts[:-1], ends[:-1]
+
+
+def code_regions(data: bytes,
+                 origin: int = 0,
+                 min_instructions: int = 16,
+                 brk_size: int = 2,
+                 vectorized: Optional[bool] = None) -> List[Tuple[int, int]]:
+    # The address ranges [start, end) that are likely to be codes: the chains of at least `min_instructions`
+    # instructions, found from the lowest address and without overlapping
+    if vectorized is None:
+        vectorized = np is not None
+    counts, ends = instruction_chains(data, brk_size, vectorized)
+    regions = []
+    if vectorized:
+        candidates = np.flatnonzero(np.frombuffer(counts, dtype=np.int64) >= min_instructions)
+        position = 0
+        while position < len(candidates):
+            start = int(candidates[position])
+            regions.append((origin + start, origin + ends[start]))
+            position = int(np.searchsorted(candidates, ends[start], side='left'))
+        return regions
+    offset = 0
+    while offset < len(data):
+        if counts[offset] >= min_instructions:
+            regions.append((origin + offset, origin + ends[offset]))
+            offset = ends[offset]
+        else:
+            offset += 1
+    return regions
@@ -1,9 +1,12 @@
+import re
+import operator
 from collections import namedtuple
+from typing import Optional, List
 
 import ply.lex as lex
 import ply.yacc as yacc
 
-__all__ = ['get_parser', 'ParseError', 'Integer', 'Addressing', 'Arithmetic', 'Instruction']
+__all__ = ['get_parser', 'parse_source', 'ParseError', 'Integer', 'Addressing', 'Arithmetic', 'Instruction']
 
 
 _PARSER = None
@@ -66,8 +69,11 @@ class Addressing(namedtuple('Addressing', ['mode', 'address', 'register'], defau
     INDEXED = 'indexed'
     INDEXED_INDIRECT = 'indexed indirect'
     INDIRECT_INDEXED = 'indirect indexed'
+    RELATIVE = 'relative'
 
     LIST = 'list'
+    STRING = 'string'
+    BLOCK = 'block'
 
 
 class Arithmetic(namedtuple('Arithmetic', ['mode', 'param'], defaults=[None, None])):
@@ -85,9 +91,12 @@ class Arithmetic(namedtuple('Arithmetic', ['mode', 'param'], defaults=[None, Non
     HIGH_BYTE = 'high_byte'
 
     LIST = 'list'
+    STRING = 'string'
+    BLOCK = 'block'
 
 
-class Instruction(namedtuple('Instruction', ['label', 'op', 'addressing', 'line_num'])):
+class Instruction(namedtuple('Instruction', ['label', 'op', 'addressing', 'line_num', 'file_name'],
+                             defaults=[None])):
 
     KEYWORDS = {
         'ADC', 'AND', 'ASL', 'BCC', 'BCS', 'BEQ', 'BIT', 'BMI', 'BNE', 'BPL', 'BRK', 'BVC', 'BVS', 'CLC',
@@ -100,7 +109,9 @@ class Instruction(namedtuple('Instruction', ['label', 'op', 'addressing', 'line_
     }
 
     PSEUDOS = {
-        'ORG', '.ORG', '.BYTE', '.WORD', '.END'
+        'ORG', '.ORG', '.BYTE', '.WORD', '.END', '.INCLUDE', '.INCBIN', '.SECTION', '.MACRO', '.ENDM',
+        '.REPT', '.ENDR', '.IF', '.IFDEF', '.IFNDEF', '.ELSE', '.ENDIF', '.FILL', '.RES', '.ALIGN',
+        '.TABLE', '.WTABLE', '.HOT', '.ENDHOT'
     }
 
 
@@ -141,6 +152,7 @@ tokens = (
     'BIN',
     'DEC',
     'CHAR',
+    'STRING',
     'CUR',
     'NEWLINE',
 )
@@ -200,6 +212,12 @@ def t_CHAR(t):
     return t
 
 
+def t_STRING(t):
+    r"""\"[^\"\n\r]*\""""
+    t.value = t.value[1:-1]
+    return t
+
+
 t_CUR = r'\*'
 
 t_ignore = " \t"
@@ -330,6 +348,32 @@ def p_stat_val_list(p):
     return p
 
 
+def p_stat_val_string(p):
+    """stat_val : STRING
+                | STRING ',' arithmetic_list"""
+    params = [Arithmetic(Arithmetic.STRING, p[1])]
+    if len(p) == 4:
+        params += p[3].param
+    p[0] = Addressing(Addressing.STRING, address=Arithmetic(Arithmetic.LIST, params))
+    return p
+
+
+def p_stat_val_names(p):
+    """stat_val : LABEL label_list"""
+    p[0] = Addressing(Addressing.LIST, address=Arithmetic(Arithmetic.LIST, [Arithmetic(Arithmetic.LABEL, p[1])] + p[2]))
+    return p
+
+
+def p_label_list(p):
+    """label_list : LABEL ',' label_list
+                  | LABEL"""
+    if len(p) == 2:
+        p[0] = [Arithmetic(Arithmetic.LABEL, p[1])]
+    else:
+        p[0] = [Arithmetic(Arithmetic.LABEL, p[1])] + p[3]
+    return p
+
+
 def p_arithmetic_list(p):
     """arithmetic_list : arithmetic ',' arithmetic_list
                        | arithmetic"""
@@ -417,10 +461,117 @@ def p_error(p):
         raise ParseError(f"Syntax error at EOF")
 
 
-def get_parser(debug=False):
+def get_parser(debug=False, lineno=1):
     global _PARSER, _LEXER
     if _PARSER is None:
         _LEXER = lex.lex(debug=debug)
         _PARSER = yacc.yacc(debug=debug)
-    _LEXER.lineno = 1
+    _LEXER.lineno = lineno
     return _PARSER
+
+
+# Conditional assembly
+_CONDITION = re.compile(r'\.(?:IFDEF|IFNDEF|IF|ELSE|ENDIF)(?![a-zA-Z0-9_])', re.IGNORECASE)
+_CONDITION_PREFIX = re.compile(r'[ \t]*(?:([a-zA-Z_][a-zA-Z0-9_]*)[ \t]+)?')
+
+
+def _find_conditions(code: str):
+    # The directives are searched by the literal part first, which is much faster than matching each line start,
+    # then the text before a directive in the same line should be empty or a label
+    position = 0
+    for match in _CONDITION.finditer(code):
+        if match.start() < position:
+            continue
+        line_start = max(code.rfind('\n', 0, match.start()), code.rfind('\r', 0, match.start())) + 1
+        prefix = _CONDITION_PREFIX.fullmatch(code, line_start, match.start())
+        if prefix is None:
+            continue
+        line_end = len(code)
+        for newline in ('\n', '\r'):
+            index = code.find(newline, match.end())
+            if index >= 0:
+                line_end = min(line_end, index)
+        position = line_end
+        yield line_start, line_end, prefix.group(1), match.group(0).upper()
+
+
+_CONDITION_OPS = {
+    Arithmetic.ADD: operator.add,
+    Arithmetic.SUB: operator.sub,
+    Arithmetic.MUL: operator.mul,
+    Arithmetic.DIV: operator.floordiv,
+}
+
+
+def _evaluate_condition(arithmetic, defines: dict, line_num: int) -> Integer:
+    if isinstance(arithmetic, Integer):
+        return arithmetic
+    if arithmetic.mode == Arithmetic.LABEL:
+        if arithmetic.param not in defines:
+            raise ParseError(f"Can not resolve '{arithmetic.param}' in the condition at line {line_num}")
+        value = int(defines[arithmetic.param])
+        return Integer(is_word=value > 0xFF, value=value)
+    if arithmetic.mode in _CONDITION_OPS:
+        left = _evaluate_condition(arithmetic.param[0], defines, line_num)
+        right = _evaluate_condition(arithmetic.param[1], defines, line_num)
+        if arithmetic.mode == Arithmetic.DIV and right.value == 0:
+            raise ParseError(f"Division by zero in the condition at line {line_num}")
+        return _CONDITION_OPS[arithmetic.mode](left, right)
+    if arithmetic.mode == Arithmetic.NEG:
+        return -_evaluate_condition(arithmetic.param, defines, line_num)
+    if arithmetic.mode == Arithmetic.LOW_BYTE:
+        return _evaluate_condition(arithmetic.param, defines, line_num).low_byte()
+    if arithmetic.mode == Arithmetic.HIGH_BYTE:
+        return _evaluate_condition(arithmetic.param, defines, line_num).high_byte()
+    raise ParseError(f"The condition should be a constant at line {line_num}")
+
+
+def _condition(op: str, line: str, defines: dict, line_num: int) -> bool:
+    # Only the lines of the conditions in the assembled code are parsed
+    inst = get_parser(lineno=line_num).parse(line)[0]
+    addressing = inst.addressing
+    if op == '.IF':
+        if addressing.mode != Addressing.ADDRESS:
+            raise ParseError(f"`.IF` only accepts an expression at line {line_num}")
+        return _evaluate_condition(addressing.address, defines, line_num).value != 0
+    if addressing.mode != Addressing.ADDRESS or not isinstance(addressing.address, Arithmetic) or \
+            addressing.address.mode != Arithmetic.LABEL:
+        raise ParseError(f"`{op}` only accepts a name at line {line_num}")
+    return (addressing.address.param in defines) == (op == '.IFDEF')
+
+
+def parse_source(code: str, defines: Optional[dict] = None) -> List[Instruction]:
+    # Parses the code with conditional assembly, the lines in the untaken branches are only scanned for the
+    # conditions and are not tokenized, the names in the conditions are resolved with the defines
+    matches = list(_find_conditions(code))
+    if not matches:
+        return get_parser().parse(code)
+    defines = defines or {}
+    pieces, position, line_num = [], 0, 1
+    active, branches = True, []  # Whether the outer branch is taken, whether the condition is true, the line
+    for start, end, label, op in matches:
+        text = code[position:start]
+        line_num += text.count('\n')
+        pieces.append(text if active else '\n' * text.count('\n'))
+        position = end
+        if active and label is not None:
+            raise ParseError(f"Label is not allowed for `{op}` at line {line_num}")
+        if op in {'.IF', '.IFDEF', '.IFNDEF'}:
+            taken = active and _condition(op, code[start:end], defines, line_num)
+            branches.append((active, taken, line_num))
+            active = taken
+        elif not branches:
+            raise ParseError(f"`{op}` without `.IF` at line {line_num}")
+        elif op == '.ELSE':
+            outer, taken, start = branches[-1]
+            if taken is None:
+                raise ParseError(f"Multiple `.ELSE` for the `.IF` at line {start}")
+            branches[-1] = (outer, None, start)
+            active = outer and not taken
+        else:
+            active = branches.pop()[0]
+    if branches:
+        raise ParseError(f"`.IF` without `.ENDIF` at line {branches[-1][2]}")
+    text = code[position:]
+    pieces.append(text if active else '\n' * text.count('\n'))
+    return get_parser().parse(''.join(pieces))
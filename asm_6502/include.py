@@ -0,0 +1,98 @@
+import os
+import hashlib
+from typing import Optional, List
+
+from .grammar import parse_source, ParseError, Instruction
+from .cache import BuildCache
+
+
+__all__ = ['IncludeCache']
+
+
+class IncludeCache(object):
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size: int = BuildCache.DEFAULT_MAX_SIZE):
+        # The files are only cached in memory if the directory is None
+        self.build_cache = None if cache_dir is None else BuildCache(cache_dir, max_size)
+        self.entries = {}  # The stat, digest and parsed instructions of each path and defines
+        self.sizes = {}  # The sizing results of each path, digest, defines and size of `BRK`
+        self.hits = 0
+        self.misses = 0
+        self.size_hits = 0
+        self.size_misses = 0
+
+    def load(self, path: str, defines: Optional[dict] = None) -> List[Instruction]:
+        # Returns the parsed instructions of the file, the file name of the instructions is the path
+        stat = os.stat(path)
+        key = (path, self._defines_key(defines))
+        entry = self.entries.get(key)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            self.hits += 1
+            return entry[3]
+        with open(path, 'rb') as reader:
+            data = reader.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry is not None and entry[2] == digest:
+            # Only touched, the contents are the same
+            self.hits += 1
+            self.entries[key] = (stat.st_mtime_ns, stat.st_size, digest, entry[3])
+            return entry[3]
+        instructions = None
+        if self.build_cache is not None:
+            instructions = self.build_cache.get('parse', path, digest, key[1])
+        if instructions is None:
+            self.misses += 1
+            instructions = self._parse(path, data.decode('utf-8'), defines)
+            if self.build_cache is not None:
+                self.build_cache.put('parse', instructions, path, digest, key[1])
+        else:
+            self.hits += 1
+        self.entries[key] = (stat.st_mtime_ns, stat.st_size, digest, instructions)
+        return instructions
+
+    def load_sizes(self, path: str, brk_size: int, defines: Optional[dict] = None) -> Optional[list]:
+        # Returns the sizes and whether the addresses fit zero-page of the instructions of a loaded file
+        key = self._sizes_key(path, brk_size, defines)
+        sizes = self.sizes.get(key)
+        if sizes is None and self.build_cache is not None:
+            sizes = self.build_cache.get('size', *key)
+            if sizes is not None:
+                self.sizes[key] = sizes
+        if sizes is None:
+            self.size_misses += 1
+        else:
+            self.size_hits += 1
+        return sizes
+
+    def save_sizes(self, path: str, brk_size: int, sizes: list, defines: Optional[dict] = None):
+        key = self._sizes_key(path, brk_size, defines)
+        self.sizes[key] = sizes
+        if self.build_cache is not None:
+            self.build_cache.put('size', sizes, *key)
+
+    def clear(self):
+        self.entries = {}
+        self.sizes = {}
+
+    def report(self) -> str:
+        report = f'Parse cache: {self.hits} hits, {self.misses} misses; ' \
+                 f'sizing cache: {self.size_hits} hits, {self.size_misses} misses'
+        if self.build_cache is not None:
+            report += f'; {self.build_cache.evictions} evictions'
+        return report
+
+    @staticmethod
+    def _defines_key(defines: Optional[dict]) -> tuple:
+        return tuple(sorted((name, int(value)) for name, value in (defines or {}).items()))
+
+    def _sizes_key(self, path: str, brk_size: int, defines: Optional[dict]) -> tuple:
+        defines_key = self._defines_key(defines)
+        return path, self.entries[(path, defines_key)][2], defines_key, brk_size
+
+    @staticmethod
+    def _parse(path: str, code: str, defines: Optional[dict]) -> List[Instruction]:
+        try:
+            instructions = parse_source(code, defines)
+        except ParseError as e:
+            raise ParseError(f"{e.info} in '{path}'")
+        return [inst._replace(file_name=path) for inst in instructions]
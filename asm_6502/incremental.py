@@ -0,0 +1,339 @@
+from bisect import bisect_left
+from typing import Union, List
+
+from .grammar import get_parser, ParseError, Integer, Instruction
+from .source_map import SourceMap
+from .symbols import SymbolIndex
+from .listing import Listing
+from .pages import PageCrossing, find_page_crossings
+from .assemble import Assembler, AssembleError, CODE_MAP_RELATIVE, _collect_references, _layout_dependent
+
+
+__all__ = ['IncrementalParser', 'IncrementalAssembler']
+
+
+def _is_positional(inst: Instruction) -> bool:
+    use_current = _collect_references(inst.addressing.address, set())
+    return use_current or inst.op in CODE_MAP_RELATIVE or inst.op == '.END' or _layout_dependent(inst)
+
+
+def _collect_labels(inst: Instruction) -> set:
+    labels = set()
+    _collect_references(inst.addressing.address, labels)
+    return labels
+
+
+def _is_dynamic_org(inst: Instruction) -> bool:
+    return inst.op.endswith('ORG') and not isinstance(inst.addressing.address, Integer) or _layout_dependent(inst)
+
+
+class IncrementalParser(object):
+
+    def __init__(self, code: str = ''):
+        self.lines = []  # The lines of the source
+        self.results = []  # The parsed instructions or the parse error of each line
+        self.cache = {}  # The parsed instructions of each line text
+        self.edit(0, 0, code)
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    @property
+    def instructions(self) -> List[Instruction]:
+        return self.get_instructions(0, len(self.lines))
+
+    @property
+    def errors(self) -> dict:
+        return {k + 1: self._parse(self.lines[k], k + 1)
+                for k, results in enumerate(self.results) if isinstance(results, ParseError)}
+
+    def edit(self, start: int, end: int, lines: Union[str, List[str]]):
+        # Replaces the lines [start, end) with the new lines, the line indices start from 0
+        if isinstance(lines, str):
+            lines = lines.split('\n')
+        self.lines[start:end] = lines
+        self.results[start:end] = [self._parse(line, start + i + 1) for i, line in enumerate(lines)]
+        if len(self.cache) > 2 * len(self.lines) + 1024:
+            self.cache = {line: self.cache[line] for line in self.lines if line in self.cache}
+
+    def get_instructions(self, start: int, stop: int) -> List[Instruction]:
+        # The line numbers of the cached instructions are updated to the current lines
+        instructions = []
+        for k in range(start, stop):
+            results = self.results[k]
+            if isinstance(results, ParseError):
+                # Parse again so that the error reports the current line number
+                raise self._parse(self.lines[k], k + 1)
+            for inst in results:
+                if inst.line_num != k + 1:
+                    inst = inst._replace(line_num=k + 1)
+                instructions.append(inst)
+        return instructions
+
+    def _parse(self, line: str, line_num: int):
+        results = self.cache.get(line)
+        if results is None:
+            try:
+                results = self.cache[line] = get_parser(lineno=line_num).parse(line + '\n')
+            except ParseError as e:
+                return e
+        return results
+
+
+class IncrementalAssembler(object):
+
+    # The macros, blocks and conditions may change the instructions of the other lines
+    UNSUPPORTED_OPS = {'.MACRO', '.ENDM', '.REPT', '.ENDR', '.IF', '.IFDEF', '.IFNDEF', '.ELSE', '.ENDIF'}
+
+    def __init__(self,
+                 code: str = '',
+                 add_entry: bool = True,
+                 **kwargs):
+        self.assembler = Assembler(**kwargs)
+        self.add_entry = add_entry
+
+        self.parser = IncrementalParser(code)
+        self.instructions = []  # The assembled instructions
+        self.instruction_lines = []  # The line index of each assembled instruction
+        self.positionals = []  # Whether each instruction depends on its own offset
+        self.emitted = []  # The bytes generated by each instruction
+        self.label_counts = {}  # The number of definitions of each label
+        self.dynamic_orgs = 0  # The number of `ORG`s and sizes that depend on labels or offsets
+        self.pending = (0, 0, len(self.lines))  # Lines [a, b) of the assembled source are replaced by lines [a, c)
+        self._codes = None
+        self.update()
+
+    @property
+    def code_offsets(self) -> List[int]:
+        return self.assembler.code_offsets
+
+    @property
+    def code_sizes(self) -> List[int]:
+        return self.assembler.code_sizes
+
+    @property
+    def fit_zero_pages(self) -> List[bool]:
+        return self.assembler.fit_zero_pages
+
+    @property
+    def label_offsets(self) -> dict:
+        return self.assembler.label_offsets
+
+    @property
+    def codes(self) -> List:
+        self.update()
+        if self._codes is None:
+            assembler = self.assembler
+            assembler.codes = []
+            end = -1
+            for offset, emitted in zip(assembler.code_offsets, self.emitted):
+                if len(emitted) == 0:
+                    continue
+                if offset == end:
+                    assembler.codes[-1][1].extend(emitted)
+                else:
+                    assembler.codes.append((offset, list(emitted)))
+                end = offset + len(emitted)
+            if self.add_entry:
+                assembler._add_entry()
+            self._codes = assembler.codes
+        return self._codes
+
+    def source_map(self) -> SourceMap:
+        self.update()
+        return SourceMap.from_instructions(self.code_offsets, self.code_sizes, self.instructions)
+
+    def symbol_index(self) -> SymbolIndex:
+        self.update()
+        return SymbolIndex(self.label_offsets)
+
+    def listing(self) -> Listing:
+        self.update()
+        return Listing.from_instructions(self.codes, self.code_offsets, self.code_sizes, self.instructions,
+                                         self.assembler.brk_size)
+
+    def page_crossings(self) -> List[PageCrossing]:
+        self.update()
+        return find_page_crossings(self.codes, self.code_offsets, self.code_sizes, self.instructions,
+                                   self.assembler.label_references)
+
+    @property
+    def lines(self) -> List[str]:
+        return self.parser.lines
+
+    @property
+    def text(self) -> str:
+        return self.parser.text
+
+    def edit(self, start: int, end: int, lines: Union[str, List[str]], update: bool = True):
+        # Replaces the lines [start, end) with the new lines, the line indices start from 0
+        if isinstance(lines, str):
+            lines = lines.split('\n')
+        self.parser.edit(start, end, lines)
+        stop = start + len(lines)
+        if self.pending is None:
+            self.pending = (start, end, stop)
+        else:
+            a, b, c = self.pending
+            self.pending = (min(a, start), b + max(0, end - c), max(c, end) + stop - end)
+        if update:
+            self.update()
+
+    def update(self):
+        if self.pending is None:
+            return
+        a, b, c = self.pending
+        assembler = self.assembler
+        old_states = (assembler.code_start, assembler.code_offsets, assembler.fit_zero_pages,
+                      assembler.code_sizes, assembler.label_offsets, assembler.label_references)
+        try:
+            new_instructions, new_lines = self._include(self.parser.get_instructions(a, c))
+            self._update(a, b, c, new_instructions, new_lines)
+        except Exception as e:
+            (assembler.code_start, assembler.code_offsets, assembler.fit_zero_pages,
+             assembler.code_sizes, assembler.label_offsets, assembler.label_references) = old_states
+            if isinstance(e, AssembleError):
+                raise assembler._file_error(e)
+            raise
+        self.pending = None
+        self._codes = None
+
+    def _include(self, instructions: List[Instruction]):
+        # The included instructions belong to the line of their `.INCLUDE`
+        new_instructions, new_lines = [], []
+        for inst in instructions:
+            if inst.op in self.UNSUPPORTED_OPS:
+                self.assembler.file_name = None
+                raise AssembleError(f"`{inst.op}` is not supported by the incremental assembler "
+                                    f"at line {inst.line_num}")
+            if inst.op == '.INCLUDE':
+                included = self.assembler._include([inst])
+                new_instructions.extend(included)
+                new_lines.extend([inst.line_num - 1] * len(included))
+            else:
+                new_instructions.append(inst)
+                new_lines.append(inst.line_num - 1)
+        return new_instructions, new_lines
+
+    def _update(self, a: int, b: int, c: int, new_instructions: List[Instruction], new_lines: List[int]):
+        assembler = self.assembler
+        i0 = bisect_left(self.instruction_lines, a)
+        i1 = bisect_left(self.instruction_lines, b)
+        i2 = i0 + len(new_instructions)
+        removed, kept = self.instructions[i0:i1], self.instructions[i1:]
+        kept_lines = self.instruction_lines[i1:]
+        if c != b:
+            kept = [inst if inst.file_name is not None else
+                    Instruction(inst.label, inst.op, inst.addressing, inst.line_num + c - b) for inst in kept]
+            kept_lines = [k + c - b for k in kept_lines]
+        instructions = self.instructions[:i0] + new_instructions + kept
+        instruction_lines = self.instruction_lines[:i0] + new_lines + kept_lines
+        positionals = self.positionals[:i0] + list(map(_is_positional, new_instructions)) + self.positionals[i1:]
+
+        label_counts, dynamic_orgs = dict(self.label_counts), self.dynamic_orgs
+        touched = set()  # The labels whose definitions may be changed
+        for inst, count in [(inst, -1) for inst in removed] + [(inst, 1) for inst in new_instructions]:
+            if inst.label is not None:
+                label_counts[inst.label] = label_counts.get(inst.label, 0) + count
+                touched.add(inst.label)
+            if _is_dynamic_org(inst):
+                dynamic_orgs += count
+
+        old_offsets, old_sizes, old_fits = assembler.code_offsets, assembler.code_sizes, assembler.fit_zero_pages
+        old_label_offsets = assembler.label_offsets
+        if dynamic_orgs:
+            # The offsets set by `ORG` and the sizes of alignments may depend on any label, calculate the layout again
+            assembler.reset()
+            assembler._preprocess(instructions)
+            moved_end = len(instructions)
+            touched = set(old_label_offsets.keys()) | set(assembler.label_offsets.keys())
+        else:
+            assembler.code_offsets = old_offsets[:i0]
+            assembler.code_sizes = old_sizes[:i0]
+            assembler.fit_zero_pages = old_fits[:i0]
+            assembler.label_offsets = label_offsets = dict(old_label_offsets)
+            assembler.label_references = self._splice_references(i0, i1, i2, removed, new_instructions)
+            assembler.code_offset = old_offsets[i0 - 1] + old_sizes[i0 - 1] if i0 > 0 else 0
+            for inst in new_instructions:
+                assembler._preprocess_instruction(inst)
+            if i2 < len(instructions):
+                for inst in new_instructions:
+                    for label in _collect_labels(inst):
+                        assembler.label_references[label].sort()
+            # Only the offsets are changed for the instructions after the edited lines,
+            # stop as soon as an instruction stays at the same offset
+            offset = assembler.code_offset
+            for j in range(i1, len(old_offsets)):
+                inst = instructions[j - i1 + i2]
+                if inst.op.endswith('ORG'):
+                    offset = inst.addressing.address.value
+                elif offset == old_offsets[j]:
+                    break
+                assembler.code_offsets.append(offset)
+                if inst.label is not None:
+                    label_offsets[inst.label] = offset
+                    touched.add(inst.label)
+                offset += old_sizes[j]
+                if offset >= assembler.max_memory:
+                    assembler.line_number, assembler.file_name, assembler.code_offset = \
+                        inst.line_num, inst.file_name, offset
+                    assembler._check_max_memory()
+            else:
+                j = len(old_offsets)
+            moved_end = j - i1 + i2
+            assembler.code_offsets.extend(old_offsets[j:])
+            assembler.code_sizes.extend(old_sizes[i1:])
+            assembler.fit_zero_pages.extend(old_fits[i1:])
+            for label in touched:
+                if label_counts.get(label, 0) == 0:
+                    label_offsets.pop(label, None)
+                elif label_counts[label] > 1 or self.label_counts.get(label, 0) > 1:
+                    # The last definition is used when a label is defined multiple times
+                    for k in range(len(instructions) - 1, -1, -1):
+                        if instructions[k].label == label:
+                            label_offsets[label] = assembler.code_offsets[k]
+                            break
+        assembler.code_start = -1
+        for inst, offset in zip(instructions, assembler.code_offsets):
+            if inst.op in Instruction.KEYWORDS:
+                assembler.code_start = offset
+                break
+
+        changed = {label for label in touched if old_label_offsets.get(label) != assembler.label_offsets.get(label)}
+        targets = set(range(i0, i2))
+        for k in range(i2, moved_end):
+            if positionals[k] and assembler.code_offsets[k] != old_offsets[k - i2 + i1]:
+                targets.add(k)
+        for label in changed:
+            targets.update(assembler.label_references.get(label, []))
+        emitted = self.emitted[:i0] + [None] * (i2 - i0) + self.emitted[i1:]
+        for k in sorted(targets):
+            assembler.codes = []
+            assembler._generate_instruction(k, instructions[k])
+            emitted[k] = assembler.codes[-1][1] if assembler.codes else []
+
+        self.instructions = instructions
+        self.instruction_lines = instruction_lines
+        self.positionals = positionals
+        self.emitted = emitted
+        self.label_counts = label_counts
+        self.dynamic_orgs = dynamic_orgs
+
+    def _splice_references(self, i0: int, i1: int, i2: int,
+                           removed: List[Instruction], added: List[Instruction]) -> dict:
+        # Removes the instructions [i0, i1) from the references and moves the following ones to i2
+        references = dict(self.assembler.label_references)
+        if i1 == i2:
+            labels = set()
+            for inst in removed + added:
+                labels |= _collect_labels(inst)
+        else:
+            labels = list(references.keys())
+        for label in labels:
+            indices = [k if k < i0 else k + i2 - i1 for k in references.get(label, []) if k < i0 or k >= i1]
+            if indices:
+                references[label] = indices
+            else:
+                references.pop(label, None)
+        return references
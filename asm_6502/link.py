@@ -0,0 +1,303 @@
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Union, List, Tuple, Optional
+
+from .grammar import parse_source, Integer, Addressing, Arithmetic
+from .assemble import Assembler, AssembleError, CODE_MAP_RELATIVE, _collect_references
+
+
+__all__ = ['Relocation', 'ObjectFile', 'assemble_object', 'link']
+
+
+class Relocation(namedtuple('Relocation', ['position', 'kind', 'symbol', 'addend'])):
+    # The value of the symbol plus the addend is written to the position of the codes,
+    # the symbol is None for the base address of the object
+
+    WORD = 'word'
+    LOW_BYTE = 'low_byte'
+    HIGH_BYTE = 'high_byte'
+    BYTE = 'byte'
+
+    KINDS = [WORD, LOW_BYTE, HIGH_BYTE, BYTE]
+
+
+class ObjectFile(object):
+
+    MAGIC = b'A65O'
+    FORMAT = 2
+
+    # Magic, format, code start, size and the numbers of segments, names, symbols and relocations
+    _HEADER = struct.Struct('<4sBiIIIII')
+    _SEGMENT = struct.Struct('<HI')  # The offset and the number of bytes
+    _NAME = struct.Struct('<H')
+    _SYMBOL = struct.Struct('<HH')  # The index of the name and the offset
+    _RELOCATION = struct.Struct('<HBHi')  # The position, kind, index of the name and the addend
+
+    _BASE = 0xFFFF  # The name index of the base address
+
+    def __init__(self,
+                 segments: List[Tuple[int, bytes]],
+                 code_start: int = -1,
+                 exports: Optional[dict] = None,
+                 relocations: Optional[List[Relocation]] = None,
+                 size: Optional[int] = None):
+        # The segments of the codes assembled at base address 0 in the order of the offsets, the gaps of `.RES`
+        # are not emitted
+        self.segments = [(offset, bytes(codes)) for offset, codes in segments if len(codes) > 0]
+        self.code_start = code_start  # The offset of the first instruction that can be executed
+        self.exports = exports or {}  # The offsets of the labels
+        self.relocations = relocations or []
+        if size is None:
+            size = max((offset + len(codes) for offset, codes in self.segments), default=0)
+        self.size = size  # The number of bytes occupied, including the reserved bytes at the end
+
+    @property
+    def imports(self) -> set:
+        return {relocation.symbol for relocation in self.relocations if relocation.symbol is not None}
+
+    def __eq__(self, other):
+        return isinstance(other, ObjectFile) and \
+            (self.segments, self.code_start, self.exports, self.relocations, self.size) == \
+            (other.segments, other.code_start, other.exports, other.relocations, other.size)
+
+    def to_bytes(self) -> bytes:
+        # The addresses are 16-bit, an object can not be larger than 64 KiB
+        if self.size > 0x10000:
+            raise AssembleError(f'The object of {self.size} bytes is too large')
+        names = sorted(set(self.exports.keys()) | self.imports)
+        name_indices = {name: i for i, name in enumerate(names)}
+        parts = [self._HEADER.pack(self.MAGIC, self.FORMAT, self.code_start, self.size,
+                                   len(self.segments), len(names), len(self.exports), len(self.relocations))]
+        for offset, codes in self.segments:
+            parts.append(self._SEGMENT.pack(offset, len(codes)) + codes)
+        for name in names:
+            encoded = name.encode('utf-8')
+            parts.append(self._NAME.pack(len(encoded)) + encoded)
+        for name, offset in self.exports.items():
+            parts.append(self._SYMBOL.pack(name_indices[name], offset))
+        kinds = {kind: i for i, kind in enumerate(Relocation.KINDS)}
+        for position, kind, symbol, addend in self.relocations:
+            parts.append(self._RELOCATION.pack(position, kinds[kind],
+                                               self._BASE if symbol is None else name_indices[symbol], addend))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ObjectFile':
+        if len(data) < cls._HEADER.size:
+            raise AssembleError('The object file is truncated')
+        magic, version, code_start, size, num_segments, num_names, num_symbols, num_relocations = \
+            cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.FORMAT:
+            raise AssembleError('Unsupported object file format')
+        try:
+            pos = cls._HEADER.size
+            segments = []
+            for _ in range(num_segments):
+                offset, length = cls._SEGMENT.unpack_from(data, pos)
+                pos += cls._SEGMENT.size
+                codes = data[pos:pos + length]
+                if len(codes) != length:
+                    raise AssembleError('The object file is corrupted')
+                segments.append((offset, codes))
+                pos += length
+            names = []
+            for _ in range(num_names):
+                length, = cls._NAME.unpack_from(data, pos)
+                pos += cls._NAME.size
+                names.append(data[pos:pos + length].decode('utf-8'))
+                pos += length
+            exports = {}
+            for index, offset in cls._SYMBOL.iter_unpack(data[pos:pos + num_symbols * cls._SYMBOL.size]):
+                exports[names[index]] = offset
+            pos += num_symbols * cls._SYMBOL.size
+            relocations = []
+            for position, kind, index, addend in \
+                    cls._RELOCATION.iter_unpack(data[pos:pos + num_relocations * cls._RELOCATION.size]):
+                relocations.append(Relocation(position, Relocation.KINDS[kind],
+                                              None if index == cls._BASE else names[index], addend))
+            pos += num_relocations * cls._RELOCATION.size
+        except (struct.error, IndexError, UnicodeDecodeError):
+            raise AssembleError('The object file is corrupted')
+        if pos != len(data):
+            raise AssembleError('The object file is corrupted')
+        return cls(segments, code_start, exports, relocations, size)
+
+    def save(self, path: str):
+        with open(path, 'wb') as writer:
+            writer.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'ObjectFile':
+        with open(path, 'rb') as reader:
+            return cls.from_bytes(reader.read())
+
+
+def _linear(assembler: Assembler, arithmetic: Union[Integer, Arithmetic], imports: set) -> Tuple[int, dict]:
+    # Returns the constant and the coefficients of the symbols, None is the symbol of the base address
+    if isinstance(arithmetic, Integer):
+        return arithmetic.value, {}
+    if arithmetic.mode == Arithmetic.CURRENT:
+        return assembler.code_offset, {None: 1}
+    if arithmetic.mode == Arithmetic.LABEL:
+        if arithmetic.param in imports:
+            return 0, {arithmetic.param: 1}
+        return assembler.label_offsets[arithmetic.param], {None: 1}
+    if arithmetic.mode in {Arithmetic.ADD, Arithmetic.SUB}:
+        sign = 1 if arithmetic.mode == Arithmetic.ADD else -1
+        value_a, terms_a = _linear(assembler, arithmetic.param[0], imports)
+        value_b, terms_b = _linear(assembler, arithmetic.param[1], imports)
+        terms = dict(terms_a)
+        for symbol, coefficient in terms_b.items():
+            terms[symbol] = terms.get(symbol, 0) + sign * coefficient
+        return value_a + sign * value_b, {symbol: coefficient for symbol, coefficient in terms.items() if coefficient}
+    if arithmetic.mode == Arithmetic.NEG:
+        value, terms = _linear(assembler, arithmetic.param, imports)
+        return -value, {symbol: -coefficient for symbol, coefficient in terms.items()}
+    if arithmetic.mode == Arithmetic.MUL:
+        value_a, terms_a = _linear(assembler, arithmetic.param[0], imports)
+        value_b, terms_b = _linear(assembler, arithmetic.param[1], imports)
+        if terms_a and terms_b:
+            raise AssembleError(f"Can not multiply two addresses in a relocatable object "
+                                f"at line {assembler.line_number}")
+        if terms_b:
+            value_a, terms_a, value_b = value_b, terms_b, value_a
+        return value_a * value_b, {symbol: coefficient * value_b for symbol, coefficient in terms_a.items()}
+    # Division and the bytes of addresses are only allowed for the values that are not relocated
+    labels = set()
+    if _collect_references(arithmetic, labels) or labels:
+        raise AssembleError(f"The expression can not be relocated at line {assembler.line_number}")
+    return assembler._resolve_address_recur(arithmetic).value, {}
+
+
+def _relocation(assembler: Assembler, position: int, kind: str,
+                arithmetic: Union[Integer, Arithmetic], imports: set) -> Optional[Relocation]:
+    if isinstance(arithmetic, Arithmetic) and arithmetic.mode in {Arithmetic.LOW_BYTE, Arithmetic.HIGH_BYTE}:
+        kind = Relocation.LOW_BYTE if arithmetic.mode == Arithmetic.LOW_BYTE else Relocation.HIGH_BYTE
+        arithmetic = arithmetic.param
+    value, terms = _linear(assembler, arithmetic, imports)
+    if len(terms) == 0:
+        return None
+    if len(terms) > 1 or list(terms.values())[0] != 1:
+        raise AssembleError(f"The expression can not be relocated at line {assembler.line_number}")
+    return Relocation(position, kind, list(terms.keys())[0], value)
+
+
+def assemble_object(instructions: Union[str, List], **kwargs) -> ObjectFile:
+    # Assembles the codes at base address 0, the labels that are not defined are imported from the other objects
+    assembler = Assembler(**kwargs)
+    if isinstance(instructions, str):
+        instructions = parse_source(instructions, assembler.defines)
+    assembler.reset()
+    try:
+        # The relocations are calculated for each instruction, so the blocks are unrolled
+        instructions = assembler._unroll_blocks(assembler._include(instructions))
+        defined, referenced = set(), set()
+        for inst in instructions:
+            assembler.line_number, assembler.file_name = inst.line_num, inst.file_name
+            if inst.op.endswith('ORG'):
+                raise AssembleError(f"`ORG` is not allowed in relocatable objects at line {inst.line_num}")
+            if inst.op == '.ALIGN':
+                raise AssembleError(f"`.ALIGN` is not allowed in relocatable objects at line {inst.line_num}")
+            if inst.label is not None:
+                defined.add(inst.label)
+            _collect_references(inst.addressing.address, referenced)
+        imports = referenced - defined
+        # The imported labels are placeholders while assembling, their bytes are written by the linker
+        assembler.label_offsets = dict.fromkeys(imports, 0)
+        assembler._preprocess(instructions)
+        assembler._generate(instructions)
+        for label in imports:
+            del assembler.label_offsets[label]
+
+        relocations = []
+        for index, inst in enumerate(instructions):
+            labels = set()
+            use_current = _collect_references(inst.addressing.address, labels)
+            if not use_current and not labels and inst.op != '.END':
+                continue
+            assembler.line_number, assembler.file_name = inst.line_num, inst.file_name
+            assembler.code_offset = offset = assembler.code_offsets[index]
+            if inst.op == '.END':
+                relocations.append(Relocation(offset + 1, Relocation.WORD, None, offset))
+            elif inst.op in CODE_MAP_RELATIVE:
+                # The distance between two addresses in the same object does not change
+                if labels & imports:
+                    raise AssembleError(f"Can not branch to the imported label at line {inst.line_num}")
+            elif inst.op == '.RES':
+                # The count is known in the first pass and no byte is generated
+                continue
+            elif inst.op == '.FILL':
+                # The value is repeated, the count is known in the first pass
+                value = inst.addressing.address.param[1]
+                for k in range(assembler.code_sizes[index]):
+                    relocations.append(_relocation(assembler, offset + k, Relocation.BYTE, value, imports))
+            elif inst.addressing.mode == Addressing.LIST:
+                kind, size = (Relocation.WORD, 2) if inst.op == '.WORD' else (Relocation.BYTE, 1)
+                for k, arithmetic in enumerate(inst.addressing.address.param):
+                    relocations.append(_relocation(assembler, offset + k * size, kind, arithmetic, imports))
+            else:
+                # The operand follows the operation code, except that the operand of `.BYTE` and `.WORD` has no code
+                position = offset if inst.op in {'.BYTE', '.WORD'} else offset + 1
+                kind = Relocation.WORD if assembler.code_sizes[index] - (position - offset) == 2 else Relocation.BYTE
+                relocations.append(_relocation(assembler, position, kind, inst.addressing.address, imports))
+    except AssembleError as e:
+        raise assembler._file_error(e)
+    # The gaps of `.RES` are kept so that the linked codes have the same segments as the assembled ones
+    size = max((offset + size for offset, size in zip(assembler.code_offsets, assembler.code_sizes)), default=0)
+    return ObjectFile(assembler.codes, assembler.code_start, assembler.label_offsets,
+                      [relocation for relocation in relocations if relocation is not None], size)
+
+
+def link(objects: List[Tuple[int, ObjectFile]],
+         add_entry: bool = True,
+         program_entry: int = 0xfffc,
+         max_memory: int = 0x10000) -> List:
+    # Places the objects at the base addresses, the results are in the same format as `Assembler.assemble`
+    symbols, ambiguous = {}, set()
+    for base, obj in objects:
+        for name, offset in obj.exports.items():
+            if name in symbols:
+                ambiguous.add(name)
+            symbols[name] = base + offset
+    codes, end = [], 0
+    for base, obj in sorted(objects, key=lambda item: item[0]):
+        if base < end:
+            raise AssembleError(f"The object at {hex(base)} overlaps the previous object ending at {hex(end)}")
+        if base + obj.size >= max_memory:
+            raise AssembleError(f"The object at {hex(base)} will exceed the max memory {hex(max_memory)}")
+        starts = [offset for offset, _ in obj.segments]
+        segments = [bytearray(segment) for _, segment in obj.segments]
+        for position, kind, symbol, addend in obj.relocations:
+            if symbol is None:
+                value = base + addend
+            elif symbol in ambiguous:
+                raise AssembleError(f"The imported label '{symbol}' is defined in multiple objects")
+            elif symbol not in symbols:
+                raise AssembleError(f"Can not resolve label '{symbol}'")
+            else:
+                value = symbols[symbol] + addend
+            # The position is relative to the object, the bytes are in the segment containing it
+            index = bisect_right(starts, position) - 1
+            data, pos = segments[index], position - starts[index]
+            if kind == Relocation.WORD:
+                data[pos] = value & 0xFF
+                data[pos + 1] = (value >> 8) & 0xFF
+            elif kind == Relocation.LOW_BYTE:
+                data[pos] = value & 0xFF
+            elif kind == Relocation.HIGH_BYTE:
+                data[pos] = (value >> 8) & 0xFF
+            else:
+                if value < 0 or value > 0xFF:
+                    raise AssembleError(f"{hex(value)} can not fit in a byte at {hex(base + position)}")
+                data[pos] = value
+        for offset, data in zip(starts, segments):
+            if codes and codes[-1][0] + len(codes[-1][1]) == base + offset:
+                codes[-1][1].extend(data)
+            else:
+                codes.append((base + offset, list(data)))
+        end = base + obj.size
+    if add_entry:
+        code_start = next((base + obj.code_start for base, obj in objects if obj.code_start != -1), -1)
+        codes.append((program_entry, [code_start & 0xFF, (code_start >> 8) & 0xFF]))
+    return codes
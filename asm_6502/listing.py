@@ -0,0 +1,141 @@
+from bisect import bisect_right
+from collections import namedtuple
+from typing import List, Optional, Tuple, Iterable, Dict
+
+from .grammar import Addressing, Instruction
+from .opcodes import OPCODES
+
+
+__all__ = ['instruction_cycles', 'ListingEntry', 'Listing']
+
+
+def instruction_cycles(code, address: int) -> Tuple[int, int]:
+    # The minimum and the maximum cycles of the instruction at the address. The target of a branch is known, so
+    # the taken branch costs one more cycle and another one if the target is in another page. The index registers
+    # are not known, the indexed addressing only avoids the page crossing when the low byte of the base is zero.
+    opcode = OPCODES[code[0]]
+    cycles = opcode.cycles
+    if opcode.mode == Addressing.RELATIVE:
+        following = address + 2
+        target = (following + (code[1] ^ 0x80) - 0x80) & 0xFFFF
+        return cycles, cycles + 1 + ((target ^ following) & 0xFF00 != 0)
+    if opcode.page_cross and (opcode.mode == Addressing.INDIRECT_INDEXED or code[1] != 0):
+        return cycles, cycles + opcode.page_cross
+    return cycles, cycles
+
+
+def _sorted_segments(codes: List[Tuple[int, list]]) -> Tuple[List[Tuple[int, list]], List[int]]:
+    # The segments are in the order of the emission, a later `ORG` and the entry may go to lower addresses
+    codes = sorted(codes, key=lambda segment: segment[0])
+    return codes, [start for start, _ in codes]
+
+
+def _codes_at(codes: List[Tuple[int, list]], starts: List[int], offset: int, size: int) -> bytes:
+    # The bytes generated at [offset, offset + size), the segments are sorted by `_sorted_segments`. The segments
+    # starting at or before the offset are searched backwards for the one that contains the bytes.
+    index = bisect_right(starts, offset) - 1
+    if size <= 0:
+        return b''
+    while index >= 0:
+        start, segment = codes[index]
+        if offset + size <= start + len(segment):
+            return bytes(segment[offset - start:offset - start + size])
+        index -= 1
+    return b''
+
+
+def _run_cycles(code, address: int, brk_size: int) -> Tuple[int, int]:
+    # The total cycles of the instructions decoded linearly, for the repeated blocks and `.END`
+    low = high = position = 0
+    while position < len(code):
+        opcode = OPCODES[code[position]]
+        size = brk_size if opcode.op == 'BRK' else opcode.size
+        if position + size > len(code):
+            break
+        cycles = instruction_cycles(code[position:position + size], address + position)
+        low, high = low + cycles[0], high + cycles[1]
+        position += size
+    return low, high
+
+
+class ListingEntry(namedtuple('ListingEntry', ['address', 'codes', 'cycles', 'label', 'op', 'line_num',
+                                               'file_name'])):
+    # The cycles are the minimum and the maximum cycles, None if the instruction is not executable
+
+    __slots__ = ()
+
+
+_CODE_OPS = {'.REPT', '.END'}  # The pseudo instructions that generate instructions
+
+
+def _format_cycles(cycles: Optional[Tuple[int, int]]) -> str:
+    if cycles is None:
+        return ''
+    return str(cycles[0]) if cycles[0] == cycles[1] else f'{cycles[0]}-{cycles[1]}'
+
+
+class Listing(object):
+    # The instructions with their addresses, codes and cycles, in the order of the source
+
+    def __init__(self, entries: List[ListingEntry]):
+        self.entries = entries
+
+    @classmethod
+    def from_instructions(cls,
+                          codes: List[Tuple[int, list]],
+                          code_offsets: List[int],
+                          code_sizes: List[int],
+                          instructions: Iterable[Instruction],
+                          brk_size: int = 2) -> 'Listing':
+        codes, starts = _sorted_segments(codes)
+        entries = []
+        for offset, size, inst in zip(code_offsets, code_sizes, instructions):
+            code = _codes_at(codes, starts, offset, size)
+            cycles = None
+            if code and (inst.op in Instruction.KEYWORDS or inst.op in _CODE_OPS):
+                cycles = _run_cycles(code, offset, brk_size)
+            entries.append(ListingEntry(offset, code, cycles, inst.label, inst.op, inst.line_num, inst.file_name))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def blocks(self) -> List[Tuple[str, int, int, int]]:
+        # The label, the address, the minimum and the maximum cycles of the instructions from each label to the next
+        # one, the jumps and the branches are not followed. The labels of the data are skipped.
+        blocks, block = [], None
+        for entry in self.entries:
+            if entry.label is not None:
+                block = [entry.label, entry.address, 0, 0, False]
+                blocks.append(block)
+            if block is not None and entry.cycles is not None:
+                block[2] += entry.cycles[0]
+                block[3] += entry.cycles[1]
+                block[4] = True
+        return [tuple(block[:4]) for block in blocks if block[4]]
+
+    def format(self, sources: Optional[Dict[Optional[str], str]] = None) -> str:
+        # The address, the first bytes, the cycles, the line number and the source line of each instruction, then
+        # the totals of the blocks. `sources` maps the file names to the texts, None for the main source.
+        sources, lines = sources or {}, {}
+        results = []
+        for entry in self.entries:
+            if entry.file_name not in lines:
+                source = sources.get(entry.file_name)
+                lines[entry.file_name] = [] if source is None else source.splitlines()
+            source_lines = lines[entry.file_name]
+            if 0 < entry.line_num <= len(source_lines):
+                text = source_lines[entry.line_num - 1].rstrip()
+            else:
+                text = entry.op if entry.label is None else f'{entry.label} {entry.op}'
+            codes = ' '.join(f'{byte:02X}' for byte in entry.codes[:3]) + (' ..' if len(entry.codes) > 3 else '')
+            results.append(f'{entry.address:04X}  {codes:<11}  {_format_cycles(entry.cycles):>5}  '
+                           f'{entry.line_num:>5}  {text}'.rstrip())
+        blocks = self.blocks()
+        if blocks:
+            width = max(len(label) for label, _, _, _ in blocks)
+            results.append('')
+            results.append('Blocks:')
+            for label, address, low, high in blocks:
+                results.append(f'{address:04X}  {label:<{width}}  {_format_cycles((low, high)):>7}')
+        return '\n'.join(results) + '\n'
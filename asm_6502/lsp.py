@@ -0,0 +1,336 @@
+import re
+import sys
+import json
+import time
+import queue
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Optional
+
+from .grammar import ParseError
+from .assemble import Assembler, AssembleError
+from .incremental import IncrementalAssembler
+
+
+__all__ = ['read_message', 'write_message', 'Document', 'LanguageServer', 'main']
+
+
+_WORD = re.compile(r'[.a-zA-Z_][a-zA-Z0-9_]*')
+_LINE_NUMBER = re.compile(r'at line (\d+)')
+
+
+def read_message(stream) -> Optional[dict]:
+    headers = {}
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.decode('ascii').strip()
+        if not line:
+            break
+        name, value = line.split(':', 1)
+        headers[name.strip().lower()] = value.strip()
+    return json.loads(stream.read(int(headers['content-length'])).decode('utf-8'))
+
+
+def write_message(stream, message: dict):
+    body = json.dumps(message).encode('utf-8')
+    stream.write(f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body)
+    stream.flush()
+
+
+class Document(object):
+
+    def __init__(self, uri: str, text: str, version: int = 0, **kwargs):
+        self.uri = uri
+        self.version = version
+        self.options = kwargs
+        self.session = IncrementalAssembler(**kwargs)
+        self.fallback = None  # The full assembler of the documents that are not supported incrementally
+        self.definitions = {}  # The line indices of the definitions of each label
+        self.changed_time = time.monotonic()
+        self.dirty = True  # Whether the changes are not assembled
+        self._edit(0, len(self.lines), text.split('\n'))
+
+    @property
+    def lines(self):
+        return self.session.lines
+
+    def change(self, change: dict):
+        if 'range' not in change:
+            self._edit(0, len(self.lines), change['text'].split('\n'))
+        else:
+            start, end = change['range']['start'], change['range']['end']
+            lines = change['text'].split('\n')
+            lines[0] = self.lines[start['line']][:start['character']] + lines[0]
+            lines[-1] += self.lines[end['line']][end['character']:]
+            self._edit(start['line'], end['line'] + 1, lines)
+        self.changed_time = time.monotonic()
+        self.dirty = True
+
+    def _edit(self, start: int, end: int, lines: list):
+        results = self.session.parser.results
+        for k in range(start, end):
+            for label in self._line_labels(results[k]):
+                self.definitions[label].remove(k)
+                if len(self.definitions[label]) == 0:
+                    del self.definitions[label]
+        self.session.edit(start, end, lines, update=False)
+        shift = len(lines) - (end - start)
+        if shift:
+            # Only the labels are moved, the lines are not parsed again
+            for label, indices in self.definitions.items():
+                self.definitions[label] = [k + shift if k >= end else k for k in indices]
+        for k in range(start, start + len(lines)):
+            for label in self._line_labels(results[k]):
+                insort(self.definitions.setdefault(label, []), k)
+
+    @staticmethod
+    def _line_labels(results) -> list:
+        if isinstance(results, ParseError):
+            return []
+        return [inst.label for inst in results if inst.label is not None]
+
+    def assemble(self) -> list:
+        # Returns the diagnostics of the document
+        self.dirty = False
+        session, self.fallback = self.session, None
+        if self._unsupported():
+            return self._assemble_fully()
+        try:
+            session.update()
+        except ParseError:
+            return [self._diagnostic(line_num, e.info) for line_num, e in session.parser.errors.items()]
+        except AssembleError as e:
+            # The errors in the included files are reported at the first line of the document
+            line_num = session.assembler.line_number if session.assembler.file_name is None else 1
+            return [self._diagnostic(line_num, e.info)]
+        return []
+
+    def _assemble_fully(self) -> list:
+        # The whole text is parsed with the conditions and assembled again
+        options = dict(self.options)
+        add_entry = options.pop('add_entry', True)
+        self.fallback = assembler = Assembler(**options)
+        try:
+            assembler.assemble(self.session.text, add_entry=add_entry)
+        except ParseError as e:
+            match = _LINE_NUMBER.search(e.info)
+            return [self._diagnostic(int(match.group(1)) if match else 1, e.info)]
+        except (AssembleError, AttributeError) as e:
+            line_num = assembler.line_number if assembler.file_name is None else 1
+            return [self._diagnostic(line_num, getattr(e, 'info', str(e)))]
+        return []
+
+    def _unsupported(self) -> bool:
+        # Whether the document has the directives that the incremental assembler does not support
+        for results in self.session.parser.results:
+            if not isinstance(results, ParseError) and \
+                    any(inst.op in IncrementalAssembler.UNSUPPORTED_OPS for inst in results):
+                return True
+        return False
+
+    def _diagnostic(self, line_num: int, message: str) -> dict:
+        line_num = min(max(line_num, 1), len(self.lines))
+        return {
+            'range': {
+                'start': {'line': line_num - 1, 'character': 0},
+                'end': {'line': line_num - 1, 'character': len(self.lines[line_num - 1])},
+            },
+            'severity': 1,
+            'source': 'asm_6502',
+            'message': message,
+        }
+
+    def word_at(self, position: dict):
+        line, character = position['line'], position['character']
+        if line >= len(self.lines):
+            return None
+        for match in _WORD.finditer(self.lines[line].split(';', 1)[0]):
+            if match.start() <= character <= match.end():
+                return match
+        return None
+
+    def definition(self, position: dict) -> Optional[dict]:
+        match = self.word_at(position)
+        if match is None or match.group() not in self.definitions:
+            return None
+        # The last definition is used when a label is defined multiple times
+        line = self.definitions[match.group()][-1]
+        character = self.lines[line].find(match.group())
+        return {
+            'uri': self.uri,
+            'range': {
+                'start': {'line': line, 'character': character},
+                'end': {'line': line, 'character': character + len(match.group())},
+            },
+        }
+
+    def hover(self, position: dict) -> Optional[dict]:
+        session, contents = self.session, []
+        label_offsets = session.label_offsets if self.fallback is None else self.fallback.label_offsets
+        match = self.word_at(position)
+        if match is not None and match.group() in label_offsets:
+            contents.append(f'`{match.group()}` = `${label_offsets[match.group()]:04X}`')
+        if not self.dirty and self.fallback is None and session.pending is None:
+            start = bisect_left(session.instruction_lines, position['line'])
+            stop = bisect_right(session.instruction_lines, position['line'])
+            for i in range(start, stop):
+                if len(session.emitted[i]) > 0:
+                    codes = ' '.join(f'{code:02X}' for code in session.emitted[i])
+                    contents.append(f'`${session.code_offsets[i]:04X}`: `{codes}`')
+        if len(contents) == 0:
+            return None
+        return {
+            'contents': {'kind': 'markdown', 'value': '\n\n'.join(contents)},
+            'range': {
+                'start': {'line': position['line'], 'character': match.start() if match else position['character']},
+                'end': {'line': position['line'], 'character': match.end() if match else position['character']},
+            },
+        }
+
+
+class LanguageServer(object):
+
+    def __init__(self, output, debounce: float = 0.2):
+        self.output = output
+        self.debounce = debounce
+        self.documents = {}
+        self.options = {}  # The options of `Assembler`
+        self.running = True
+
+    def send(self, message: dict):
+        message['jsonrpc'] = '2.0'
+        write_message(self.output, message)
+
+    def publish(self, document: Document):
+        self.send({
+            'method': 'textDocument/publishDiagnostics',
+            'params': {'uri': document.uri, 'version': document.version, 'diagnostics': document.assemble()},
+        })
+
+    def log(self, message: str):
+        self.send({'method': 'window/logMessage', 'params': {'type': 1, 'message': message}})
+
+    def flush(self, force: bool = False):
+        # Assembles the documents that have not been changed for the debounce time
+        now = time.monotonic()
+        for document in list(self.documents.values()):
+            if document.dirty and (force or now - document.changed_time >= self.debounce):
+                try:
+                    self.publish(document)
+                except Exception as e:
+                    self.log(f'Failed to assemble {document.uri}: {e!r}')
+
+    def timeout(self) -> Optional[float]:
+        times = [document.changed_time for document in self.documents.values() if document.dirty]
+        if len(times) == 0:
+            return None
+        return max(0.0, min(times) + self.debounce - time.monotonic())
+
+    def handle(self, message: dict):
+        method, params = message.get('method'), message.get('params') or {}
+        handler = getattr(self, 'on_' + (method or '').replace('/', '_').replace('$', '_'), None)
+        if 'id' not in message:
+            if handler is not None:
+                try:
+                    handler(params)
+                except Exception as e:
+                    # The notifications have no response, the server keeps running
+                    self.log(f'Failed to handle {method}: {e!r}')
+            return
+        if handler is None:
+            self.send({'id': message['id'], 'error': {'code': -32601, 'message': f'Method not found: {method}'}})
+            return
+        try:
+            result = handler(params)
+        except Exception as e:
+            self.send({'id': message['id'], 'error': {'code': -32603, 'message': f'Failed to handle {method}: {e!r}'}})
+            return
+        self.send({'id': message['id'], 'result': result})
+
+    def _document(self, params: dict) -> Optional[Document]:
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is not None and document.dirty:
+            self.publish(document)
+        return document
+
+    def on_initialize(self, params: dict):
+        self.options = params.get('initializationOptions') or {}
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': 2},
+                'hoverProvider': True,
+                'definitionProvider': True,
+            },
+            'serverInfo': {'name': 'asm_6502'},
+        }
+
+    def on_initialized(self, params: dict):
+        pass
+
+    def on_shutdown(self, params: dict):
+        return None
+
+    def on_exit(self, params: dict):
+        self.running = False
+
+    def on_textDocument_didOpen(self, params: dict):
+        item = params['textDocument']
+        self.documents[item['uri']] = Document(item['uri'], item['text'], item.get('version', 0), **self.options)
+
+    def on_textDocument_didChange(self, params: dict):
+        document = self.documents[params['textDocument']['uri']]
+        document.version = params['textDocument'].get('version', document.version)
+        for change in params['contentChanges']:
+            document.change(change)
+
+    def on_textDocument_didClose(self, params: dict):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self.send({'method': 'textDocument/publishDiagnostics', 'params': {'uri': uri, 'diagnostics': []}})
+
+    def on_textDocument_definition(self, params: dict):
+        document = self._document(params)
+        return None if document is None else document.definition(params['position'])
+
+    def on_textDocument_hover(self, params: dict):
+        document = self._document(params)
+        return None if document is None else document.hover(params['position'])
+
+    def serve(self, stream):
+        messages = queue.Queue()
+
+        def read():
+            while True:
+                try:
+                    message = read_message(stream)
+                except (KeyError, ValueError) as e:
+                    # The content of the malformed message has been consumed
+                    message = e
+                messages.put(message)
+                if message is None:
+                    break
+
+        threading.Thread(target=read, daemon=True).start()
+        while self.running:
+            try:
+                message = messages.get(timeout=self.timeout())
+            except queue.Empty:
+                self.flush()
+                continue
+            if message is None:
+                break
+            if isinstance(message, Exception):
+                self.send({'id': None, 'error': {'code': -32700, 'message': f'Parse error: {message!r}'}})
+                continue
+            self.handle(message)
+
+
+def main():
+    server = LanguageServer(sys.stdout.buffer)
+    server.serve(sys.stdin.buffer)
+
+
+if __name__ == '__main__':
+    main()
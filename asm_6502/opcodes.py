@@ -0,0 +1,314 @@
+from collections import namedtuple
+
+from .grammar import Addressing
+
+
+__all__ = ['Opcode', 'OPCODES', 'ENCODINGS']
+
+
+class Opcode(namedtuple('Opcode', ['op', 'mode', 'size', 'cycles', 'page_cross', 'documented'])):
+    # The cycles are the base cycles of the NMOS 6502. `page_cross` is the extra cycle when the indexed address
+    # crosses a page, and for the branches when the taken branch crosses a page, the taken branches always take one
+    # more cycle. `JAM` halts the CPU and has no cycles.
+
+    __slots__ = ()
+
+
+_IMP = Addressing.IMPLIED
+_ACC = Addressing.ACCUMULATOR
+_IMM = Addressing.IMMEDIATE
+_ZP = Addressing.ZERO_PAGE
+_ZPX = Addressing.ZERO_PAGE_X
+_ZPY = Addressing.ZERO_PAGE_Y
+_ABS = Addressing.ABSOLUTE
+_ABX = Addressing.ABSOLUTE_X
+_ABY = Addressing.ABSOLUTE_Y
+_IND = Addressing.INDIRECT
+_IZX = Addressing.INDEXED_INDIRECT
+_IZY = Addressing.INDIRECT_INDEXED
+_REL = Addressing.RELATIVE
+
+_SIZES = {
+    _IMP: 1, _ACC: 1,
+    _IMM: 2, _ZP: 2, _ZPX: 2, _ZPY: 2, _IZX: 2, _IZY: 2, _REL: 2,
+    _ABS: 3, _ABX: 3, _ABY: 3, _IND: 3,
+}
+
+
+def _opcode(op: str, mode: str, cycles: int, page_cross: int = 0, documented: bool = True) -> Opcode:
+    # `BRK` is one byte here, the assembler appends the padding byte by `brk_size`
+    return Opcode(op, mode, _SIZES[mode], cycles, page_cross, documented)
+
+
+# The metadata of all the opcodes, indexed by the opcodes
+OPCODES = (
+    _opcode('BRK', _IMP, 7),  # 0x00
+    _opcode('ORA', _IZX, 6),  # 0x01
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x02
+    _opcode('SLO', _IZX, 8, 0, False),  # 0x03
+    _opcode('NOP', _ZP, 3, 0, False),  # 0x04
+    _opcode('ORA', _ZP, 3),  # 0x05
+    _opcode('ASL', _ZP, 5),  # 0x06
+    _opcode('SLO', _ZP, 5, 0, False),  # 0x07
+    _opcode('PHP', _IMP, 3),  # 0x08
+    _opcode('ORA', _IMM, 2),  # 0x09
+    _opcode('ASL', _ACC, 2),  # 0x0A
+    _opcode('ANC', _IMM, 2, 0, False),  # 0x0B
+    _opcode('NOP', _ABS, 4, 0, False),  # 0x0C
+    _opcode('ORA', _ABS, 4),  # 0x0D
+    _opcode('ASL', _ABS, 6),  # 0x0E
+    _opcode('SLO', _ABS, 6, 0, False),  # 0x0F
+    _opcode('BPL', _REL, 2, 1),  # 0x10
+    _opcode('ORA', _IZY, 5, 1),  # 0x11
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x12
+    _opcode('SLO', _IZY, 8, 0, False),  # 0x13
+    _opcode('NOP', _ZPX, 4, 0, False),  # 0x14
+    _opcode('ORA', _ZPX, 4),  # 0x15
+    _opcode('ASL', _ZPX, 6),  # 0x16
+    _opcode('SLO', _ZPX, 6, 0, False),  # 0x17
+    _opcode('CLC', _IMP, 2),  # 0x18
+    _opcode('ORA', _ABY, 4, 1),  # 0x19
+    _opcode('NOP', _IMP, 2, 0, False),  # 0x1A
+    _opcode('SLO', _ABY, 7, 0, False),  # 0x1B
+    _opcode('NOP', _ABX, 4, 1, False),  # 0x1C
+    _opcode('ORA', _ABX, 4, 1),  # 0x1D
+    _opcode('ASL', _ABX, 7),  # 0x1E
+    _opcode('SLO', _ABX, 7, 0, False),  # 0x1F
+    _opcode('JSR', _ABS, 6),  # 0x20
+    _opcode('AND', _IZX, 6),  # 0x21
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x22
+    _opcode('RLA', _IZX, 8, 0, False),  # 0x23
+    _opcode('BIT', _ZP, 3),  # 0x24
+    _opcode('AND', _ZP, 3),  # 0x25
+    _opcode('ROL', _ZP, 5),  # 0x26
+    _opcode('RLA', _ZP, 5, 0, False),  # 0x27
+    _opcode('PLP', _IMP, 4),  # 0x28
+    _opcode('AND', _IMM, 2),  # 0x29
+    _opcode('ROL', _ACC, 2),  # 0x2A
+    _opcode('ANC', _IMM, 2, 0, False),  # 0x2B
+    _opcode('BIT', _ABS, 4),  # 0x2C
+    _opcode('AND', _ABS, 4),  # 0x2D
+    _opcode('ROL', _ABS, 6),  # 0x2E
+    _opcode('RLA', _ABS, 6, 0, False),  # 0x2F
+    _opcode('BMI', _REL, 2, 1),  # 0x30
+    _opcode('AND', _IZY, 5, 1),  # 0x31
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x32
+    _opcode('RLA', _IZY, 8, 0, False),  # 0x33
+    _opcode('NOP', _ZPX, 4, 0, False),  # 0x34
+    _opcode('AND', _ZPX, 4),  # 0x35
+    _opcode('ROL', _ZPX, 6),  # 0x36
+    _opcode('RLA', _ZPX, 6, 0, False),  # 0x37
+    _opcode('SEC', _IMP, 2),  # 0x38
+    _opcode('AND', _ABY, 4, 1),  # 0x39
+    _opcode('NOP', _IMP, 2, 0, False),  # 0x3A
+    _opcode('RLA', _ABY, 7, 0, False),  # 0x3B
+    _opcode('NOP', _ABX, 4, 1, False),  # 0x3C
+    _opcode('AND', _ABX, 4, 1),  # 0x3D
+    _opcode('ROL', _ABX, 7),  # 0x3E
+    _opcode('RLA', _ABX, 7, 0, False),  # 0x3F
+    _opcode('RTI', _IMP, 6),  # 0x40
+    _opcode('EOR', _IZX, 6),  # 0x41
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x42
+    _opcode('SRE', _IZX, 8, 0, False),  # 0x43
+    _opcode('NOP', _ZP, 3, 0, False),  # 0x44
+    _opcode('EOR', _ZP, 3),  # 0x45
+    _opcode('LSR', _ZP, 5),  # 0x46
+    _opcode('SRE', _ZP, 5, 0, False),  # 0x47
+    _opcode('PHA', _IMP, 3),  # 0x48
+    _opcode('EOR', _IMM, 2),  # 0x49
+    _opcode('LSR', _ACC, 2),  # 0x4A
+    _opcode('ASR', _IMM, 2, 0, False),  # 0x4B
+    _opcode('JMP', _ABS, 3),  # 0x4C
+    _opcode('EOR', _ABS, 4),  # 0x4D
+    _opcode('LSR', _ABS, 6),  # 0x4E
+    _opcode('SRE', _ABS, 6, 0, False),  # 0x4F
+    _opcode('BVC', _REL, 2, 1),  # 0x50
+    _opcode('EOR', _IZY, 5, 1),  # 0x51
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x52
+    _opcode('SRE', _IZY, 8, 0, False),  # 0x53
+    _opcode('NOP', _ZPX, 4, 0, False),  # 0x54
+    _opcode('EOR', _ZPX, 4),  # 0x55
+    _opcode('LSR', _ZPX, 6),  # 0x56
+    _opcode('SRE', _ZPX, 6, 0, False),  # 0x57
+    _opcode('CLI', _IMP, 2),  # 0x58
+    _opcode('EOR', _ABY, 4, 1),  # 0x59
+    _opcode('NOP', _IMP, 2, 0, False),  # 0x5A
+    _opcode('SRE', _ABY, 7, 0, False),  # 0x5B
+    _opcode('NOP', _ABX, 4, 1, False),  # 0x5C
+    _opcode('EOR', _ABX, 4, 1),  # 0x5D
+    _opcode('LSR', _ABX, 7),  # 0x5E
+    _opcode('SRE', _ABX, 7, 0, False),  # 0x5F
+    _opcode('RTS', _IMP, 6),  # 0x60
+    _opcode('ADC', _IZX, 6),  # 0x61
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x62
+    _opcode('RRA', _IZX, 8, 0, False),  # 0x63
+    _opcode('NOP', _ZP, 3, 0, False),  # 0x64
+    _opcode('ADC', _ZP, 3),  # 0x65
+    _opcode('ROR', _ZP, 5),  # 0x66
+    _opcode('RRA', _ZP, 5, 0, False),  # 0x67
+    _opcode('PLA', _IMP, 4),  # 0x68
+    _opcode('ADC', _IMM, 2),  # 0x69
+    _opcode('ROR', _ACC, 2),  # 0x6A
+    _opcode('ARR', _IMM, 2, 0, False),  # 0x6B
+    _opcode('JMP', _IND, 5),  # 0x6C
+    _opcode('ADC', _ABS, 4),  # 0x6D
+    _opcode('ROR', _ABS, 6),  # 0x6E
+    _opcode('RRA', _ABS, 6, 0, False),  # 0x6F
+    _opcode('BVS', _REL, 2, 1),  # 0x70
+    _opcode('ADC', _IZY, 5, 1),  # 0x71
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x72
+    _opcode('RRA', _IZY, 8, 0, False),  # 0x73
+    _opcode('NOP', _ZPX, 4, 0, False),  # 0x74
+    _opcode('ADC', _ZPX, 4),  # 0x75
+    _opcode('ROR', _ZPX, 6),  # 0x76
+    _opcode('RRA', _ZPX, 6, 0, False),  # 0x77
+    _opcode('SEI', _IMP, 2),  # 0x78
+    _opcode('ADC', _ABY, 4, 1),  # 0x79
+    _opcode('NOP', _IMP, 2, 0, False),  # 0x7A
+    _opcode('RRA', _ABY, 7, 0, False),  # 0x7B
+    _opcode('NOP', _ABX, 4, 1, False),  # 0x7C
+    _opcode('ADC', _ABX, 4, 1),  # 0x7D
+    _opcode('ROR', _ABX, 7),  # 0x7E
+    _opcode('RRA', _ABX, 7, 0, False),  # 0x7F
+    _opcode('NOP', _IMM, 2, 0, False),  # 0x80
+    _opcode('STA', _IZX, 6),  # 0x81
+    _opcode('NOP', _IMM, 2, 0, False),  # 0x82
+    _opcode('SAX', _IZX, 6, 0, False),  # 0x83
+    _opcode('STY', _ZP, 3),  # 0x84
+    _opcode('STA', _ZP, 3),  # 0x85
+    _opcode('STX', _ZP, 3),  # 0x86
+    _opcode('SAX', _ZP, 3, 0, False),  # 0x87
+    _opcode('DEY', _IMP, 2),  # 0x88
+    _opcode('NOP', _IMM, 2, 0, False),  # 0x89
+    _opcode('TXA', _IMP, 2),  # 0x8A
+    _opcode('XAA', _IMM, 2, 0, False),  # 0x8B
+    _opcode('STY', _ABS, 4),  # 0x8C
+    _opcode('STA', _ABS, 4),  # 0x8D
+    _opcode('STX', _ABS, 4),  # 0x8E
+    _opcode('SAX', _ABS, 4, 0, False),  # 0x8F
+    _opcode('BCC', _REL, 2, 1),  # 0x90
+    _opcode('STA', _IZY, 6),  # 0x91
+    _opcode('JAM', _IMP, 0, 0, False),  # 0x92
+    _opcode('SHA', _IZY, 6, 0, False),  # 0x93
+    _opcode('STY', _ZPX, 4),  # 0x94
+    _opcode('STA', _ZPX, 4),  # 0x95
+    _opcode('STX', _ZPY, 4),  # 0x96
+    _opcode('SAX', _ZPY, 4, 0, False),  # 0x97
+    _opcode('TYA', _IMP, 2),  # 0x98
+    _opcode('STA', _ABY, 5),  # 0x99
+    _opcode('TXS', _IMP, 2),  # 0x9A
+    _opcode('SHS', _ABY, 5, 0, False),  # 0x9B
+    _opcode('SHY', _ABX, 5, 0, False),  # 0x9C
+    _opcode('STA', _ABX, 5),  # 0x9D
+    _opcode('SHX', _ABY, 5, 0, False),  # 0x9E
+    _opcode('SHA', _ABY, 5, 0, False),  # 0x9F
+    _opcode('LDY', _IMM, 2),  # 0xA0
+    _opcode('LDA', _IZX, 6),  # 0xA1
+    _opcode('LDX', _IMM, 2),  # 0xA2
+    _opcode('LAX', _IZX, 6, 0, False),  # 0xA3
+    _opcode('LDY', _ZP, 3),  # 0xA4
+    _opcode('LDA', _ZP, 3),  # 0xA5
+    _opcode('LDX', _ZP, 3),  # 0xA6
+    _opcode('LAX', _ZP, 3, 0, False),  # 0xA7
+    _opcode('TAY', _IMP, 2),  # 0xA8
+    _opcode('LDA', _IMM, 2),  # 0xA9
+    _opcode('TAX', _IMP, 2),  # 0xAA
+    _opcode('LAX', _IMM, 2, 0, False),  # 0xAB
+    _opcode('LDY', _ABS, 4),  # 0xAC
+    _opcode('LDA', _ABS, 4),  # 0xAD
+    _opcode('LDX', _ABS, 4),  # 0xAE
+    _opcode('LAX', _ABS, 4, 0, False),  # 0xAF
+    _opcode('BCS', _REL, 2, 1),  # 0xB0
+    _opcode('LDA', _IZY, 5, 1),  # 0xB1
+    _opcode('JAM', _IMP, 0, 0, False),  # 0xB2
+    _opcode('LAX', _IZY, 5, 1, False),  # 0xB3
+    _opcode('LDY', _ZPX, 4),  # 0xB4
+    _opcode('LDA', _ZPX, 4),  # 0xB5
+    _opcode('LDX', _ZPY, 4),  # 0xB6
+    _opcode('LAX', _ZPY, 4, 0, False),  # 0xB7
+    _opcode('CLV', _IMP, 2),  # 0xB8
+    _opcode('LDA', _ABY, 4, 1),  # 0xB9
+    _opcode('TSX', _IMP, 2),  # 0xBA
+    _opcode('LAS', _ABY, 4, 1, False),  # 0xBB
+    _opcode('LDY', _ABX, 4, 1),  # 0xBC
+    _opcode('LDA', _ABX, 4, 1),  # 0xBD
+    _opcode('LDX', _ABY, 4, 1),  # 0xBE
+    _opcode('LAX', _ABY, 4, 1, False),  # 0xBF
+    _opcode('CPY', _IMM, 2),  # 0xC0
+    _opcode('CMP', _IZX, 6),  # 0xC1
+    _opcode('NOP', _IMM, 2, 0, False),  # 0xC2
+    _opcode('DCP', _IZX, 8, 0, False),  # 0xC3
+    _opcode('CPY', _ZP, 3),  # 0xC4
+    _opcode('CMP', _ZP, 3),  # 0xC5
+    _opcode('DEC', _ZP, 5),  # 0xC6
+    _opcode('DCP', _ZP, 5, 0, False),  # 0xC7
+    _opcode('INY', _IMP, 2),  # 0xC8
+    _opcode('CMP', _IMM, 2),  # 0xC9
+    _opcode('DEX', _IMP, 2),  # 0xCA
+    _opcode('SBX', _IMM, 2, 0, False),  # 0xCB
+    _opcode('CPY', _ABS, 4),  # 0xCC
+    _opcode('CMP', _ABS, 4),  # 0xCD
+    _opcode('DEC', _ABS, 6),  # 0xCE
+    _opcode('DCP', _ABS, 6, 0, False),  # 0xCF
+    _opcode('BNE', _REL, 2, 1),  # 0xD0
+    _opcode('CMP', _IZY, 5, 1),  # 0xD1
+    _opcode('JAM', _IMP, 0, 0, False),  # 0xD2
+    _opcode('DCP', _IZY, 8, 0, False),  # 0xD3
+    _opcode('NOP', _ZPX, 4, 0, False),  # 0xD4
+    _opcode('CMP', _ZPX, 4),  # 0xD5
+    _opcode('DEC', _ZPX, 6),  # 0xD6
+    _opcode('DCP', _ZPX, 6, 0, False),  # 0xD7
+    _opcode('CLD', _IMP, 2),  # 0xD8
+    _opcode('CMP', _ABY, 4, 1),  # 0xD9
+    _opcode('NOP', _IMP, 2, 0, False),  # 0xDA
+    _opcode('DCP', _ABY, 7, 0, False),  # 0xDB
+    _opcode('NOP', _ABX, 4, 1, False),  # 0xDC
+    _opcode('CMP', _ABX, 4, 1),  # 0xDD
+    _opcode('DEC', _ABX, 7),  # 0xDE
+    _opcode('DCP', _ABX, 7, 0, False),  # 0xDF
+    _opcode('CPX', _IMM, 2),  # 0xE0
+    _opcode('SBC', _IZX, 6),  # 0xE1
+    _opcode('NOP', _IMM, 2, 0, False),  # 0xE2
+    _opcode('ISC', _IZX, 8, 0, False),  # 0xE3
+    _opcode('CPX', _ZP, 3),  # 0xE4
+    _opcode('SBC', _ZP, 3),  # 0xE5
+    _opcode('INC', _ZP, 5),  # 0xE6
+    _opcode('ISC', _ZP, 5, 0, False),  # 0xE7
+    _opcode('INX', _IMP, 2),  # 0xE8
+    _opcode('SBC', _IMM, 2),  # 0xE9
+    _opcode('NOP', _IMP, 2),  # 0xEA
+    _opcode('SBC', _IMM, 2, 0, False),  # 0xEB
+    _opcode('CPX', _ABS, 4),  # 0xEC
+    _opcode('SBC', _ABS, 4),  # 0xED
+    _opcode('INC', _ABS, 6),  # 0xEE
+    _opcode('ISC', _ABS, 6, 0, False),  # 0xEF
+    _opcode('BEQ', _REL, 2, 1),  # 0xF0
+    _opcode('SBC', _IZY, 5, 1),  # 0xF1
+    _opcode('JAM', _IMP, 0, 0, False),  # 0xF2
+    _opcode('ISC', _IZY, 8, 0, False),  # 0xF3
+    _opcode('NOP', _ZPX, 4, 0, False),  # 0xF4
+    _opcode('SBC', _ZPX, 4),  # 0xF5
+    _opcode('INC', _ZPX, 6),  # 0xF6
+    _opcode('ISC', _ZPX, 6, 0, False),  # 0xF7
+    _opcode('SED', _IMP, 2),  # 0xF8
+    _opcode('SBC', _ABY, 4, 1),  # 0xF9
+    _opcode('NOP', _IMP, 2, 0, False),  # 0xFA
+    _opcode('ISC', _ABY, 7, 0, False),  # 0xFB
+    _opcode('NOP', _ABX, 4, 1, False),  # 0xFC
+    _opcode('SBC', _ABX, 4, 1),  # 0xFD
+    _opcode('INC', _ABX, 7),  # 0xFE
+    _opcode('ISC', _ABX, 7, 0, False),  # 0xFF
+)
+
+
+def _encodings() -> dict:
+    # The opcodes generated by the assembler. Some undocumented instructions have several opcodes for the same
+    # addressing, the documented one is preferred and then the lowest one.
+    encodings = {}
+    for code in sorted(range(len(OPCODES)), key=lambda code: (not OPCODES[code].documented, code)):
+        opcode = OPCODES[code]
+        encodings.setdefault(opcode.op, {}).setdefault(opcode.mode, code)
+    return encodings
+
+
+ENCODINGS = _encodings()  # The mnemonic to the modes to the opcodes
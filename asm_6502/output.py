@@ -0,0 +1,122 @@
+from typing import List, Tuple, Optional
+
+
+__all__ = ['write_raw', 'write_flat', 'write_image', 'write_ihex', 'write_srec', 'OUTPUT_FORMATS']
+
+_FILL_CHUNK = 1 << 20
+
+
+def _sorted_segments(codes: List[Tuple[int, list]]) -> List[Tuple[int, list]]:
+    return sorted((segment for segment in codes if len(segment[1]) > 0), key=lambda segment: segment[0])
+
+
+def _check_range(codes: List[Tuple[int, list]], start: int, end: int):
+    for offset, code in codes:
+        if offset < start or offset + len(code) > end:
+            raise ValueError(f"The codes at {hex(offset)} of {len(code)} bytes are out of [{hex(start)}, {hex(end)})")
+
+
+def _image(codes: List[Tuple[int, list]], start: int, end: int, fill: int) -> bytearray:
+    # The later segments overwrite the earlier ones when they overlap
+    _check_range(codes, start, end)
+    image = bytearray([fill]) * (end - start)
+    for offset, code in codes:
+        image[offset - start:offset - start + len(code)] = bytes(code)
+    return image
+
+
+def write_raw(codes: List[Tuple[int, list]], stream, fill: int = 0x00):
+    # The bytes from the lowest to the highest address, the gaps are filled
+    segments = _sorted_segments(codes)
+    if not segments:
+        return
+    start = segments[0][0]
+    end = max(offset + len(code) for offset, code in segments)
+    stream.write(_image(segments, start, end, fill))
+
+
+def write_flat(codes: List[Tuple[int, list]], stream, fill: int = 0x00, size: int = 0x10000):
+    # The whole address space, the offsets in the file are the addresses
+    stream.write(_image(codes, 0, size, fill))
+
+
+def write_image(codes: List[Tuple[int, list]], path: str, fill: int = 0x00, size: int = 0x10000):
+    # The same as `write_flat`, but the file is created with its final size and each segment is written at its
+    # offset, so the time depends on the emitted bytes. The gaps are sparse holes that read as zeros on the file
+    # systems that support them, and are only written when the fill byte is not zero.
+    segments = _sorted_segments(codes)
+    _check_range(segments, 0, size)
+    with open(path, 'w+b', buffering=0) as writer:
+        writer.truncate(size)
+        if fill != 0x00:
+            end = 0
+            for offset, code in segments + [(size, [])]:
+                for start in range(end, offset, _FILL_CHUNK):
+                    writer.seek(start)
+                    writer.write(bytes([fill]) * (min(offset, start + _FILL_CHUNK) - start))
+                end = max(end, offset + len(code))
+        for offset, code in segments:
+            writer.seek(offset)
+            writer.write(bytes(code))
+
+
+def _ihex_record(address: int, record_type: int, data: bytes) -> str:
+    record = bytes([len(data), address >> 8, address & 0xFF, record_type]) + data
+    return f':{record.hex().upper()}{-sum(record) & 0xFF:02X}\n'
+
+
+def write_ihex(codes: List[Tuple[int, list]], stream, record_size: int = 16):
+    # Intel HEX, the extended linear address records are written for the addresses above 0xFFFF
+    upper = 0
+    for offset, code in _sorted_segments(codes):
+        data, lines = bytes(code), []
+        position = 0
+        while position < len(data):
+            address = offset + position
+            if address >> 16 != upper:
+                upper = address >> 16
+                lines.append(_ihex_record(0, 0x04, upper.to_bytes(2, 'big')))
+            # The records do not cross the 64 KiB boundaries
+            length = min(record_size, len(data) - position, 0x10000 - (address & 0xFFFF))
+            lines.append(_ihex_record(address & 0xFFFF, 0x00, data[position:position + length]))
+            position += length
+        stream.write(''.join(lines).encode('ascii'))
+    stream.write(_ihex_record(0, 0x01, b'').encode('ascii'))
+
+
+def _srec_record(record_type: int, address: int, address_size: int, data: bytes) -> str:
+    record = bytes([address_size + len(data) + 1]) + address.to_bytes(address_size, 'big') + data
+    return f'S{record_type}{record.hex().upper()}{~sum(record) & 0xFF:02X}\n'
+
+
+def write_srec(codes: List[Tuple[int, list]],
+               stream,
+               record_size: int = 16,
+               entry: Optional[int] = None,
+               header: bytes = b''):
+    # Motorola S-record, the size of the addresses is the smallest one that fits the highest address
+    segments = _sorted_segments(codes)
+    end = max([offset + len(code) - 1 for offset, code in segments] + [entry or 0])
+    data_type, address_size = (1, 2) if end <= 0xFFFF else (2, 3) if end <= 0xFFFFFF else (3, 4)
+    stream.write(_srec_record(0, 0, 2, header).encode('ascii'))
+    count = 0
+    for offset, code in segments:
+        data, lines = bytes(code), []
+        for position in range(0, len(data), record_size):
+            lines.append(_srec_record(data_type, offset + position, address_size,
+                                      data[position:position + record_size]))
+        count += len(lines)
+        stream.write(''.join(lines).encode('ascii'))
+    if count <= 0xFFFF:
+        stream.write(_srec_record(5, count, 2, b'').encode('ascii'))
+    elif count <= 0xFFFFFF:
+        stream.write(_srec_record(6, count, 3, b'').encode('ascii'))
+    stream.write(_srec_record(10 - data_type, entry or 0, address_size, b'').encode('ascii'))
+
+
+OUTPUT_FORMATS = {
+    'raw': write_raw,
+    'flat': write_flat,
+    'ihex': write_ihex,
+    'srec': write_srec,
+}
@@ -0,0 +1,94 @@
+from collections import namedtuple
+from typing import List, Tuple, Iterable, Dict
+
+from .grammar import Addressing, Instruction
+from .opcodes import OPCODES
+from .listing import _sorted_segments, _codes_at
+
+
+__all__ = ['PageCrossing', 'find_page_crossings']
+
+
+class PageCrossing(namedtuple('PageCrossing', ['kind', 'address', 'target', 'label', 'hot', 'line_num',
+                                               'file_name'])):
+    # The kind is 'branch' or 'table'. The target is the address of the branch target, or the base address of the
+    # indexed access to the table named by the label. `hot` is whether the instruction is in a `.HOT` region.
+
+    __slots__ = ()
+
+    BRANCH = 'branch'
+    TABLE = 'table'
+
+
+_DATA_OPS = {'.BYTE', '.WORD', '.FILL', '.RES', '.INCBIN', '.TABLE', '.WTABLE'}
+
+
+def _hot_flags(instructions: List[Instruction]) -> List[bool]:
+    # Whether each instruction is between `.HOT` and `.ENDHOT`, the regions can be nested
+    flags, depth = [], 0
+    for inst in instructions:
+        if inst.op == '.HOT':
+            depth += 1
+        elif inst.op == '.ENDHOT':
+            depth = max(depth - 1, 0)
+        flags.append(depth > 0)
+    return flags
+
+
+def _tables(instructions: List[Instruction], code_offsets: List[int], code_sizes: List[int]) -> Dict[str, tuple]:
+    # The labeled data that cross pages, the data without labels that follow immediately are in the same table
+    tables = {}
+    for i, inst in enumerate(instructions):
+        if inst.label is None or inst.op not in _DATA_OPS or code_sizes[i] == 0:
+            continue
+        start = end = code_offsets[i]
+        j = i
+        while j < len(instructions) and instructions[j].op in _DATA_OPS and code_offsets[j] == end and \
+                (j == i or instructions[j].label is None):
+            end += code_sizes[j]
+            j += 1
+        if start >> 8 != (end - 1) >> 8:
+            tables[inst.label] = start, end
+    return tables
+
+
+def find_page_crossings(codes: List[Tuple[int, list]],
+                        code_offsets: List[int],
+                        code_sizes: List[int],
+                        instructions: Iterable[Instruction],
+                        label_references: Dict[str, List[int]]) -> List[PageCrossing]:
+    # The branches to other pages and the absolute indexed accesses to the tables that cross pages, which cost one
+    # more cycle. The accesses are found by the references of the labels from the first pass. The pointers of
+    # `(zp),Y` are not known, so they are not checked.
+    instructions = list(instructions)
+    codes, starts = _sorted_segments(codes)
+    hot = _hot_flags(instructions)
+    found = []
+
+    def code_at(index: int) -> bytes:
+        return _codes_at(codes, starts, code_offsets[index], code_sizes[index])
+
+    for i, inst in enumerate(instructions):
+        code = code_at(i) if inst.op in Instruction.KEYWORDS else b''
+        if len(code) != 2 or OPCODES[code[0]].mode != Addressing.RELATIVE:
+            continue
+        following = code_offsets[i] + 2
+        target = (following + (code[1] ^ 0x80) - 0x80) & 0xFFFF
+        if (target ^ following) & 0xFF00:
+            found.append((i, PageCrossing(PageCrossing.BRANCH, code_offsets[i], target, None, hot[i],
+                                          inst.line_num, inst.file_name)))
+    for label, (start, end) in _tables(instructions, code_offsets, code_sizes).items():
+        for i in label_references.get(label, []):
+            inst = instructions[i]
+            code = code_at(i) if inst.op in Instruction.KEYWORDS else b''
+            if len(code) != 3:
+                continue
+            opcode = OPCODES[code[0]]
+            if opcode.mode not in {Addressing.ABSOLUTE_X, Addressing.ABSOLUTE_Y} or not opcode.page_cross:
+                continue
+            base = code[1] | code[2] << 8
+            if start <= base < end and base >> 8 != (end - 1) >> 8:
+                found.append((i, PageCrossing(PageCrossing.TABLE, code_offsets[i], base, label, hot[i],
+                                              inst.line_num, inst.file_name)))
+    found.sort(key=lambda item: item[0])
+    return [crossing for _, crossing in found]
@@ -0,0 +1,224 @@
+import re
+import zlib
+from typing import List, Tuple, Union
+
+from .output import _image
+
+
+__all__ = ['diff_runs', 'create_ips', 'apply_ips', 'create_bps', 'apply_bps']
+
+
+_BLOCK_SIZES = (4096, 64)  # The equal blocks are skipped without comparing the bytes one by one
+
+_IPS_EOF = 0x454F46  # The offset that is the same as the end marker `EOF`
+_IPS_MAX_OFFSET = 0xFFFFFF
+_IPS_MAX_SIZE = 0xFFFF
+_IPS_RLE_MIN = 14  # A run of the same byte shorter than this is cheaper in a normal record
+_IPS_RLE = re.compile(rb'(.)\1{%d,}' % (_IPS_RLE_MIN - 1), re.DOTALL)
+
+Image = Union[bytes, bytearray, memoryview, List[Tuple[int, list]]]
+
+
+def _as_image(image: Image, fill: int, size: int):
+    # The segments of the assembler are converted to a flat image
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return image
+    return _image(image, 0, size, fill)
+
+
+def _diff_block(old: memoryview, new: memoryview, start: int, end: int, level: int, runs: list, merge_gap: int):
+    if level < len(_BLOCK_SIZES):
+        block_size = _BLOCK_SIZES[level]
+        for position in range(start, end, block_size):
+            stop = min(position + block_size, end)
+            if old[position:stop] != new[position:stop]:
+                _diff_block(old, new, position, stop, level + 1, runs, merge_gap)
+        return
+    for position in range(start, end):
+        if old[position] != new[position]:
+            if runs and position - runs[-1][1] <= merge_gap:
+                runs[-1][1] = position + 1
+            else:
+                runs.append([position, position + 1])
+
+
+def diff_runs(old: Image, new: Image, merge_gap: int = 0, fill: int = 0x00, size: int = 0x10000) -> List[tuple]:
+    # The runs [start, end) where the new image is different from the old one, the runs separated by no more than
+    # `merge_gap` unchanged bytes are coalesced, the bytes after the end of the old image are all changed
+    old, new = memoryview(_as_image(old, fill, size)), memoryview(_as_image(new, fill, size))
+    common = min(len(old), len(new))
+    runs = []
+    _diff_block(old, new, 0, common, 0, runs, merge_gap)
+    if len(new) > common:
+        if runs and common - runs[-1][1] <= merge_gap:
+            runs[-1][1] = len(new)
+        else:
+            runs.append([common, len(new)])
+    return [tuple(run) for run in runs]
+
+
+def _ips_literals(new, start: int, end: int) -> List[bytes]:
+    # One byte is left in each record so that the record at the offset `EOF` can start one byte earlier
+    records = []
+    for offset in range(start, end, _IPS_MAX_SIZE - 1):
+        stop = min(end, offset + _IPS_MAX_SIZE - 1)
+        if offset == _IPS_EOF:
+            offset -= 1
+        records.append(offset.to_bytes(3, 'big') + (stop - offset).to_bytes(2, 'big') + bytes(new[offset:stop]))
+    return records
+
+
+def _ips_records(new, start: int, end: int) -> List[bytes]:
+    # The long runs of the same byte are written as RLE records
+    if end > _IPS_MAX_OFFSET + 1:
+        raise ValueError(f"IPS can not patch the offsets above {hex(_IPS_MAX_OFFSET)}")
+    records, position = [], start
+    for match in _IPS_RLE.finditer(new, start, end):
+        records.extend(_ips_literals(new, position, match.start()))
+        offset = match.start()
+        while offset < match.end():
+            if offset == _IPS_EOF:
+                records.extend(_ips_literals(new, offset, offset + 1))
+                offset += 1
+                continue
+            length = min(_IPS_MAX_SIZE, match.end() - offset)
+            records.append(offset.to_bytes(3, 'big') + b'\x00\x00' + length.to_bytes(2, 'big') +
+                           bytes(new[offset:offset + 1]))
+            offset += length
+        position = match.end()
+    records.extend(_ips_literals(new, position, end))
+    return records
+
+
+def create_ips(old: Image, new: Image, fill: int = 0x00, size: int = 0x10000) -> bytes:
+    # A record costs 5 bytes besides the data, so the changes separated by less than 5 bytes are coalesced
+    old, new = _as_image(old, fill, size), _as_image(new, fill, size)
+    chunks = [b'PATCH']
+    for start, end in diff_runs(old, new, merge_gap=4):
+        chunks.extend(_ips_records(new, start, end))
+    chunks.append(b'EOF')
+    if len(new) < len(old):
+        # The truncation extension
+        chunks.append(len(new).to_bytes(3, 'big'))
+    return b''.join(chunks)
+
+
+def apply_ips(old: Image, patch: bytes, fill: int = 0x00, size: int = 0x10000) -> bytearray:
+    data = bytearray(_as_image(old, fill, size))
+    if patch[:5] != b'PATCH':
+        raise ValueError("Invalid IPS patch: missing the header")
+    position = 5
+    while True:
+        if position + 3 > len(patch):
+            raise ValueError("Invalid IPS patch: missing the end marker")
+        if patch[position:position + 3] == b'EOF':
+            position += 3
+            break
+        offset = int.from_bytes(patch[position:position + 3], 'big')
+        length = int.from_bytes(patch[position + 3:position + 5], 'big')
+        position += 5
+        if length == 0:
+            length = int.from_bytes(patch[position:position + 2], 'big')
+            record = patch[position + 2:position + 3] * length
+            position += 3
+        else:
+            record = patch[position:position + length]
+            position += length
+        if len(record) != length:
+            raise ValueError("Invalid IPS patch: the record is incomplete")
+        if offset + length > len(data):
+            data.extend(bytes(offset + length - len(data)))
+        data[offset:offset + length] = record
+    if position + 3 <= len(patch):
+        del data[int.from_bytes(patch[position:position + 3], 'big'):]
+    return data
+
+
+def _encode_number(value: int) -> bytes:
+    # The variable-length numbers of BPS
+    encoded = bytearray()
+    while True:
+        low = value & 0x7F
+        value >>= 7
+        if value == 0:
+            encoded.append(0x80 | low)
+            return bytes(encoded)
+        encoded.append(low)
+        value -= 1
+
+
+def _decode_number(patch: bytes, position: int) -> tuple:
+    value, shift = 0, 1
+    while True:
+        if position >= len(patch):
+            raise ValueError("Invalid BPS patch: the number is incomplete")
+        byte = patch[position]
+        position += 1
+        value += (byte & 0x7F) * shift
+        if byte & 0x80:
+            return value, position
+        shift <<= 7
+        value += shift
+
+
+_BPS_SOURCE_READ, _BPS_TARGET_READ, _BPS_SOURCE_COPY, _BPS_TARGET_COPY = range(4)
+
+
+def create_bps(old: Image, new: Image, fill: int = 0x00, size: int = 0x10000) -> bytes:
+    # The unchanged bytes are read from the source and the changed runs are written in the patch
+    old, new = _as_image(old, fill, size), _as_image(new, fill, size)
+    chunks = [b'BPS1', _encode_number(len(old)), _encode_number(len(new)), _encode_number(0)]
+    offset = 0
+    for start, end in diff_runs(old, new, merge_gap=1):
+        if start > offset:
+            chunks.append(_encode_number((start - offset - 1) << 2 | _BPS_SOURCE_READ))
+        chunks.append(_encode_number((end - start - 1) << 2 | _BPS_TARGET_READ))
+        chunks.append(bytes(new[start:end]))
+        offset = end
+    if len(new) > offset:
+        chunks.append(_encode_number((len(new) - offset - 1) << 2 | _BPS_SOURCE_READ))
+    chunks.append(zlib.crc32(old).to_bytes(4, 'little'))
+    chunks.append(zlib.crc32(new).to_bytes(4, 'little'))
+    patch = b''.join(chunks)
+    return patch + zlib.crc32(patch).to_bytes(4, 'little')
+
+
+def apply_bps(old: Image, patch: bytes, fill: int = 0x00, size: int = 0x10000) -> bytearray:
+    source = bytes(_as_image(old, fill, size))
+    if patch[:4] != b'BPS1' or len(patch) < 16:
+        raise ValueError("Invalid BPS patch: missing the header")
+    if zlib.crc32(patch[:-4]) != int.from_bytes(patch[-4:], 'little'):
+        raise ValueError("Invalid BPS patch: the checksum of the patch does not match")
+    if zlib.crc32(source) != int.from_bytes(patch[-12:-8], 'little'):
+        raise ValueError("The checksum of the source does not match the BPS patch")
+    source_size, position = _decode_number(patch, 4)
+    target_size, position = _decode_number(patch, position)
+    metadata_size, position = _decode_number(patch, position)
+    position += metadata_size
+    if source_size != len(source):
+        raise ValueError("The size of the source does not match the BPS patch")
+    target = bytearray()
+    source_offset = target_offset = 0
+    while position < len(patch) - 12:
+        action, position = _decode_number(patch, position)
+        command, length = action & 3, (action >> 2) + 1
+        if command == _BPS_SOURCE_READ:
+            target += source[len(target):len(target) + length]
+        elif command == _BPS_TARGET_READ:
+            target += patch[position:position + length]
+            position += length
+        else:
+            relative, position = _decode_number(patch, position)
+            relative = -(relative >> 1) if relative & 1 else relative >> 1
+            if command == _BPS_SOURCE_COPY:
+                source_offset += relative
+                target += source[source_offset:source_offset + length]
+                source_offset += length
+            else:
+                target_offset += relative
+                for _ in range(length):
+                    target.append(target[target_offset])
+                    target_offset += 1
+    if len(target) != target_size or zlib.crc32(target) != int.from_bytes(patch[-8:-4], 'little'):
+        raise ValueError("The patched data does not match the BPS patch")
+    return target
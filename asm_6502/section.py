@@ -0,0 +1,196 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from itertools import accumulate
+from typing import Union, List, Tuple, Optional, Dict
+
+from .grammar import parse_source, Addressing, Arithmetic, Instruction
+from .assemble import Assembler, AssembleError
+from .link import assemble_object, link
+
+
+__all__ = ['Placement', 'place_sections', 'assemble_sections', 'format_memory_map']
+
+
+class Placement(namedtuple('Placement', ['name', 'address', 'size'])):
+
+    __slots__ = ()
+
+    @property
+    def end(self):
+        return self.address + self.size
+
+
+class _FreeList(object):
+    # The free intervals are indexed by starts for the reservations and by sizes for the best fit, the searches are
+    # bisections and the updates only move the references in the lists
+
+    def __init__(self, start: int, end: int):
+        self.starts = []  # The starts of the free intervals in order
+        self.ends = {}  # The end of the free interval at each start
+        self.sizes = []  # The sizes and the starts of the free intervals in order
+        self._add(start, end)
+
+    def _add(self, start: int, end: int):
+        if end > start:
+            insort(self.starts, start)
+            self.ends[start] = end
+            insort(self.sizes, (end - start, start))
+
+    def _remove(self, index: int) -> Tuple[int, int]:
+        start = self.starts.pop(index)
+        end = self.ends.pop(start)
+        del self.sizes[bisect_left(self.sizes, (end - start, start))]
+        return start, end
+
+    def reserve(self, start: int, end: int):
+        # The intervals overlapping [start, end) are consecutive, the first one may start before the start
+        index = bisect_right(self.starts, start) - 1
+        if index < 0 or self.ends[self.starts[index]] <= start:
+            index += 1
+        removed = [self._remove(index) for _ in range(index, bisect_left(self.starts, end))]
+        if removed:
+            self._add(removed[0][0], start)
+            self._add(end, removed[-1][1])
+
+    def allocate(self, size: int, align: int) -> Optional[int]:
+        # Best fit, the holes are visited from the smallest one that is not smaller than the size. A hole of at least
+        # size + align - 1 bytes always fits, so the loop stops there at the latest and only the holes of sizes in
+        # [size, size + align - 1) may be skipped
+        index = bisect_left(self.sizes, (size, -1))
+        while index < len(self.sizes):
+            hole_size, hole_start = self.sizes[index]
+            address = (hole_start + align - 1) // align * align
+            if address + size <= hole_start + hole_size:
+                self._remove(bisect_left(self.starts, hole_start))
+                self._add(hole_start, address)
+                self._add(address + size, hole_start + hole_size)
+                return address
+            index += 1
+        return None
+
+
+def place_sections(sections: List[Tuple[str, int]],
+                   constraints: Optional[Dict[str, dict]] = None,
+                   max_memory: int = 0x10000,
+                   reserved: List[Tuple[int, int]] = ()) -> List[Placement]:
+    # The constraints of each section can have `address`, `align` and `zero_page`,
+    # the reserved intervals [start, end) are not used by the sections and the fixed sections should not overlap them
+    constraints = constraints or {}
+    for name, constraint in constraints.items():
+        unknown = set(constraint.keys()) - {'address', 'align', 'zero_page'}
+        if unknown:
+            raise AssembleError(f"Unknown constraints {sorted(unknown)} for section '{name}'")
+    # The same as `Assembler`, the codes should end before the max memory
+    limit = max_memory - 1
+    pools = [_FreeList(0, min(0x100, limit)), _FreeList(0x100, limit)]
+    for start, end in reserved:
+        for pool in pools:
+            pool.reserve(start, end)
+
+    placements, fixed = {}, []
+    for name, size in sections:
+        address = constraints.get(name, {}).get('address')
+        if address is not None:
+            if address < 0 or address + size > limit:
+                raise AssembleError(f"Section '{name}' at {hex(address)} will exceed the max memory {hex(max_memory)}")
+            fixed.append(Placement(name, address, size))
+    fixed.sort(key=lambda placement: placement.address)
+    for prev, placement in zip(fixed, fixed[1:]):
+        if placement.address < prev.end:
+            raise AssembleError(f"Section '{placement.name}' at {hex(placement.address)} "
+                                f"overlaps section '{prev.name}'")
+    reserved = sorted(reserved)
+    ends = list(accumulate((end for _, end in reserved), max))
+    for placement in fixed:
+        # The reserved interval with the largest end among those starting before the end of the section
+        index = bisect_left(reserved, (placement.end, -1)) - 1
+        if index >= 0 and ends[index] > placement.address:
+            start, end = next((start, end) for start, end in reserved[:index + 1] if end > placement.address)
+            raise AssembleError(f"Section '{placement.name}' at {hex(placement.address)} "
+                                f"overlaps the reserved memory [{hex(start)}, {hex(end)})")
+        placements[placement.name] = placement
+        for pool in pools:
+            pool.reserve(placement.address, placement.end)
+
+    # The larger sections are placed first, and the zero page is only used by the other sections when it is the
+    # only space left
+    floating = [(name, size) for name, size in sections if name not in placements]
+    floating.sort(key=lambda section: (not constraints.get(section[0], {}).get('zero_page', False), -section[1]))
+    for name, size in floating:
+        constraint = constraints.get(name, {})
+        align = constraint.get('align', 1)
+        order = pools if constraint.get('zero_page', False) else pools[::-1]
+        for pool in order:
+            address = pool.allocate(size, align)
+            if address is not None:
+                break
+        else:
+            raise AssembleError(f"Can not find free memory for section '{name}' of {size} bytes")
+        placements[name] = Placement(name, address, size)
+    return sorted(placements.values(), key=lambda placement: (placement.address, placement.size))
+
+
+def _section_name(inst: Instruction, line_number: int) -> str:
+    addressing = inst.addressing
+    if addressing.mode == Addressing.ADDRESS and isinstance(addressing.address, Arithmetic) and \
+            addressing.address.mode == Arithmetic.LABEL:
+        return addressing.address.param
+    if addressing.mode == Addressing.STRING and len(addressing.address.param) == 1:
+        return addressing.address.param[0].param
+    raise AssembleError(f"`.SECTION` only accepts a name at line {line_number}")
+
+
+def assemble_sections(instructions: Union[str, List],
+                      constraints: Optional[Dict[str, dict]] = None,
+                      reserved: List[Tuple[int, int]] = (),
+                      add_entry: bool = True,
+                      **kwargs) -> Tuple[List, List[Placement]]:
+    # Assembles each section as a relocatable object and links them at the placed addresses,
+    # returns the codes and the placements of the sections
+    assembler = Assembler(**kwargs)
+    if isinstance(instructions, str):
+        instructions = parse_source(instructions, assembler.defines)
+    sections = {}  # The instructions of each section, a section can be continued by another `.SECTION`
+    try:
+        instructions = assembler._include(instructions)
+        current = None
+        for inst in instructions:
+            assembler.line_number, assembler.file_name = inst.line_num, inst.file_name
+            if inst.op == '.SECTION':
+                if inst.label is not None:
+                    raise AssembleError(f"Label is not allowed for `.SECTION` at line {inst.line_num}")
+                current = sections.setdefault(_section_name(inst, inst.line_num), [])
+            elif current is None:
+                raise AssembleError(f"The instruction is not in any section at line {inst.line_num}")
+            else:
+                current.append(inst)
+    except AssembleError as e:
+        raise assembler._file_error(e)
+    objects = {name: assemble_object(section, **kwargs) for name, section in sections.items()}
+    placements = place_sections([(name, obj.size) for name, obj in objects.items()],
+                                constraints, assembler.max_memory, reserved)
+    addresses = {placement.name: placement.address for placement in placements}
+    codes = link([(addresses[name], obj) for name, obj in objects.items()],
+                 add_entry=add_entry, program_entry=assembler.program_entry, max_memory=assembler.max_memory)
+    return codes, placements
+
+
+def format_memory_map(placements: List[Placement],
+                      max_memory: int = 0x10000,
+                      reserved: List[Tuple[int, int]] = ()) -> str:
+    # One line for each section, reserved interval and free interval
+    regions = [(placement.address, placement.end, placement.name) for placement in placements]
+    regions += [(start, end, '(reserved)') for start, end in reserved]
+    regions.sort()
+    lines, end = [], 0
+    for region_start, region_end, name in regions:
+        if region_start > end:
+            lines.append(f'${end:04X}-${region_start - 1:04X} {region_start - end:6d}  (free)')
+        if region_end > region_start:
+            lines.append(f'${region_start:04X}-${region_end - 1:04X} {region_end - region_start:6d}  {name}')
+        else:
+            lines.append(f'${region_start:04X}       {0:6d}  {name}')
+        end = max(end, region_end)
+    if max_memory > end:
+        lines.append(f'${end:04X}-${max_memory - 1:04X} {max_memory - end:6d}  (free)')
+    return '\n'.join(lines)
@@ -0,0 +1,151 @@
+import sys
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import List, Optional, Tuple, Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__all__ = ['SourceMap']
+
+
+class SourceMap(object):
+    # The addresses and the lines of the instructions that emit codes, sorted by the addresses. The overlapping
+    # instructions are resolved to the one with the highest start address.
+
+    MAGIC = b'A65M'
+    FORMAT = 1
+
+    _HEADER = struct.Struct('<4sBII')  # Magic, format, the number of the files and the number of the entries
+    _NAME = struct.Struct('<H')  # The length of the file name, 0xFFFF for the main source
+
+    def __init__(self, files: List[Optional[str]], starts: array, sizes: array, lines: array, file_indices: array):
+        self.files = files  # The file names, None for the main source
+        self.starts = starts  # The start addresses of the entries
+        self.sizes = sizes  # The number of bytes of the entries
+        self.lines = lines  # The line numbers of the entries
+        self.file_indices = file_indices  # The indices of the files of the entries
+        self._ends = array('q', [start + size for start, size in zip(starts, sizes)])
+        # The entries sorted by the files and the lines, the lines are the lower 32 bits of the keys. The sorting is
+        # stable, so the entries of the same line are still sorted by the addresses
+        keys = [file_index << 32 | line for file_index, line in zip(file_indices, lines)]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._line_keys = array('q', [keys[i] for i in order])
+        self._line_starts = array('q', [starts[i] for i in order])
+
+    @classmethod
+    def from_instructions(cls, code_offsets: List[int], code_sizes: List[int], instructions: Iterable):
+        files, file_indices = [], {}
+        entries = []
+        for offset, size, (_, _, _, line_num, file_name) in zip(code_offsets, code_sizes, instructions):
+            if size > 0:
+                file_index = file_indices.get(file_name)
+                if file_index is None:
+                    file_index = file_indices[file_name] = len(files)
+                    files.append(file_name)
+                entries.append((offset, size, line_num, file_index))
+        entries.sort(key=itemgetter(0))
+        columns = list(zip(*entries)) or [()] * 4
+        return cls(files, *(array('q', column) for column in columns))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def index_at(self, address: int) -> int:
+        # The index of the entry that contains the address, -1 if not found
+        index = bisect_right(self.starts, address) - 1
+        if index >= 0 and address < self._ends[index]:
+            return index
+        return -1
+
+    def indices_at(self, addresses: Iterable[int], vectorized: Optional[bool] = None) -> array:
+        # The same as `index_at` for a batch of the addresses
+        if vectorized is None:
+            vectorized = np is not None
+        if vectorized and len(self.starts):
+            addresses = np.asarray(addresses, dtype=np.int64)
+            starts = np.frombuffer(self.starts, dtype=np.int64)
+            ends = np.frombuffer(self._ends, dtype=np.int64)
+            indices = np.searchsorted(starts, addresses, side='right') - 1
+            found = (indices >= 0) & (addresses < ends[np.maximum(indices, 0)])
+            return array('q', np.where(found, indices, -1).astype(np.int64).tobytes())
+        starts, ends = self.starts, self._ends
+        indices = array('q')
+        for address in addresses:
+            index = bisect_right(starts, address) - 1
+            indices.append(index if index >= 0 and address < ends[index] else -1)
+        return indices
+
+    def line_at(self, address: int) -> Optional[Tuple[Optional[str], int]]:
+        # The file name and the line number of the address
+        index = self.index_at(address)
+        if index < 0:
+            return None
+        return self.files[self.file_indices[index]], self.lines[index]
+
+    def lines_at(self, addresses: Iterable[int], vectorized: Optional[bool] = None) -> array:
+        # The line numbers of a batch of the addresses, -1 if not found
+        lines = self.lines
+        return array('q', [lines[index] if index >= 0 else -1 for index in self.indices_at(addresses, vectorized)])
+
+    def address_of(self, line: int, file_name: Optional[str] = None) -> Optional[int]:
+        # The lowest address of the first line at or after the given line that emits codes in the file
+        if file_name not in self.files:
+            return None
+        file_index = self.files.index(file_name)
+        position = bisect_left(self._line_keys, file_index << 32 | line)
+        if position == len(self._line_keys) or self._line_keys[position] >> 32 != file_index:
+            return None
+        return self._line_starts[position]
+
+    def to_bytes(self) -> bytes:
+        # The header, the file names, then the starts, the sizes, the lines and the file indices as 32-bit integers
+        chunks = [self._HEADER.pack(self.MAGIC, self.FORMAT, len(self.files), len(self.starts))]
+        for name in self.files:
+            if name is None:
+                chunks.append(self._NAME.pack(0xFFFF))
+            else:
+                encoded = name.encode('utf-8')
+                chunks.append(self._NAME.pack(len(encoded)) + encoded)
+        for column in (self.starts, self.sizes, self.lines, self.file_indices):
+            values = array('I', column)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            chunks.append(values.tobytes())
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SourceMap':
+        if len(data) < cls._HEADER.size:
+            raise ValueError("Invalid source map: missing the header")
+        magic, version, num_files, num_entries = cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.FORMAT:
+            raise ValueError("Invalid source map: unknown magic or format")
+        position, files = cls._HEADER.size, []
+        try:
+            for _ in range(num_files):
+                length, = cls._NAME.unpack_from(data, position)
+                position += cls._NAME.size
+                if length == 0xFFFF:
+                    files.append(None)
+                else:
+                    files.append(data[position:position + length].decode('utf-8'))
+                    position += length
+        except (struct.error, UnicodeDecodeError):
+            raise ValueError("Invalid source map: broken file names")
+        columns, size = [], num_entries * array('I').itemsize
+        if len(data) != position + 4 * size:
+            raise ValueError("Invalid source map: missing the entries")
+        for _ in range(4):
+            values = array('I')
+            values.frombytes(data[position:position + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            columns.append(array('q', values))
+            position += size
+        return cls(files, *columns)
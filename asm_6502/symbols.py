@@ -0,0 +1,96 @@
+from array import array
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Optional, Tuple, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__all__ = ['SymbolIndex', 'write_vice_symbols', 'write_fceux_symbols', 'write_sym_symbols', 'SYMBOL_FORMATS']
+
+
+class SymbolIndex(object):
+    # The labels sorted by their addresses, the labels at the same address are kept in the order of definition
+
+    def __init__(self, label_offsets: dict):
+        items = sorted(label_offsets.items(), key=itemgetter(1))
+        self.names = [name for name, _ in items]
+        self.addresses = array('q', [address for _, address in items])
+        # Only the first label of each address is used by the lookups
+        self._unique = array('q', [i for i in range(len(items)) if i == 0 or items[i - 1][1] != items[i][1]])
+        self._unique_addresses = array('q', [self.addresses[i] for i in self._unique])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nearest_index(self, address: int) -> int:
+        # The index of the nearest label at or below the address, -1 if not found
+        position = bisect_right(self._unique_addresses, address) - 1
+        return self._unique[position] if position >= 0 else -1
+
+    def nearest_indices(self, addresses: Iterable[int], vectorized: Optional[bool] = None) -> array:
+        # The same as `nearest_index` for a batch of the addresses
+        if vectorized is None:
+            vectorized = np is not None
+        if vectorized and len(self._unique):
+            positions = np.searchsorted(np.frombuffer(self._unique_addresses, dtype=np.int64),
+                                        np.asarray(addresses, dtype=np.int64), side='right') - 1
+            unique = np.frombuffer(self._unique, dtype=np.int64)
+            indices = np.where(positions >= 0, unique[np.maximum(positions, 0)], -1)
+            return array('q', indices.astype(np.int64).tobytes())
+        unique, unique_addresses = self._unique, self._unique_addresses
+        indices = array('q')
+        for address in addresses:
+            position = bisect_right(unique_addresses, address) - 1
+            indices.append(unique[position] if position >= 0 else -1)
+        return indices
+
+    def nearest(self, address: int) -> Optional[Tuple[str, int]]:
+        # The nearest label at or below the address and the distance from it
+        index = self.nearest_index(address)
+        if index < 0:
+            return None
+        return self.names[index], address - self.addresses[index]
+
+    def symbolize(self, address: int) -> str:
+        # The address in the form of `LABEL`, `LABEL+$n`, or `$nnnn` if there is no label below it
+        return self._symbolize(address, self.nearest_index(address))
+
+    def symbolize_all(self, addresses: Iterable[int], vectorized: Optional[bool] = None) -> List[str]:
+        addresses = list(addresses)
+        return [self._symbolize(address, index)
+                for address, index in zip(addresses, self.nearest_indices(addresses, vectorized))]
+
+    def _symbolize(self, address: int, index: int) -> str:
+        if index < 0:
+            return f'${address:04X}'
+        distance = address - self.addresses[index]
+        return self.names[index] if distance == 0 else f'{self.names[index]}+${distance:X}'
+
+
+def write_vice_symbols(symbols: SymbolIndex, stream):
+    # The label commands of the monitor of VICE
+    stream.write(''.join(f'al C:{address:04X} .{name}\n'
+                         for name, address in zip(symbols.names, symbols.addresses)).encode('ascii'))
+
+
+def write_fceux_symbols(symbols: SymbolIndex, stream):
+    # The name list files of FCEUX, the comments are empty
+    stream.write(''.join(f'${address:04X}#{name}#\n'
+                         for name, address in zip(symbols.names, symbols.addresses)).encode('ascii'))
+
+
+def write_sym_symbols(symbols: SymbolIndex, stream):
+    # The symbol files of WLA-DX that are read by many emulators, the banks are the bits above the lower 16 bits
+    stream.write(('[labels]\n' + ''.join(f'{address >> 16:02X}:{address & 0xFFFF:04X} {name}\n'
+                                         for name, address in zip(symbols.names, symbols.addresses))).encode('ascii'))
+
+
+SYMBOL_FORMATS = {
+    'vice': write_vice_symbols,
+    'fceux': write_fceux_symbols,
+    'sym': write_sym_symbols,
+}
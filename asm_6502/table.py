@@ -0,0 +1,179 @@
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__all__ = ['evaluate_table']
+
+
+_LITERALS = re.compile(r'\$([0-9a-fA-F]+)|%([01]+)')
+
+
+class _NotInteger(Exception):
+    # An operand of `/` is not an integer, the index is the first one of the arrays
+
+    def __init__(self, index: int = 0):
+        super().__init__(index)
+        self.index = index
+
+
+def _divide(left, right):
+    # The same as the integer division of the assembler, the operands that are not integers are rejected instead of
+    # being rounded. The division by zero is not a number.
+    if np is None or not (isinstance(left, np.ndarray) or isinstance(right, np.ndarray)):
+        for value in (left, right):
+            if value != math.floor(value):
+                raise _NotInteger()
+        return left // right
+    left, right = np.broadcast_arrays(left, right)
+    fractions = (left != np.floor(left)) | (right != np.floor(right))
+    invalid = np.flatnonzero(fractions & np.isfinite(left) & np.isfinite(right))
+    if len(invalid):
+        raise _NotInteger(int(invalid[0]))
+    zeros = right == 0
+    if not zeros.any():
+        return np.floor_divide(left, right)
+    return np.where(zeros, np.nan, np.floor_divide(left, np.where(zeros, 1, right)))
+
+
+# The same operators are applied to the numbers and the NumPy arrays
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _divide,
+}
+
+_PYTHON_FUNCTIONS = {
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'sqrt': math.sqrt,
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'round': round,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'lo': lambda x: int(x) & 0xFF,
+    'hi': lambda x: (int(x) >> 8) & 0xFF,
+}
+
+_NUMPY_FUNCTIONS = None if np is None else {
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'sqrt': np.sqrt,
+    'floor': np.floor,
+    'ceil': np.ceil,
+    'round': np.rint,
+    'abs': np.abs,
+    'min': np.minimum,
+    'max': np.maximum,
+    'lo': lambda x: np.asarray(x).astype(np.int64) & 0xFF,
+    'hi': lambda x: (np.asarray(x).astype(np.int64) >> 8) & 0xFF,
+}
+
+
+def _compile(node, functions: dict):
+    # Returns a function of the index, the same function works for an integer or an array of the indices
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, functions)
+    if isinstance(node, ast.Constant) and type(node.value) in {int, float}:
+        value = node.value
+        return lambda index: value
+    if isinstance(node, ast.Name):
+        name = node.id.lower()
+        if name == 'i':
+            return lambda index: index
+        if name == 'pi':
+            return lambda index: math.pi
+        raise ValueError(f"Unknown name '{node.id}' in the table")
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        func = _OPERATORS[type(node.op)]
+        left, right = _compile(node.left, functions), _compile(node.right, functions)
+        return lambda index: func(left(index), right(index))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile(node.operand, functions)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        return lambda index: -operand(index)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id.lower()
+        if name not in functions:
+            raise ValueError(f"Unknown function '{node.func.id}' in the table")
+        func, args = functions[name], [_compile(arg, functions) for arg in node.args]
+        if len(args) != (2 if name in {'min', 'max'} else 1):
+            raise ValueError(f"Wrong number of arguments for '{node.func.id}' in the table")
+        if len(args) == 1:
+            arg = args[0]
+            return lambda index: func(arg(index))
+        return lambda index: func(*[arg(index) for arg in args])
+    raise ValueError("The table only accepts numbers, `I`, `PI`, `+`, `-`, `*`, `/`, brackets and the functions "
+                     f"{', '.join(sorted(_PYTHON_FUNCTIONS))}")
+
+
+@lru_cache(maxsize=256)
+def _parse_expression(expression: str) -> ast.Expression:
+    # The literals and the brackets of the assembler are translated to Python
+    code = _LITERALS.sub(lambda m: f'0x{m.group(1)}' if m.group(1) else f'0b{m.group(2)}', expression)
+    code = code.replace('[', '(').replace(']', ')')
+    try:
+        return ast.parse(code.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Invalid expression '{expression}' in the table")
+
+
+@lru_cache(maxsize=256)
+def _compile_expression(expression: str, vectorized: bool):
+    return _compile(_parse_expression(expression), _NUMPY_FUNCTIONS if vectorized else _PYTHON_FUNCTIONS)
+
+
+def evaluate_table(expression: str, count: int, is_word: bool = False, vectorized: Optional[bool] = None) -> bytes:
+    # Evaluates the expression for I in [0, count), the values are rounded to the nearest integers with the ties to
+    # the even ones in both paths, the words are in little-endian and the negative values are in two's complement
+    if vectorized is None:
+        vectorized = np is not None
+    func = _compile_expression(expression, vectorized)
+    low, high = (-0x8000, 0xFFFF) if is_word else (-0x80, 0xFF)
+    kind = 'word' if is_word else 'byte'
+    if vectorized:
+        try:
+            with np.errstate(all='ignore'):
+                values = np.broadcast_to(func(np.arange(count, dtype=np.int64)), (count,)).astype(np.float64)
+        except _NotInteger as e:
+            raise ValueError(f"The operand of `/` at index {e.index} is not an integer")
+        except (ArithmeticError, ValueError):
+            # The constant parts are calculated with the Python numbers, they fail at every index
+            raise ValueError("The value at index 0 is not a number")
+        invalid = np.flatnonzero(~np.isfinite(values))
+        if len(invalid):
+            raise ValueError(f"The value at index {invalid[0]} is not a number")
+        values = np.rint(values)
+        invalid = np.flatnonzero((values < low) | (values > high))
+        if len(invalid):
+            index = invalid[0]
+            raise ValueError(f"The value {int(values[index])} at index {index} can not fit in a {kind}")
+        return values.astype(np.int64).astype('<u2' if is_word else np.uint8).tobytes()
+    values = []
+    for index in range(count):
+        try:
+            value = round(func(index))
+        except _NotInteger:
+            raise ValueError(f"The operand of `/` at index {index} is not an integer")
+        except (ArithmeticError, ValueError):
+            raise ValueError(f"The value at index {index} is not a number")
+        if not low <= value <= high:
+            raise ValueError(f"The value {value} at index {index} can not fit in a {kind}")
+        values.append(value & high)
+    if is_word:
+        return bytes(byte for value in values for byte in (value & 0xFF, value >> 8))
+    return bytes(values)
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+
+from asm_6502 import Assembler, write_flat, write_ihex
+from asm_6502.cli import main as cli_main
+
+
+def generate(num_routines=3000):
+    lines = ["ORG $0200"]
+    for i in range(num_routines):
+        lines.extend([
+            f"R{i}   LDX #$10",
+            f"L{i}   LDA T{i},X",
+            "      STA $0200,X",
+            "      DEX",
+            f"      BNE L{i}",
+            "      RTS",
+            f"T{i}   .BYTE 1, 2, 3, 4",
+        ])
+    return '\n'.join(lines)
+
+
+def script_flat(codes, path):
+    # The scripts that copy the codes byte by byte
+    image = [0] * 0x10000
+    for offset, code in codes:
+        for i, byte in enumerate(code):
+            image[offset + i] = byte
+    with open(path, 'wb') as writer:
+        writer.write(bytes(image))
+
+
+def script_ihex(codes, path):
+    with open(path, 'w') as writer:
+        for offset, code in codes:
+            for start in range(0, len(code), 16):
+                data = code[start:start + 16]
+                address = offset + start
+                record = [len(data), address >> 8, address & 0xFF, 0] + data
+                line = ':'
+                for byte in record:
+                    line += '%02X' % byte
+                line += '%02X' % (-sum(record) & 0xFF)
+                writer.write(line + '\n')
+        writer.write(':00000001FF\n')
+
+
+def write_devnull(writer, codes):
+    with open(os.devnull, 'wb') as stream:
+        writer(codes, stream)
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, 'main.asm')
+        with open(source, 'w') as writer:
+            writer.write(generate())
+        codes = Assembler().assemble_file(source)
+        print(f'Code size: {sum(len(code) for _, code in codes)} bytes')
+
+        def script(output_format):
+            codes = Assembler().assemble_file(source)
+            if output_format == 'flat':
+                script_flat(codes, os.path.join(temp_dir, 'script.rom'))
+            else:
+                script_ihex(codes, os.path.join(temp_dir, 'script.hex'))
+
+        for output_format in ['flat', 'ihex']:
+            extension = '.rom' if output_format == 'flat' else '.hex'
+            output = os.path.join(temp_dir, 'cli' + extension)
+            print(f'Script with {output_format}: {measure(lambda: script(output_format)) * 1e3:10.2f} ms')
+            print(f'CLI with {output_format}:    '
+                  f'{measure(lambda: cli_main([source, "-f", output_format, "-o", output])) * 1e3:10.2f} ms')
+            with open(output, 'rb') as reader, open(os.path.join(temp_dir, 'script' + extension), 'rb') as expected:
+                assert reader.read() == expected.read()
+        for output_format in ['raw', 'srec']:
+            output = os.path.join(temp_dir, 'cli.out')
+            print(f'CLI with {output_format}:    '
+                  f'{measure(lambda: cli_main([source, "-f", output_format, "-o", output])) * 1e3:10.2f} ms')
+
+        print(f'Write flat:         {measure(lambda: write_devnull(write_flat, codes)) * 1e3:10.2f} ms')
+        print(f'Script flat:        {measure(lambda: script_flat(codes, os.devnull)) * 1e3:10.2f} ms')
+        print(f'Write Intel HEX:    {measure(lambda: write_devnull(write_ihex, codes)) * 1e3:10.2f} ms')
+        print(f'Script Intel HEX:   {measure(lambda: script_ihex(codes, os.devnull)) * 1e3:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
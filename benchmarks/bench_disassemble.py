@@ -0,0 +1,47 @@
+import random
+import time
+
+from asm_6502 import Assembler, disassemble, format_disassembly
+from asm_6502.disassemble import decode_table
+
+
+def generate_code(num_lines):
+    # Straight-line code with branches and subroutine calls
+    rand = random.Random(0)
+    lines = ['ORG $0200', 'START JSR SUB']
+    for i in range(num_lines):
+        lines.append(rand.choice([f'LDA #{i & 0xFF}', 'NOP', f'STA ${i & 0xFFF:04X},X', 'INX', f'ADC ${i & 0xFF:02X}',
+                                  'BNE *+2', 'ROR A', f'LDA (${i & 0xFF:02X}),Y', 'JSR SUB']))
+    lines.append('JMP START')
+    lines.append('SUB RTS')
+    return '\n'.join(lines)
+
+
+def measure(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    start = time.perf_counter()
+    decode_table()
+    print(f'Build the decode table:  {(time.perf_counter() - start) * 1e3:8.2f} ms')
+    assembler = Assembler()
+    codes = assembler.assemble(generate_code(20000), add_entry=False)
+    data = bytes(codes[0][1])
+    for name, entries in [('Linear', None), ('Recursive', [0x0200])]:
+        elapsed, instructions = measure(lambda: disassemble(data, origin=0x0200, entries=entries))
+        print(f'{name:10s} {len(data) // 1024} KiB: {len(instructions) / elapsed / 1e6:8.2f} M instructions/s')
+    instructions = disassemble(bytes(codes[0][1]), origin=0x0200)
+    elapsed, source = measure(lambda: format_disassembly(instructions))
+    print(f'Format:                  {len(instructions) / elapsed / 1e6:8.2f} M instructions/s')
+    assert Assembler().assemble(source, add_entry=False) == codes
+
+
+if __name__ == '__main__':
+    main()
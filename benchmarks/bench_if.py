@@ -0,0 +1,44 @@
+import time
+
+from asm_6502 import parse_source, Assembler
+
+
+def generate_lines(count, prefix='L'):
+    lines = []
+    for i in range(count):
+        lines.extend([f"{prefix}{i}  LDA $0200,X", "      STA $0300,X", "      INX", f"      BNE {prefix}{i}"])
+    return lines
+
+
+def generate_enabled(count=10000):
+    return '\n'.join(["ORG $1000"] + generate_lines(count // 10))
+
+
+def generate_conditional(count=10000):
+    # 90% of the source is in the untaken branch
+    enabled = generate_lines(count // 10)
+    disabled = generate_lines(count - count // 10, prefix='D')
+    return '\n'.join(["ORG $1000", ".IFDEF DEBUG"] + disabled + [".ELSE"] + enabled + [".ENDIF"])
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    enabled, conditional = generate_enabled(), generate_conditional()
+    print(f'Lines: enabled {enabled.count(chr(10)) + 1}, conditional {conditional.count(chr(10)) + 1}')
+    print(f'Parse the enabled source:         {measure(lambda: parse_source(enabled)) * 1e3:10.2f} ms')
+    print(f'Parse with 90% disabled:          {measure(lambda: parse_source(conditional)) * 1e3:10.2f} ms')
+    print(f'Parse with all enabled:           '
+          f'{measure(lambda: parse_source(conditional, {"DEBUG": 1})) * 1e3:10.2f} ms')
+    print(f'Assemble the enabled source:      {measure(lambda: Assembler().assemble(enabled)) * 1e3:10.2f} ms')
+    print(f'Assemble with 90% disabled:       {measure(lambda: Assembler().assemble(conditional)) * 1e3:10.2f} ms')
+    assert Assembler().assemble(enabled) == Assembler().assemble(conditional)
+
+
+if __name__ == '__main__':
+    main()
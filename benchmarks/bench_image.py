@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+from itertools import count
+
+from asm_6502 import write_flat, write_image
+
+
+def generate_banks(num_banks, bank_size, used=0x400):
+    # Each bank only has 1 KiB of codes at its start
+    return [(bank * bank_size, [bank & 0xFF] * used) for bank in range(num_banks)]
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def write_stream(codes, path, fill, size):
+    # Builds the whole image in memory
+    with open(path, 'wb') as writer:
+        write_flat(codes, writer, fill=fill, size=size)
+
+
+def write_new(writer, codes, paths, written, fill, size):
+    written.append(next(paths))
+    writer(codes, written[-1], fill, size)
+
+
+def allocated(path):
+    return os.stat(path).st_blocks * 512 // 1024
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = (os.path.join(temp_dir, f'{i}.rom') for i in count())  # Each run writes a new file
+        # The same emitted bytes in larger images
+        for bank_size in [0x4000, 0x40000, 0x100000]:
+            codes, size = generate_banks(256, bank_size), 256 * bank_size
+            print(f'Image {size // 1024 // 1024:4d} MiB, emitted {sum(len(code) for _, code in codes) // 1024} KiB')
+            for fill in [0x00, 0xFF]:
+                for name, writer in [('flat stream', write_stream), ('image', write_image)]:
+                    written = []
+                    elapsed = measure(lambda: write_new(writer, codes, paths, written, fill, size))
+                    print(f'    Fill ${fill:02X}, {name:11s}: {elapsed * 1e3:10.2f} ms, '
+                          f'{allocated(written[-1]):8d} KiB allocated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import time
+
+from asm_6502 import Assembler, IncrementalAssembler
+
+
+def generate(num_lines=100000):
+    lines = ["      ORG $0000"]
+    while len(lines) < num_lines:
+        index = len(lines)
+        lines.extend([
+            f"L{index}  INX",
+            "      ; Comment",
+            "      NOP",
+            "",
+            f"      BNE L{index}",
+            "      ; Comment",
+            "      DEY",
+            "",
+        ])
+    return lines[:num_lines]
+
+
+def measure(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    lines = generate()
+    code = '\n'.join(lines)
+    print(f'Lines: {len(lines)}')
+    print(f'Full assembly:                   {measure(lambda: Assembler().assemble(code)) * 1e3:10.2f} ms')
+
+    session = IncrementalAssembler(code)
+    middle = len(lines) // 2 + 2
+    edits = [
+        ('Same size edit at the middle', lambda: session.edit(middle, middle + 1, "      INY")),
+        ('Resize edit at the middle', lambda: session.edit(middle, middle + 1, "      LDA $1000")),
+        ('Resize edit at the beginning', lambda: session.edit(3, 4, "      LDA $10")),
+        ('Insert a line at the middle', lambda: session.edit(middle, middle, "      NOP")),
+        ('Delete a line at the middle', lambda: session.edit(middle, middle + 1, [])),
+    ]
+    for name, edit in edits:
+        elapsed = measure(lambda: (edit(), session.codes), repeat=10)
+        print(f'{name + ":":32} {elapsed * 1e3:10.2f} ms')
+    assert session.codes == Assembler().assemble(session.text)
+
+
+if __name__ == '__main__':
+    main()
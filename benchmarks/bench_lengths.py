@@ -0,0 +1,48 @@
+import random
+import time
+
+from asm_6502 import Assembler, code_regions, instruction_chains, instruction_lengths
+from asm_6502.disassemble import np
+
+
+def generate_dump(size):
+    # Blocks of codes separated by blocks of random data
+    rand = random.Random(0)
+    lines = ['ORG $0000']
+    for i in range(2000):
+        choices = [f'LDA #{i & 0xFF}', 'NOP', f'STA ${i & 0xFFF:04X},X', 'INX', 'BNE *+2'] * 8 + ['RTS']
+        lines.append(rand.choice(choices))
+    code = bytes(Assembler().assemble('\n'.join(lines), add_entry=False)[0][1])
+    dump = bytearray()
+    while len(dump) < size:
+        dump += code
+        dump += bytes(rand.randrange(256) for _ in range(4096))
+    return bytes(dump[:size])
+
+
+def measure(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    data = generate_dump(4 << 20)
+    instruction_lengths(b'')
+    print(f'Dump of {len(data) >> 20} MiB')
+    elapsed, _ = measure(lambda: instruction_lengths(data))
+    print(f'    Lengths:        {elapsed * 1e3:10.2f} ms')
+    for vectorized in [False, True] if np is not None else [False]:
+        name = 'NumPy' if vectorized else 'Python'
+        elapsed, _ = measure(lambda: instruction_chains(data, vectorized=vectorized), repeat=1)
+        print(f'    {name:6s} chains:  {elapsed * 1e3:10.2f} ms')
+        elapsed, regions = measure(lambda: code_regions(data, min_instructions=32, vectorized=vectorized), repeat=1)
+        print(f'    {name:6s} regions: {elapsed * 1e3:10.2f} ms, {len(regions)} regions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import time
+
+from asm_6502 import Assembler, ObjectFile, assemble_object, link
+
+
+def generate_library(num_routines=2000):
+    lines = []
+    for i in range(num_routines):
+        lines.extend([
+            f"R{i}   LDX #$10",
+            f"L{i}   LDA T{i},X",
+            "      STA $0200,X",
+            "      DEX",
+            f"      BNE L{i}",
+            "      JSR CALLBACK",
+            "      RTS",
+            f"T{i}   .BYTE 1, 2, 3, 4",
+        ])
+    return '\n'.join(lines)
+
+
+def measure(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    library = generate_library()
+    program = "START JSR R0\n" \
+              "      JMP START\n" \
+              "CALLBACK RTS"
+    print(f'Library lines: {library.count(chr(10)) + 1}')
+    source = "ORG $0200\n" + program + "\nORG $1000\n" + library
+    print(f'Assemble program and library: {measure(lambda: Assembler().assemble(source)) * 1e3:10.2f} ms')
+    data = assemble_object(library).to_bytes()
+    print(f'Object size:                  {len(data):10d} bytes')
+    obj = assemble_object(program)
+
+    def link_cached():
+        return link([(0x0200, obj), (0x1000, ObjectFile.from_bytes(data))])
+
+    print(f'Load and link the library:    {measure(link_cached, repeat=10) * 1e3:10.2f} ms')
+    assert link_cached() == Assembler().assemble(source)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import io
+import random
+import time
+
+from asm_6502.lsp import LanguageServer
+
+
+URI = 'file:///bench.asm'
+
+
+def generate(num_lines=20000):
+    lines = ["      ORG $0000"]
+    while len(lines) < num_lines:
+        index = len(lines)
+        lines.extend([
+            f"L{index}  LDX #$10",
+            "      DEX",
+            f"      BNE L{index}",
+            f"      JMP L{index}",
+            "",
+        ])
+    return lines[:num_lines]
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def main():
+    lines = generate()
+    server = LanguageServer(io.BytesIO())
+    server.handle({'id': 0, 'method': 'initialize', 'params': {}})
+    server.handle({'method': 'textDocument/didOpen', 'params': {
+        'textDocument': {'uri': URI, 'version': 0, 'text': '\n'.join(lines)},
+    }})
+    server.flush(force=True)
+
+    generator = random.Random(0)
+    latencies = {'didChange': [], 'assemble': [], 'hover': [], 'definition': []}
+
+    def replay(kind, message):
+        start = time.perf_counter()
+        if kind == 'assemble':
+            server.flush(force=True)
+        else:
+            server.handle(message)
+        latencies[kind].append(time.perf_counter() - start)
+        server.output.seek(0)
+        server.output.truncate()
+
+    version = 0
+    for _ in range(200):
+        # Type a new instruction in a random place character by character, then look around
+        line = generator.randrange(1, len(lines) - 1)
+        block = line - (line - 1) % 5
+        text = f"      LDA L{block},X"
+        replay('didChange', {'method': 'textDocument/didChange', 'params': {
+            'textDocument': {'uri': URI, 'version': version},
+            'contentChanges': [{'range': {'start': {'line': line, 'character': 0},
+                                          'end': {'line': line, 'character': 0}}, 'text': '\n'}],
+        }})
+        for character, char in enumerate(text):
+            version += 1
+            replay('didChange', {'method': 'textDocument/didChange', 'params': {
+                'textDocument': {'uri': URI, 'version': version},
+                'contentChanges': [{'range': {'start': {'line': line, 'character': character},
+                                              'end': {'line': line, 'character': character}}, 'text': char}],
+            }})
+            if char in ' ,':
+                replay('assemble', None)
+        # The debounced assembly is finished before the requests
+        replay('assemble', None)
+        position = {'line': line, 'character': len(text) - 4}
+        replay('hover', {'id': version, 'method': 'textDocument/hover', 'params': {
+            'textDocument': {'uri': URI}, 'position': position,
+        }})
+        replay('definition', {'id': version, 'method': 'textDocument/definition', 'params': {
+            'textDocument': {'uri': URI}, 'position': position,
+        }})
+    print(f'Lines: {len(lines)}')
+    for kind, values in latencies.items():
+        print(f'{kind + ":":12} {percentile(values, 0.5) * 1e3:8.3f} ms (p50) '
+              f'{percentile(values, 0.99) * 1e3:8.3f} ms (p99)  {len(values)} requests')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import time
+
+from asm_6502 import get_parser, Assembler
+
+
+MACROS = ".MACRO INC16 ADDR\n" \
+         "      INC ADDR\n" \
+         "      BNE SKIP\n" \
+         "      INC ADDR+1\n" \
+         "SKIP  .ENDM\n" \
+         ".MACRO COPY SRC, DST\n" \
+         "      LDA SRC\n" \
+         "      STA DST\n" \
+         "      .INC16 DST\n" \
+         ".ENDM\n"
+
+
+def generate_expanded(num_invocations=5000):
+    # The source generated without macros
+    lines = []
+    for i in range(num_invocations):
+        lines.extend([
+            f"      LDA ${i % 16 + 0x20:02X}",
+            "      STA $10",
+            "      INC $10",
+            f"      BNE S{i}",
+            "      INC $10+1",
+            f"S{i}   NOP",
+        ])
+    return '\n'.join(lines)
+
+
+def generate_macros(num_invocations=5000):
+    return MACROS + '\n'.join(f"      .COPY ${i % 16 + 0x20:02X}, $10\n      NOP" for i in range(num_invocations))
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    expanded, macros = generate_expanded(), generate_macros()
+    parser = get_parser()
+    print(f'Expanded source: {len(expanded):8d} characters')
+    print(f'Macro source:    {len(macros):8d} characters')
+    print(f'Parse the expanded source:      {measure(lambda: parser.parse(expanded)) * 1e3:10.2f} ms')
+    print(f'Parse the macro source:         {measure(lambda: parser.parse(macros)) * 1e3:10.2f} ms')
+    instructions = parser.parse(macros)
+    print(f'Expand the macros:              {measure(lambda: Assembler()._include(instructions)) * 1e3:10.2f} ms')
+    print(f'Assemble the expanded source:   {measure(lambda: Assembler().assemble(expanded)) * 1e3:10.2f} ms')
+    print(f'Assemble the macro source:      {measure(lambda: Assembler().assemble(macros)) * 1e3:10.2f} ms')
+    assert Assembler().assemble(expanded) == Assembler().assemble(macros)
+
+
+if __name__ == '__main__':
+    main()
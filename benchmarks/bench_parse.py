@@ -0,0 +1,58 @@
+import random
+import time
+
+from asm_6502 import get_parser, IncrementalParser
+
+
+def generate(num_lines=50000):
+    generator = random.Random(0)
+    lines = ["      ORG $0000"]
+    while len(lines) < num_lines:
+        index = len(lines)
+        lines.extend([
+            f"L{index}  LDA ${generator.randint(0, 0xFFFF):04X},X  ; Load",
+            f"      ADC #{generator.randint(0, 0xFF)}",
+            f"      STA (${generator.randint(0, 0xFF):02X}),Y",
+            f"      BNE L{index}",
+            "",
+        ])
+    return lines[:num_lines]
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def main():
+    lines = generate()
+    code = '\n'.join(lines)
+    print(f'Lines: {len(lines)}')
+    start = time.perf_counter()
+    get_parser().parse(code)
+    print(f'Full parsing:       {(time.perf_counter() - start) * 1e3:10.3f} ms')
+
+    parser = IncrementalParser(code)
+    generator = random.Random(1)
+    latencies = []
+    for _ in range(1000):
+        # Type or delete a single character in a random line
+        index = generator.randrange(len(lines))
+        line = parser.lines[index]
+        position = generator.randint(0, len(line))
+        if generator.random() < 0.5 or len(line) == 0:
+            line = line[:position] + generator.choice('0123456789ABCDEF ;') + line[position:]
+        else:
+            line = line[:max(0, position - 1)] + line[position:]
+        start = time.perf_counter()
+        parser.edit(index, index + 1, [line])
+        latencies.append(time.perf_counter() - start)
+    print(f'Single character:   {percentile(latencies, 0.5) * 1e3:10.3f} ms (p50)')
+    print(f'                    {percentile(latencies, 0.99) * 1e3:10.3f} ms (p99)')
+    start = time.perf_counter()
+    parser.edit(len(lines) // 2, len(lines) // 2, [""])
+    print(f'Insert a line:      {(time.perf_counter() - start) * 1e3:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
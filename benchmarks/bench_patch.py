@@ -0,0 +1,53 @@
+import random
+import time
+
+from asm_6502 import create_ips, create_bps, write_flat
+
+
+def generate_banks(num_banks, bank_size, used=0x400):
+    rand = random.Random(0)
+    return [(bank * bank_size, [rand.randrange(256) for _ in range(used)]) for bank in range(num_banks)]
+
+
+def edit(codes, num_changes):
+    # A few small changes spread over the banks
+    rand = random.Random(1)
+    codes = [(offset, list(code)) for offset, code in codes]
+    for _ in range(num_changes):
+        code = rand.choice(codes)[1]
+        position = rand.randrange(len(code) - 4)
+        code[position:position + 4] = [rand.randrange(256) for _ in range(4)]
+    return codes
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+class _Counter:
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+def main():
+    for bank_size in [0x4000, 0x10000]:
+        old, size = generate_banks(64, bank_size), 64 * bank_size
+        counter = _Counter()
+        write_flat(old, counter, size=size)
+        for num_changes in [1, 10, 100]:
+            new = edit(old, num_changes)
+            print(f'Image {size // 1024:5d} KiB, {num_changes:3d} changes, full image {counter.size // 1024} KiB')
+            for name, func in [('ips', create_ips), ('bps', create_bps)]:
+                elapsed, patch = measure(lambda: func(old, new, size=size))
+                print(f'    {name}: {elapsed * 1e3:8.2f} ms, {len(patch):6d} bytes')
+
+
+if __name__ == '__main__':
+    main()
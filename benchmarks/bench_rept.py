@@ -0,0 +1,58 @@
+import time
+import tracemalloc
+
+from asm_6502 import get_parser, Assembler
+
+
+def generate_unrolled(count=4096):
+    lines = ["ORG $1000"]
+    lines.extend(f".BYTE {i}/16" for i in range(count))
+    for _ in range(count):
+        lines.extend(["STA $0200,X", "INX"])
+    return '\n'.join(lines)
+
+
+def generate_rept(count=4096):
+    return "ORG $1000\n" \
+           f".REPT {count}, I\n" \
+           ".BYTE I/16\n" \
+           ".ENDR\n" \
+           f".REPT {count}\n" \
+           "STA $0200,X\n" \
+           "INX\n" \
+           ".ENDR"
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = get_parser()
+    unrolled, rept = generate_unrolled(), generate_rept()
+    unrolled_instructions, rept_instructions = parser.parse(unrolled), parser.parse(rept)
+    print(f'Instructions: unrolled {len(unrolled_instructions)}, '
+          f'blocks {len(Assembler()._include(rept_instructions))}')
+    print(f'Parse the unrolled source:    {measure(lambda: parser.parse(unrolled)) * 1e3:10.2f} ms')
+    print(f'Parse the blocks:             {measure(lambda: parser.parse(rept)) * 1e3:10.2f} ms')
+    unrolled_time = measure(lambda: Assembler().assemble(unrolled_instructions))
+    print(f'Assemble the unrolled source: {unrolled_time * 1e3:10.2f} ms')
+    print(f'Assemble the blocks:          {measure(lambda: Assembler().assemble(rept_instructions)) * 1e3:10.2f} ms')
+    print(f'Peak memory of unrolled:      {peak_memory(lambda: Assembler().assemble(unrolled)) / 1024:10.2f} KiB')
+    print(f'Peak memory of blocks:        {peak_memory(lambda: Assembler().assemble(rept)) / 1024:10.2f} KiB')
+    assert Assembler().assemble(unrolled) == Assembler().assemble(rept)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import time
+
+from asm_6502 import place_sections
+
+
+def measure(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    # The fixed sections split the memory into many holes, the time of each reservation and allocation grows with the
+    # logarithm of the number of holes
+    for num_sections in [1000, 4000, 16000]:
+        step = 0x10000 // num_sections
+        sections = [(f'F{i}', step // 2) for i in range(num_sections)] + \
+                   [(f'S{i}', 1 + i % (step // 2)) for i in range(num_sections)]
+        constraints = {f'F{i}': {'address': i * step} for i in range(1, num_sections)}
+        elapsed = measure(lambda: place_sections(sections, constraints))
+        print(f'Place {2 * num_sections:6d} sections: {elapsed * 1e3:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
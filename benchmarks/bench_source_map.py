@@ -0,0 +1,51 @@
+import random
+import time
+
+from asm_6502 import Assembler
+
+
+def generate_code(num_lines):
+    rand = random.Random(0)
+    lines = ['ORG $0200']
+    for i in range(num_lines):
+        lines.append(rand.choice([f'L{i} LDA #{i & 0xFF}', 'NOP', f'STA ${i & 0xFFF:04X}', 'INX', '; Comment']))
+    return '\n'.join(lines)
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def build_dict(assembler):
+    # One entry for each byte
+    lines = {}
+    for offset, size, inst in zip(assembler.code_offsets, assembler.code_sizes, assembler.instructions):
+        for address in range(offset, offset + size):
+            lines[address] = inst.line_num
+    return lines
+
+
+def main():
+    assembler = Assembler()
+    assembler.assemble(generate_code(20000), add_entry=False)
+    rand = random.Random(1)
+    addresses = [rand.randrange(0x0200, assembler.code_offset) for _ in range(1000000)]
+    elapsed, lines = measure(lambda: build_dict(assembler))
+    print(f'Dict build:          {elapsed * 1e3:8.2f} ms')
+    elapsed, _ = measure(lambda: [lines.get(address, -1) for address in addresses])
+    print(f'Dict lookup:         {len(addresses) / elapsed / 1e6:8.2f} M addresses/s')
+    elapsed, source_map = measure(assembler.source_map)
+    print(f'Source map build:    {elapsed * 1e3:8.2f} ms, {len(source_map.to_bytes()) // 1024} KiB on disk')
+    elapsed, _ = measure(lambda: [source_map.line_at(address) for address in addresses[:100000]])
+    print(f'Scalar lookup:       {100000 / elapsed / 1e6:8.2f} M addresses/s')
+    for vectorized in [False, True]:
+        elapsed, _ = measure(lambda: source_map.indices_at(addresses, vectorized=vectorized))
+        name = 'numpy' if vectorized else 'bisect'
+        print(f'Batch lookup ({name}): {len(addresses) / elapsed / 1e6:8.2f} M addresses/s')
+
+
+if __name__ == '__main__':
+    main()
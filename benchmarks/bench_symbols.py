@@ -0,0 +1,47 @@
+import random
+import time
+
+from asm_6502 import SymbolIndex
+
+
+def generate_labels(num_labels):
+    rand = random.Random(0)
+    return {f'L{i}': address for i, address in enumerate(sorted(rand.sample(range(0x10000), num_labels)))}
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def nearest_scan(label_offsets, address):
+    # The linear scan over the dict of the labels
+    best = None
+    for name, offset in label_offsets.items():
+        if offset <= address and (best is None or offset > best[1]):
+            best = (name, offset)
+    return best
+
+
+def main():
+    rand = random.Random(1)
+    for num_labels in [100, 1000, 10000]:
+        label_offsets = generate_labels(num_labels)
+        addresses = [rand.randrange(0x10000) for _ in range(100000)]
+        print(f'{num_labels} labels')
+        elapsed, _ = measure(lambda: [nearest_scan(label_offsets, address) for address in addresses[:100]])
+        print(f'    Linear scan:   {100 / elapsed / 1e6:8.3f} M addresses/s')
+        elapsed, symbols = measure(lambda: SymbolIndex(label_offsets))
+        print(f'    Build index:   {elapsed * 1e3:8.3f} ms')
+        elapsed, _ = measure(lambda: [symbols.nearest(address) for address in addresses])
+        print(f'    Bisect:        {len(addresses) / elapsed / 1e6:8.3f} M addresses/s')
+        for vectorized in [False, True]:
+            elapsed, _ = measure(lambda: symbols.nearest_indices(addresses, vectorized=vectorized))
+            name = 'numpy' if vectorized else 'bisect'
+            print(f'    Batch {name:6s}:  {len(addresses) / elapsed / 1e6:8.3f} M addresses/s')
+
+
+if __name__ == '__main__':
+    main()
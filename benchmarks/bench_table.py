@@ -0,0 +1,43 @@
+import math
+import time
+
+from asm_6502 import Assembler, evaluate_table
+from asm_6502.table import np
+
+
+def generate_bytes(count=8192):
+    values = [round(128 + 127 * math.sin(i * math.pi * (2 / count))) for i in range(count)]
+    lines = ["ORG $1000"]
+    for start in range(0, count, 16):
+        lines.append('.BYTE ' + ', '.join(str(value) for value in values[start:start + 16]))
+    return '\n'.join(lines)
+
+
+def generate_table(count=8192):
+    return "ORG $1000\n" \
+           f".TABLE \"128 + 127 * SIN[I * PI * {2 / count!r}]\", {count}"
+
+
+def measure(func, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    # The divisions are integer divisions, the step of the angle is a fraction constant
+    expression = f"128 + 127 * SIN[I * PI * {2 / 65536!r}]"
+    fallback = measure(lambda: evaluate_table(expression, 65536, vectorized=False))
+    print(f'Evaluate 64K entries in Python: {fallback * 1e3:10.2f} ms')
+    if np is not None:
+        vectorized = measure(lambda: evaluate_table(expression, 65536, vectorized=True))
+        print(f'Evaluate 64K entries in NumPy:  {vectorized * 1e3:10.2f} ms')
+    byte_source, table_source = generate_bytes(), generate_table()
+    print(f'Assemble 8K entries of `.BYTE`: {measure(lambda: Assembler().assemble(byte_source)) * 1e3:10.2f} ms')
+    print(f'Assemble 8K entries of `.TABLE`:{measure(lambda: Assembler().assemble(table_source)) * 1e3:10.2f} ms')
+    assert Assembler().assemble(byte_source) == Assembler().assemble(table_source)
+
+
+if __name__ == '__main__':
+    main()
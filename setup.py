@@ -36,6 +36,8 @@ setup(
     long_description=read_file('README.md'),
     long_description_content_type='text/markdown',
     install_requires=get_requirements('requirements.txt'),
+    extras_require={'numpy': ['numpy']},
+    entry_points={'console_scripts': ['asm6502=asm_6502.cli:main']},
     classifiers=(
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, assemble_configs
+
+
+class TestAssembleConfigs(TestCase):
+
+    def test_same_as_assembler(self):
+        code = "START ORG $0080\n" \
+               "      BRK\n" \
+               "      LDA $10\n" \
+               "      STA $1000,X\n" \
+               "      JMP START"
+        configs = [
+            {},
+            {'brk_size': 1},
+            {'program_entry': 0xFFFA},
+            {'brk_size': 1, 'add_entry': False},
+            {'max_memory': 0x1000, 'add_entry': False},
+        ]
+        results = assemble_configs(code, configs)
+        self.assertEqual(len(configs), len(results))
+        for config, result in zip(configs, results):
+            config = dict(config)
+            add_entry = config.pop('add_entry', True)
+            self.assertEqual(Assembler(**config).assemble(code, add_entry=add_entry), result)
+        self.assertEqual([
+            (0x0080, [0x00, 0x00, 0xA5, 0x10, 0x9D, 0x00, 0x10, 0x4C, 0x80, 0x00]),
+            (0xFFFC, [0x80, 0x00]),
+        ], results[0])
+        self.assertEqual([
+            (0x0080, [0x00, 0xA5, 0x10, 0x9D, 0x00, 0x10, 0x4C, 0x80, 0x00]),
+        ], results[3])
+        self.assertEqual((0xFFFA, [0x80, 0x00]), results[2][-1])
+
+    def test_independent_results(self):
+        results = assemble_configs("NOP", [{'add_entry': False}, {'add_entry': False}])
+        results[0][0][1].append(0xEA)
+        self.assertEqual([(0x0000, [0xEA])], results[1])
+
+    def test_exceed_memory(self):
+        code = "ORG $0FFE\n" \
+               "NOP\n" \
+               "NOP"
+        with self.assertRaises(AssembleError) as e:
+            assemble_configs(code, [{'add_entry': False}, {'max_memory': 0x1000}])
+        self.assertEqual("AssembleError: The assembled code will exceed the max memory 0x1000 at line 3",
+                         str(e.exception))
+
+    def test_error(self):
+        with self.assertRaises(AssembleError) as e:
+            assemble_configs("JMP START", [{}, {'brk_size': 1}])
+        self.assertEqual("AssembleError: Can not resolve label 'START' at line 1", str(e.exception))
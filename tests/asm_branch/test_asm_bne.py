@@ -14,3 +14,14 @@ class TestAssembleBNE(TestCase):
         self.assertEqual([
             (0x0000, [0xD0, 0x0E]),
         ], results)
+
+    def test_bne_label(self):
+        code = "START ORG $0080\n" \
+               "      NOP\n" \
+               "LOOP  DEX\n" \
+               "      BNE LOOP\n" \
+               "      BNE START"
+        results = self.assembler.assemble(code, add_entry=False)
+        self.assertEqual([
+            (0x0080, [0xEA, 0xCA, 0xD0, 0xFD, 0xD0, 0xFA]),
+        ], results)
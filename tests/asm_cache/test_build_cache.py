@@ -0,0 +1,96 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from asm_6502 import Assembler, BuildCache, IncludeCache
+
+
+class TestBuildCache(TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'cache')
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write(self, name, code):
+        with open(os.path.join(self.temp_dir.name, name), 'w') as writer:
+            writer.write(code)
+
+    def test_get_put(self):
+        cache = BuildCache(self.cache_dir)
+        self.assertIsNone(cache.get('parse', 'a.asm', 'digest'))
+        cache.put('parse', [1, 2, 3], 'a.asm', 'digest')
+        self.assertEqual([1, 2, 3], BuildCache(self.cache_dir).get('parse', 'a.asm', 'digest'))
+        self.assertIsNone(cache.get('parse', 'a.asm', 'other'))
+        self.assertEqual([1, 2, 3], cache.get('parse', 'a.asm', 'digest'))
+        self.assertEqual('Build cache: parse 1 hits, 2 misses; 0 evictions', cache.report())
+
+    def test_corrupted(self):
+        cache = BuildCache(self.cache_dir)
+        cache.put('size', [(1, False)], 'a.asm')
+        path = cache._path('size', ('a.asm',))
+        with open(path, 'r+b') as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b'\x00')
+        self.assertIsNone(cache.get('size', 'a.asm'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_version(self):
+        cache = BuildCache(self.cache_dir)
+        cache.put('size', [(1, False)], 'a.asm')
+        with mock.patch('asm_6502.cache.__version__', '0.0.0'):
+            self.assertIsNone(cache.get('size', 'a.asm'))
+
+    def test_lru(self):
+        cache = BuildCache(self.cache_dir)
+        for i in range(3):
+            cache.put('data', bytes(300), i)
+            os.utime(cache._path('data', (i,)), ns=(i, i))
+        # Room for three and a half entries
+        cache.max_size = os.path.getsize(cache._path('data', (0,))) * 7 // 2
+        self.assertIsNotNone(cache.get('data', 0))
+        cache.put('data', bytes(300), 3)
+        self.assertEqual(1, cache.evictions)
+        self.assertIsNone(cache.get('data', 1))
+        for i in [0, 2, 3]:
+            self.assertIsNotNone(cache.get('data', i))
+
+    def test_assemble_file(self):
+        self.write('main.asm', "ORG $1000\n"
+                               ".INCLUDE \"lib.asm\"\n"
+                               "JMP DELAY")
+        self.write('lib.asm', "DELAY BRK\n"
+                              "      LDA $10\n"
+                              "      RTS")
+        main_path = os.path.join(self.temp_dir.name, 'main.asm')
+        include_cache = IncludeCache(self.cache_dir)
+        expected = Assembler(include_cache=include_cache).assemble_file(main_path)
+        self.assertEqual([
+            (0x1000, [0x00, 0x00, 0xA5, 0x10, 0x60, 0x4C, 0x00, 0x10]),
+            (0xFFFC, [0x00, 0x10]),
+        ], expected)
+        self.assertEqual((0, 2, 0, 2), (include_cache.hits, include_cache.misses,
+                                        include_cache.size_hits, include_cache.size_misses))
+
+        include_cache = IncludeCache(self.cache_dir)
+        self.assertEqual(expected, Assembler(include_cache=include_cache).assemble_file(main_path))
+        self.assertEqual((2, 0, 2, 0), (include_cache.hits, include_cache.misses,
+                                        include_cache.size_hits, include_cache.size_misses))
+        self.assertEqual('Parse cache: 2 hits, 0 misses; sizing cache: 2 hits, 0 misses; 0 evictions',
+                         include_cache.report())
+
+        include_cache = IncludeCache(self.cache_dir)
+        results = Assembler(brk_size=1, include_cache=include_cache).assemble_file(main_path)
+        self.assertEqual((0x1000, [0x00, 0xA5, 0x10, 0x60, 0x4C, 0x00, 0x10]), results[0])
+        self.assertEqual((2, 0, 0, 2), (include_cache.hits, include_cache.misses,
+                                        include_cache.size_hits, include_cache.size_misses))
+
+        self.write('lib.asm', "DELAY LDA $1000\n"
+                              "      RTS")
+        include_cache = IncludeCache(self.cache_dir)
+        results = Assembler(include_cache=include_cache).assemble_file(main_path)
+        self.assertEqual((0x1000, [0xAD, 0x00, 0x10, 0x60, 0x4C, 0x00, 0x10]), results[0])
+        self.assertEqual((1, 1, 1, 1), (include_cache.hits, include_cache.misses,
+                                        include_cache.size_hits, include_cache.size_misses))
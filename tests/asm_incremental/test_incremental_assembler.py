@@ -0,0 +1,103 @@
+import random
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, ParseError, IncrementalAssembler
+
+
+class TestIncrementalAssembler(TestCase):
+
+    CODE = "START ORG $0080\n" \
+           "      LDX #$10\n" \
+           "LOOP  DEX\n" \
+           "      STA TABLE,X\n" \
+           "      BNE LOOP\n" \
+           "      JMP START\n" \
+           "; Data\n" \
+           "TABLE .BYTE 1,2,3\n" \
+           "      .WORD *+3, LOOP"
+
+    def assert_same(self, session: IncrementalAssembler):
+        assembler = Assembler()
+        self.assertEqual(assembler.assemble(session.text, add_entry=session.add_entry), session.codes)
+        self.assertEqual(assembler.code_offsets, session.code_offsets)
+        self.assertEqual(assembler.code_sizes, session.code_sizes)
+        self.assertEqual(assembler.fit_zero_pages, session.fit_zero_pages)
+        self.assertEqual(assembler.label_offsets, session.label_offsets)
+        self.assertEqual(assembler.label_references, session.assembler.label_references)
+
+    def test_initial(self):
+        session = IncrementalAssembler(self.CODE)
+        self.assert_same(session)
+
+    def test_edit_same_size(self):
+        session = IncrementalAssembler(self.CODE)
+        session.edit(2, 3, "LOOP  INX")
+        self.assert_same(session)
+
+    def test_edit_moves_labels(self):
+        session = IncrementalAssembler(self.CODE)
+        session.edit(1, 2, "      LDX $1000")
+        self.assert_same(session)
+        self.assertEqual(0x0083, session.label_offsets['LOOP'])
+        session.edit(1, 1, ["      NOP", "", "      NOP"])
+        self.assert_same(session)
+        session.edit(1, 4, [])
+        self.assert_same(session)
+
+    def test_edit_labels(self):
+        session = IncrementalAssembler(self.CODE, add_entry=False)
+        with self.assertRaises(AssembleError) as e:
+            session.edit(2, 3, "      DEX")
+        self.assertEqual("AssembleError: Can not resolve label 'LOOP' at line 5", str(e.exception))
+        session.edit(3, 4, "LOOP  STA TABLE,X")
+        self.assert_same(session)
+        session.edit(0, 0, "LOOP  NOP")
+        self.assert_same(session)
+        session.edit(0, 1, [])
+        self.assert_same(session)
+
+    def test_dynamic_org(self):
+        session = IncrementalAssembler(self.CODE + "\n      ORG TABLE+$10\n      NOP")
+        self.assert_same(session)
+        session.edit(1, 2, "      LDX $1000")
+        self.assert_same(session)
+
+    def test_parse_error(self):
+        session = IncrementalAssembler(self.CODE)
+        with self.assertRaises(ParseError) as e:
+            session.edit(2, 3, "LOOP  DEX $")
+        self.assertEqual("ParseError: Illegal character '$' found at line 3, column 11", str(e.exception))
+        with self.assertRaises(ParseError):
+            session.edit(0, 0, "")
+        session.edit(3, 4, "LOOP  DEX")
+        self.assert_same(session)
+
+    def test_exceed_memory(self):
+        session = IncrementalAssembler("ORG $FFF0\nNOP\nNOP", add_entry=False)
+        with self.assertRaises(AssembleError) as e:
+            session.edit(1, 2, ".BYTE 1,2,3,4,5,6,7,8,9,10,11,12,13,14,15")
+        self.assertEqual("AssembleError: The assembled code will exceed the max memory 0x10000 at line 3",
+                         str(e.exception))
+        session.edit(1, 2, "NOP")
+        self.assert_same(session)
+
+    def test_random_edits(self):
+        pool = [
+            "", "; Comment", "      NOP", "      LDA $10", "      LDA $1000", "LOOP  DEX", "      BNE LOOP",
+            "      JMP START", "TABLE .BYTE 1,2,3", "      LDA TABLE,Y", "      .WORD *", "      BRK",
+        ]
+        generator = random.Random(42)
+        session = IncrementalAssembler(self.CODE)
+        for _ in range(200):
+            start = generator.randint(1, len(session.lines))
+            end = min(len(session.lines), start + generator.randint(0, 2))
+            lines = [generator.choice(pool) for _ in range(generator.randint(0, 3))]
+            try:
+                expected = Assembler().assemble('\n'.join(session.lines[:start] + lines + session.lines[end:]))
+            except AssembleError as e:
+                with self.assertRaises(AssembleError) as actual:
+                    session.edit(start, end, lines)
+                self.assertEqual(str(e), str(actual.exception))
+                continue
+            session.edit(start, end, lines)
+            self.assertEqual(expected, session.codes)
@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from asm_6502 import Assembler
+
+
+class TestLabelReferences(TestCase):
+
+    def setUp(self) -> None:
+        self.assembler = Assembler()
+
+    def test_label_references(self):
+        code = "START ORG $0080\n" \
+               "LOOP  LDA TABLE,X\n" \
+               "      BNE LOOP\n" \
+               "      LDA #LO [TABLE+END]\n" \
+               "      JMP START\n" \
+               "TABLE .WORD LOOP,-TABLE\n" \
+               "END   .END"
+        self.assembler.assemble(code)
+        self.assertEqual({
+            'TABLE': [1, 3, 5],
+            'LOOP': [2, 5],
+            'END': [3],
+            'START': [4],
+        }, self.assembler.label_references)
+
+    def test_no_references(self):
+        self.assembler.assemble("START NOP\n"
+                                "      JMP *")
+        self.assertEqual({}, self.assembler.label_references)
@@ -0,0 +1,117 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, Relocation, ObjectFile, assemble_object, link
+
+
+class TestLink(TestCase):
+
+    LIB = "DELAY LDX #$10\n" \
+          "LOOP  DEX\n" \
+          "      BNE LOOP\n" \
+          "      LDA TABLE,X\n" \
+          "      LDA #LO TABLE+1\n" \
+          "      LDY #HI TABLE+1\n" \
+          "      JSR CALLBACK\n" \
+          "      JMP (VECTOR)\n" \
+          "TABLE .BYTE 1, 2, END-TABLE\n" \
+          "VECTOR .WORD DELAY, TABLE-DELAY, *\n" \
+          "END   .END"
+
+    MAIN = "START JSR DELAY\n" \
+           "CALLBACK RTS"
+
+    def test_same_as_assembler(self):
+        lib, main = assemble_object(self.LIB), assemble_object(self.MAIN)
+        expected = Assembler().assemble("ORG $0200\n" + self.MAIN + "\nORG $80F0\n" + self.LIB)
+        self.assertEqual(expected, link([(0x0200, main), (0x80F0, lib)]))
+        self.assertEqual({'CALLBACK'}, lib.imports)
+        self.assertEqual({'DELAY'}, main.imports)
+        self.assertEqual(0, lib.code_start)
+        self.assertEqual({'DELAY': 0, 'LOOP': 2, 'TABLE': 18, 'VECTOR': 21, 'END': 27}, lib.exports)
+        self.assertIn(Relocation(9, Relocation.LOW_BYTE, None, 19), lib.relocations)
+        self.assertIn(Relocation(13, Relocation.WORD, 'CALLBACK', 0), lib.relocations)
+
+    def test_binary_format(self):
+        lib = assemble_object(self.LIB)
+        self.assertEqual(lib, ObjectFile.from_bytes(lib.to_bytes()))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'lib.o65')
+            lib.save(path)
+            self.assertEqual(lib, ObjectFile.load(path))
+        obj = ObjectFile([(0, [0x00, 0x00]), (4, [0xEA])], relocations=[Relocation(0, Relocation.WORD, None, -2)],
+                         size=8)
+        self.assertEqual(obj, ObjectFile.from_bytes(obj.to_bytes()))
+        with self.assertRaises(AssembleError):
+            ObjectFile.from_bytes(lib.to_bytes()[:-1])
+        with self.assertRaises(AssembleError):
+            ObjectFile.from_bytes(b'ELF' + lib.to_bytes()[3:])
+
+    def test_link_errors(self):
+        lib = assemble_object(self.LIB)
+        with self.assertRaises(AssembleError) as e:
+            link([(0x8000, lib)])
+        self.assertEqual("AssembleError: Can not resolve label 'CALLBACK'", str(e.exception))
+        callback = assemble_object("CALLBACK RTS")
+        with self.assertRaises(AssembleError) as e:
+            link([(0x8000, lib), (0x9000, callback), (0xA000, callback)])
+        self.assertEqual("AssembleError: The imported label 'CALLBACK' is defined in multiple objects",
+                         str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            link([(0x8000, lib), (0x8010, callback)])
+        self.assertEqual("AssembleError: The object at 0x8010 overlaps the previous object ending at 0x801e",
+                         str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            link([(0xFFFF, callback)], max_memory=0x10000)
+        self.assertEqual("AssembleError: The object at 0xffff will exceed the max memory 0x10000", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            link([(0x0100, assemble_object(".BYTE DATA\nDATA NOP"))])
+        self.assertEqual("AssembleError: 0x101 can not fit in a byte at 0x100", str(e.exception))
+        self.assertEqual([(0x0000, [0x01, 0xEA])], link([(0x0000, assemble_object(".BYTE DATA\nDATA NOP"))],
+                                                        add_entry=False))
+
+    def test_relocatable_errors(self):
+        with self.assertRaises(AssembleError) as e:
+            assemble_object("ORG $1000\nNOP")
+        self.assertEqual("AssembleError: `ORG` is not allowed in relocatable objects at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            assemble_object("NOP\nBNE EXTERNAL")
+        self.assertEqual("AssembleError: Can not branch to the imported label at line 2", str(e.exception))
+        for code in ["L JMP L*2", "L JMP L+L", "L JMP L/2", "L .WORD L*L", "L LDA #LO [L/2]"]:
+            with self.assertRaises(AssembleError):
+                assemble_object(code)
+
+    def test_position_independent(self):
+        obj = assemble_object("L1 NOP\n"
+                              "L2 .BYTE L2-L1, 3*[L2-L1]\n"
+                              "   JMP -L1+L2+EXTERNAL")
+        self.assertEqual([Relocation(4, Relocation.WORD, 'EXTERNAL', 1)], obj.relocations)
+        self.assertEqual([(0x1000, [0xEA, 0x01, 0x03, 0x4C, 0x35, 0x12])],
+                         link([(0x1000, obj), (0x1234, assemble_object("EXTERNAL NOP"))], add_entry=False)[:1])
+
+    def test_reserved_gap(self):
+        code = "L1 NOP\n" \
+               "   .RES 2\n" \
+               "L2 JMP L1\n" \
+               "   .RES 3"
+        obj = assemble_object(code)
+        self.assertEqual([(0, bytes([0xEA])), (3, bytes([0x4C, 0x00, 0x00]))], obj.segments)
+        self.assertEqual(9, obj.size)
+        self.assertEqual([Relocation(4, Relocation.WORD, None, 0)], obj.relocations)
+        self.assertEqual(obj, ObjectFile.from_bytes(obj.to_bytes()))
+        # The reserved bytes are not written, the same as the assembled codes segment by segment
+        self.assertEqual(Assembler().assemble("ORG $1000\n" + code + "\nL3 NOP", add_entry=False),
+                         link([(0x1000, obj), (0x1009, assemble_object("L3 NOP"))], add_entry=False))
+        with self.assertRaises(AssembleError) as e:
+            link([(0x1000, obj), (0x1008, assemble_object("L3 NOP"))])
+        self.assertEqual("AssembleError: The object at 0x1008 overlaps the previous object ending at 0x1009",
+                         str(e.exception))
+
+    def test_fill_relocation(self):
+        obj = assemble_object("NOP\n"
+                              ".FILL 3, L9\n"
+                              "NOP")
+        self.assertEqual([Relocation(k, Relocation.BYTE, 'L9', 0) for k in range(1, 4)], obj.relocations)
+        self.assertEqual([(0x0000, [0xEA, 0x20, 0x20, 0x20, 0xEA])],
+                         link([(0x0000, obj), (0x0020, assemble_object("L9 NOP"))], add_entry=False)[:1])
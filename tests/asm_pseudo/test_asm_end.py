@@ -15,3 +15,12 @@ class TestAssembleEND(TestCase):
         self.assertEqual([
             (0x1000, [0x4C, 0x00, 0x10]),
         ], results)
+
+    def test_end_after_codes(self):
+        code = ".ORG $1000\n" \
+               "NOP\n" \
+               ".END"
+        results = self.assembler.assemble(code, add_entry=False)
+        self.assertEqual([
+            (0x1000, [0xEA, 0x4C, 0x01, 0x10]),
+        ], results)
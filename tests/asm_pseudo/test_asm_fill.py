@@ -0,0 +1,91 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, IncludeCache, IncrementalAssembler, assemble_object
+
+
+class TestAssembleFILL(TestCase):
+
+    def test_fill(self):
+        code = "ORG $8000\n" \
+               "      NOP\n" \
+               ".ALIGN $10, $FF\n" \
+               "TABLE .FILL 3, END-TABLE\n" \
+               "      .RES 4\n" \
+               "      .ALIGN 8\n" \
+               "END   LDA #1\n" \
+               "      .FILL $8020-*, $EA"
+        assembler = Assembler()
+        self.assertEqual([
+            (0x8000, [0xEA] + [0xFF] * 15 + [0x08] * 3),
+            (0x8017, [0x00, 0xA9, 0x01] + [0xEA] * 6),
+        ], assembler.assemble(code, add_entry=False))
+        self.assertEqual([0, 1, 15, 3, 4, 1, 2, 6], assembler.code_sizes)
+
+    def test_res_in_rept(self):
+        code = "ORG $10\n" \
+               ".REPT 3\n" \
+               ".BYTE 1\n" \
+               ".RES 2\n" \
+               ".BYTE 3\n" \
+               ".ENDR\n" \
+               "NOP"
+        self.assertEqual([(0x10, [1]), (0x13, [3, 1]), (0x17, [3, 1]), (0x1B, [3, 0xEA])],
+                         Assembler().assemble(code, add_entry=False))
+
+    def test_bank(self):
+        code = "ORG $8000\n" \
+               "START JMP START\n" \
+               "      .FILL $FFFC-*, $FF"
+        results = Assembler().assemble(code)
+        self.assertEqual([(0x8000, [0x4C, 0x00, 0x80] + [0xFF] * (0x7FFC - 3) + [0x00, 0x80])], results)
+        code = "ORG $8000\n" \
+               "      .RES $8000\n" \
+               "      NOP"
+        with self.assertRaises(AssembleError) as e:
+            Assembler().assemble(code)
+        self.assertEqual("AssembleError: The assembled code will exceed the max memory 0x10000 at line 2",
+                         str(e.exception))
+
+    def test_align_sizes_are_not_cached(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'main.asm')
+            with open(os.path.join(temp_dir, 'lib.asm'), 'w') as writer:
+                writer.write(".ALIGN 4\nLIB .FILL 2, $AA")
+            cache = IncludeCache()
+            for prefix in ["NOP", "NOP\nNOP\nNOP"]:
+                with open(path, 'w') as writer:
+                    writer.write(f"{prefix}\n.INCLUDE \"lib.asm\"")
+                assembler = Assembler(include_cache=cache)
+                assembler.assemble_file(path, add_entry=False)
+                self.assertEqual(4, assembler.label_offsets['LIB'])
+
+    def test_incremental(self):
+        code = "NOP\n" \
+               ".ALIGN 4\n" \
+               "L .FILL 2, $AA"
+        incremental = IncrementalAssembler(code, add_entry=False)
+        incremental.edit(0, 1, "NOP\nNOP\nNOP\nNOP")
+        self.assertEqual(Assembler().assemble(incremental.text, add_entry=False), incremental.codes)
+        self.assertEqual(4, incremental.label_offsets['L'])
+
+    def test_errors(self):
+        cases = [
+            (".FILL 3", "Address addressing is not allowed for `FILL` at line 1"),
+            (".FILL 3, 1, 2", "`.FILL` only accepts a count and a value at line 1"),
+            (".FILL -1, 0", "The count of `.FILL` should be a non-negative number at line 1"),
+            (".FILL 2, $100", "0x100 can not fit in a byte at line 1"),
+            (".FILL N, 0\nN NOP", "Can not resolve label 'N' at line 1"),
+            (".RES 1, 2", "List addressing is not allowed for `RES` at line 1"),
+            (".ALIGN 0", "The boundary of `.ALIGN` should be a positive number at line 1"),
+            (".ALIGN 4, 1, 2", "`.ALIGN` only accepts a boundary and a fill value at line 1"),
+            (".REPT 2\n.ALIGN 4\n.ENDR", "`.ALIGN` is not allowed in `.REPT` at line 2"),
+        ]
+        for code, error in cases:
+            with self.assertRaises(AssembleError) as e:
+                Assembler().assemble(code)
+            self.assertEqual(f"AssembleError: {error}", str(e.exception), code)
+        with self.assertRaises(AssembleError) as e:
+            assemble_object(".ALIGN 4")
+        self.assertEqual("AssembleError: `.ALIGN` is not allowed in relocatable objects at line 1", str(e.exception))
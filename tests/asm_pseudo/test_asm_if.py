@@ -0,0 +1,94 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import parse_source, Assembler, AssembleError, ParseError, IncludeCache, IncrementalAssembler, \
+    assemble_configs
+
+
+class TestAssembleIF(TestCase):
+
+    CODE = "START LDA #0\n" \
+           ".IF REGION - 1\n" \
+           "      LDX #50\n" \
+           ".ELSE\n" \
+           "      LDX #60\n" \
+           ".ENDIF\n" \
+           ".IFDEF DEBUG\n" \
+           "      BRK\n" \
+           ".IFNDEF VERBOSE\n" \
+           "      %%% The untaken lines are not parsed\n" \
+           ".ENDIF\n" \
+           ".ENDIF\n" \
+           "      JMP START"
+
+    def test_if(self):
+        self.assertEqual([(0x0000, [0xA9, 0x00, 0xA2, 0x3C, 0x4C, 0x00, 0x00])],
+                         Assembler(defines={'REGION': 1}).assemble(self.CODE, add_entry=False))
+        assembler = Assembler(defines={'REGION': 2, 'DEBUG': 0, 'VERBOSE': 1})
+        self.assertEqual([(0x0000, [0xA9, 0x00, 0xA2, 0x32, 0x00, 0x00, 0x4C, 0x00, 0x00])],
+                         assembler.assemble(self.CODE, add_entry=False))
+        with self.assertRaises(ParseError) as e:
+            Assembler(defines={'REGION': 2, 'DEBUG': 0}).assemble(self.CODE)
+        self.assertEqual("ParseError: Illegal character '%' found at line 10, column 7", str(e.exception))
+        # The line numbers are kept
+        self.assertEqual([1, 5, 13], [inst.line_num for inst in parse_source(self.CODE, {'REGION': 1})])
+
+    def test_nested_untaken(self):
+        code = ".IF 0\n" \
+               ".IF UNKNOWN\n" \
+               ".ELSE\n" \
+               ".ENDIF\n" \
+               ".ELSE\n" \
+               ".IF [1+2]*3/9-1\n" \
+               "NOP\n" \
+               ".ELSE\n" \
+               "RTS\n" \
+               ".ENDIF\n" \
+               ".ENDIF"
+        self.assertEqual([(0x0000, [0x60])], Assembler().assemble(code, add_entry=False))
+        # The directives in comments and strings are not conditions
+        code = "NOP ; .ENDIF\n.INCLUDE \".IF\""
+        self.assertEqual(['NOP', '.INCLUDE'], [inst.op for inst in parse_source(code)])
+
+    def test_include_and_configs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'lib.asm'), 'w') as writer:
+                writer.write(".IFDEF PAL\nPAL .BYTE 1\n.ELSE\nNTSC .BYTE 2\n.ENDIF")
+            cache = IncludeCache()
+            code = ".INCLUDE \"lib.asm\""
+            pal = Assembler(include_paths=[temp_dir], include_cache=cache, defines={'PAL': 1})
+            ntsc = Assembler(include_paths=[temp_dir], include_cache=cache)
+            for _ in range(2):
+                self.assertEqual([(0x0000, [0x01])], pal.assemble(code, add_entry=False))
+                self.assertEqual([(0x0000, [0x02])], ntsc.assemble(code, add_entry=False))
+            self.assertEqual((2, 2), (cache.hits, cache.misses))
+            self.assertEqual([[(0x0000, [0x01])], [(0x0000, [0x02])], [(0x0000, [0x01])]],
+                             assemble_configs(code, [
+                                 {'include_paths': [temp_dir], 'defines': {'PAL': 1}, 'add_entry': False},
+                                 {'include_paths': [temp_dir], 'add_entry': False},
+                                 {'include_paths': [temp_dir], 'defines': {'PAL': 1}, 'add_entry': False},
+                             ]))
+
+    def test_errors(self):
+        cases = [
+            (".IF 1\nNOP", "`.IF` without `.ENDIF` at line 1"),
+            (".ENDIF", "`.ENDIF` without `.IF` at line 1"),
+            ("NOP\n.ELSE", "`.ELSE` without `.IF` at line 2"),
+            (".IF 1\n.ELSE\n.ELSE\n.ENDIF", "Multiple `.ELSE` for the `.IF` at line 1"),
+            ("L .IF 1\n.ENDIF", "Label is not allowed for `.IF` at line 1"),
+            (".IF A\n.ENDIF", "`.IF` only accepts an expression at line 1"),
+            (".IF #1\n.ENDIF", "`.IF` only accepts an expression at line 1"),
+            (".IF *\n.ENDIF", "The condition should be a constant at line 1"),
+            ("\n.IF PAL\n.ENDIF", "Can not resolve 'PAL' in the condition at line 2"),
+            (".IFDEF 1\n.ENDIF", "`.IFDEF` only accepts a name at line 1"),
+            ("NOP\n.IF FOO / [FOO - 1]\n.ENDIF", "Division by zero in the condition at line 2"),
+        ]
+        for code, error in cases:
+            with self.assertRaises(ParseError) as e:
+                Assembler(defines={'FOO': 1}).assemble(code)
+            self.assertEqual(f"ParseError: {error}", str(e.exception), code)
+        with self.assertRaises(AssembleError) as e:
+            IncrementalAssembler(".IF 1\n.ENDIF")
+        self.assertEqual("AssembleError: `.IF` is not supported by the incremental assembler at line 1",
+                         str(e.exception))
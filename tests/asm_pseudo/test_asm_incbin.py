@@ -0,0 +1,67 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, IncludeCache
+
+
+class TestAssembleINCBIN(TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.write('data.bin', bytes(range(0x10, 0x20)))
+        self.write('empty.bin', b'')
+        self.assembler = Assembler(include_paths=[self.temp_dir.name], include_cache=IncludeCache())
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        with open(os.path.join(self.temp_dir.name, name), 'wb') as writer:
+            writer.write(data)
+
+    def test_incbin(self):
+        code = "ORG $1000\n" \
+               "DATA .INCBIN \"data.bin\"\n" \
+               "     .WORD DATA"
+        results = self.assembler.assemble(code, add_entry=False)
+        self.assertEqual([
+            (0x1000, list(range(0x10, 0x20)) + [0x00, 0x10]),
+        ], results)
+
+    def test_slice(self):
+        code = ".INCBIN \"data.bin\", 14\n" \
+               ".INCBIN \"data.bin\", 2, 3\n" \
+               ".INCBIN \"data.bin\", 4, 0\n" \
+               ".INCBIN \"empty.bin\"\n" \
+               "NOP"
+        results = self.assembler.assemble(code, add_entry=False)
+        self.assertEqual([
+            (0x0000, [0x1E, 0x1F, 0x12, 0x13, 0x14, 0xEA]),
+        ], results)
+        self.assertEqual([2, 3, 0, 0, 1], self.assembler.code_sizes)
+
+    def test_relative_to_included_file(self):
+        os.makedirs(os.path.join(self.temp_dir.name, 'sub'))
+        self.write('sub/data.bin', b'\xAB')
+        self.write('sub/data.asm', b'.INCBIN "data.bin"')
+        results = self.assembler.assemble(".INCLUDE \"sub/data.asm\"", add_entry=False)
+        self.assertEqual([(0x0000, [0xAB])], results)
+
+    def test_out_of_range(self):
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble(".INCBIN \"data.bin\", 10, 7")
+        self.assertEqual("AssembleError: The slice [10, 17) is out of the file of size 16 at line 1",
+                         str(e.exception))
+
+    def test_invalid(self):
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble("L .INCBIN \"data.bin\", L")
+        self.assertEqual("AssembleError: `.INCBIN` only accepts a file name, a constant offset and a constant length "
+                         "at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble(".INCBIN $10")
+        self.assertEqual("AssembleError: Address addressing is not allowed for `INCBIN` at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble(".INCBIN \"unknown.bin\"")
+        self.assertEqual("AssembleError: Can not find the file 'unknown.bin' at line 1", str(e.exception))
@@ -0,0 +1,117 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, ParseError, IncludeCache, IncrementalAssembler
+
+
+class TestAssembleINCLUDE(TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.lib_dir = os.path.join(self.temp_dir.name, 'lib')
+        os.makedirs(os.path.join(self.lib_dir, 'sub'))
+        self.write('lib/delay.asm', "DELAY LDX #$10\n"
+                                    "LOOP  DEX\n"
+                                    "      BNE LOOP\n"
+                                    "      RTS")
+        self.write('lib/main.asm', ".INCLUDE \"sub/data.asm\"")
+        self.write('lib/sub/data.asm', "DATA  .BYTE 1, 2")
+        self.cache = IncludeCache()
+        self.assembler = Assembler(include_paths=[self.lib_dir], include_cache=self.cache)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write(self, name, code):
+        with open(os.path.join(self.temp_dir.name, name), 'w') as writer:
+            writer.write(code)
+
+    def test_include(self):
+        code = "START ORG $1000\n" \
+               "      JSR DELAY\n" \
+               "      JMP START\n" \
+               "      .INCLUDE \"delay.asm\""
+        results = self.assembler.assemble(code, add_entry=False)
+        self.assertEqual([
+            (0x1000, [0x20, 0x06, 0x10, 0x4C, 0x00, 0x10, 0xA2, 0x10, 0xCA, 0xD0, 0xFD, 0x60]),
+        ], results)
+        self.assertEqual(0x1006, self.assembler.label_offsets['DELAY'])
+
+    def test_nested(self):
+        code = "ORG $1000\n" \
+               ".INCLUDE \"main.asm\"\n" \
+               ".WORD DATA"
+        results = self.assembler.assemble(code, add_entry=False)
+        self.assertEqual([
+            (0x1000, [0x01, 0x02, 0x00, 0x10]),
+        ], results)
+
+    def test_cache(self):
+        code = ".INCLUDE \"delay.asm\""
+        expected = self.assembler.assemble(code)
+        self.assertEqual(expected, self.assembler.assemble(code))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.write('lib/delay.asm', "DELAY RTS")
+        os.utime(os.path.join(self.lib_dir, 'delay.asm'), ns=(0, 0))
+        self.assertEqual([(0x0000, [0x60]), (0xFFFC, [0x00, 0x00])], self.assembler.assemble(code))
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+
+    def test_disk_cache(self):
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        code = ".INCLUDE \"main.asm\""
+        expected = Assembler(include_paths=[self.lib_dir], include_cache=IncludeCache(cache_dir)).assemble(code)
+        cache = IncludeCache(cache_dir)
+        self.assertEqual(expected, Assembler(include_paths=[self.lib_dir], include_cache=cache).assemble(code))
+        self.assertEqual((2, 0), (cache.hits, cache.misses))
+
+    def test_incremental(self):
+        session = IncrementalAssembler("ORG $1000\n"
+                                       "JSR DELAY\n"
+                                       ".INCLUDE \"delay.asm\"",
+                                       include_paths=[self.lib_dir], include_cache=self.cache)
+        session.edit(1, 1, "NOP")
+        self.assertEqual(self.assembler.assemble(session.text), session.codes)
+        self.assertEqual(0x1004, session.label_offsets['DELAY'])
+
+    def test_error_in_file(self):
+        self.write('lib/error.asm', "NOP\n"
+                                    "JMP UNKNOWN")
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble(".INCLUDE \"error.asm\"")
+        path = os.path.join(self.lib_dir, 'error.asm')
+        self.assertEqual(f"AssembleError: Can not resolve label 'UNKNOWN' at line 2 in '{path}'", str(e.exception))
+
+    def test_parse_error_in_file(self):
+        self.write('lib/error.asm', "NOP\n"
+                                    "LDA $")
+        with self.assertRaises(ParseError) as e:
+            self.assembler.assemble(".INCLUDE \"error.asm\"")
+        path = os.path.join(self.lib_dir, 'error.asm')
+        self.assertEqual(f"ParseError: Illegal character '$' found at line 2, column 5 in '{path}'",
+                         str(e.exception))
+
+    def test_not_found(self):
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble("NOP\n"
+                                    ".INCLUDE \"unknown.asm\"")
+        self.assertEqual("AssembleError: Can not find the file 'unknown.asm' at line 2", str(e.exception))
+
+    def test_recursive(self):
+        self.write('lib/loop.asm', "NOP\n"
+                                   ".INCLUDE \"loop.asm\"")
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble(".INCLUDE \"loop.asm\"")
+        path = os.path.join(self.lib_dir, 'loop.asm')
+        self.assertEqual(f"AssembleError: Recursive inclusion of '{path}' at line 2 in '{path}'", str(e.exception))
+
+    def test_invalid(self):
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble(".INCLUDE $10")
+        self.assertEqual("AssembleError: `.INCLUDE` only accepts a file name at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble("LIB .INCLUDE \"delay.asm\"")
+        self.assertEqual("AssembleError: Label is not allowed for `.INCLUDE` at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            self.assembler.assemble("LDA \"delay.asm\"")
+        self.assertEqual("AssembleError: String addressing is not allowed for `LDA` at line 1", str(e.exception))
@@ -0,0 +1,134 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import get_parser, Assembler, AssembleError, IncludeCache, IncrementalAssembler
+
+
+class TestAssembleMACRO(TestCase):
+
+    INC16 = ".MACRO INC16 ADDR\n" \
+            "      INC ADDR\n" \
+            "      BNE SKIP\n" \
+            "      INC ADDR+1\n" \
+            "SKIP  .ENDM\n"
+
+    def test_macro(self):
+        code = self.INC16 + \
+            "START .INC16 $10\n" \
+            "      .INC16 $1234\n" \
+            "      JMP START"
+        expected = Assembler().assemble("START INC $10\n"
+                                        "      BNE S1\n"
+                                        "      INC $10+1\n"
+                                        "S1    INC $1234\n"
+                                        "      BNE S2\n"
+                                        "      INC $1234+1\n"
+                                        "S2    JMP START")
+        assembler = Assembler()
+        self.assertEqual(expected, assembler.assemble(code))
+        self.assertEqual(0, assembler.label_offsets['START'])
+        self.assertEqual(6, assembler.label_offsets['SKIP@INC16.1'])
+        self.assertEqual(14, assembler.label_offsets['SKIP@INC16.2'])
+
+    def test_arguments(self):
+        code = ".MACRO COPY SRC, DST, COUNT\n" \
+               "      LDX #COUNT-1\n" \
+               "LOOP  LDA SRC,X\n" \
+               "      STA DST,X\n" \
+               "      DEX\n" \
+               "      BPL LOOP\n" \
+               ".ENDM\n" \
+               ".MACRO DATA NAME\n" \
+               "      .INCBIN NAME\n" \
+               ".ENDM\n" \
+               "ORG $8000\n" \
+               "      .COPY TABLE, $0200, END-TABLE\n" \
+               "TABLE .BYTE 1, 2, 3\n" \
+               "END   .DATA \"data.bin\""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'data.bin'), 'wb') as writer:
+                writer.write(bytes([4, 5]))
+            assembler = Assembler(include_paths=[temp_dir])
+            expected = assembler.assemble("ORG $8000\n"
+                                          "      LDX #[END-TABLE]-1\n"
+                                          "LOOP  LDA TABLE,X\n"
+                                          "      STA $0200,X\n"
+                                          "      DEX\n"
+                                          "      BPL LOOP\n"
+                                          "TABLE .BYTE 1, 2, 3\n"
+                                          "END   .INCBIN \"data.bin\"")
+            self.assertEqual(expected, assembler.assemble(code))
+
+    def test_nested(self):
+        code = self.INC16 + \
+            ".MACRO WAIT ADDR\n" \
+            "LOOP  .INC16 ADDR\n" \
+            "      .INC16 ADDR\n" \
+            "      BNE LOOP\n" \
+            ".ENDM\n" \
+            "      .WAIT $10\n" \
+            "      .WAIT $10"
+        assembler = Assembler()
+        results = assembler.assemble(code, add_entry=False)
+        self.assertEqual(28, len(results[0][1]))
+        self.assertEqual([0xD0, 0xF2], results[0][1][12:14])
+        self.assertEqual([0xD0, 0xF2], results[0][1][26:28])
+        self.assertEqual({'LOOP@WAIT.1': 0, 'SKIP@INC16.1.1': 6, 'SKIP@INC16.2.1': 12,
+                          'LOOP@WAIT.2': 14, 'SKIP@INC16.1.2': 20, 'SKIP@INC16.2.2': 26},
+                         assembler.label_offsets)
+
+    def test_shared_expansions(self):
+        code = ".MACRO PUSH VALUE\n" \
+               "      LDA #VALUE\n" \
+               "      PHA\n" \
+               ".ENDM\n" + \
+               "      .PUSH 1\n" * 100 + \
+               "      .PUSH 2"
+        assembler = Assembler()
+        instructions = assembler._include(get_parser().parse(code))
+        self.assertEqual(202, len(instructions))
+        self.assertIs(instructions[0], instructions[198])
+        self.assertIsNot(instructions[0], instructions[200])
+        self.assertEqual([0xA9, 0x01, 0x48] * 100 + [0xA9, 0x02, 0x48], assembler.assemble(code)[0][1])
+
+    def test_included_macros(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'macros.asm'), 'w') as writer:
+                writer.write(self.INC16)
+            with open(os.path.join(temp_dir, 'data.asm'), 'w') as writer:
+                writer.write("DATA .BYTE 1")
+            cache = IncludeCache()
+            assembler = Assembler(include_paths=[temp_dir], include_cache=cache)
+            code = ".INCLUDE \"macros.asm\"\n" \
+                   ".INCLUDE \"data.asm\"\n" \
+                   ".INC16 DATA"
+            expected = [(0x0000, [0x01, 0xEE, 0x00, 0x00, 0xD0, 0x03, 0xEE, 0x01, 0x00])]
+            self.assertEqual(expected, assembler.assemble(code, add_entry=False))
+            self.assertEqual([(os.path.join(temp_dir, 'data.asm'), [0])], assembler.included_files)
+            self.assertEqual(expected, assembler.assemble(code, add_entry=False))
+            self.assertEqual((1, 1), (cache.size_hits, cache.size_misses))
+
+    def test_errors(self):
+        cases = [
+            (".MACRO M\nNOP", "`.MACRO` without `.ENDM` at line 1"),
+            (".ENDM", "`.ENDM` without `.MACRO` at line 1"),
+            (".MACRO M\n.MACRO N\n.ENDM\n.ENDM", "Nested `.MACRO` is not allowed at line 2"),
+            (".MACRO $10\n.ENDM", "`.MACRO` only accepts a name and the names of the parameters at line 1"),
+            ("L .MACRO M\n.ENDM", "Label is not allowed for `.MACRO` at line 1"),
+            (".MACRO BYTE\n.ENDM", "The macro 'BYTE' conflicts with `.BYTE` at line 1"),
+            (".MACRO M\n.ENDM\n.MACRO M\n.ENDM", "The macro 'M' is defined multiple times at line 3"),
+            (".MACRO M P, P\n.ENDM", "The parameters of the macro 'M' are not unique at line 1"),
+            (".MACRO M P\n.ENDM\n.M", "The macro 'M' expects 1 arguments, found 0 at line 3"),
+            (".MACRO M P\n.ENDM\n.M #1", "`.M` only accepts the arguments of the macro at line 3"),
+            (".MACRO M\n.N\n.ENDM\n.MACRO N\n.M\n.ENDM\n.M", "Recursive expansion of the macro 'M' at line 5"),
+            (".MACRO M\nLDA #$100\n.ENDM\n.M", "The value 0x100 is too large for the addressing at line 2"),
+        ]
+        for code, error in cases:
+            with self.assertRaises(AssembleError) as e:
+                Assembler().assemble(code)
+            self.assertEqual(f"AssembleError: {error}", str(e.exception), code)
+        with self.assertRaises(AssembleError) as e:
+            IncrementalAssembler(self.INC16)
+        self.assertEqual("AssembleError: `.MACRO` is not supported by the incremental assembler at line 1",
+                         str(e.exception))
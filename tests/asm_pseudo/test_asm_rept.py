@@ -0,0 +1,94 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import get_parser, Assembler, AssembleError, IncrementalAssembler, assemble_object, link
+
+
+class TestAssembleREPT(TestCase):
+
+    def test_rept(self):
+        code = "ORG $1000\n" \
+               "START .REPT 3\n" \
+               "      LDA #1\n" \
+               "      STA $2000\n" \
+               "      .ENDR\n" \
+               "      .REPT 0\n" \
+               "      NOP\n" \
+               "      .ENDR\n" \
+               "END   JMP START"
+        assembler = Assembler()
+        results = assembler.assemble(code, add_entry=False)
+        self.assertEqual([(0x1000, [0xA9, 0x01, 0x8D, 0x00, 0x20] * 3 + [0x4C, 0x00, 0x10])], results)
+        self.assertEqual({'START': 0x1000, 'END': 0x100F}, assembler.label_offsets)
+        self.assertEqual([0, 15, 0, 3], assembler.code_sizes)
+        self.assertEqual(0x1000, assembler.code_start)
+        # The block is one instruction
+        self.assertEqual(4, len(assembler._include(get_parser().parse(code))))
+
+    def test_variable(self):
+        code = "ORG $1000\n" \
+               ".REPT 4, I\n" \
+               ".BYTE I*2\n" \
+               ".WORD TABLE+I\n" \
+               ".ENDR\n" \
+               ".REPT 2, I\n" \
+               ".REPT 2, J\n" \
+               ".WORD I*$100+J\n" \
+               ".ENDR\n" \
+               ".ENDR\n" \
+               ".REPT 20, I\n" \
+               "LDA $F8+I\n" \
+               ".ENDR\n" \
+               "TABLE .END"
+        expected = Assembler().assemble("ORG $1000\n" +
+                                        "\n".join(f".BYTE {i}*2\n.WORD TABLE+{i}" for i in range(4)) + "\n" +
+                                        "\n".join(f".WORD {i}*$100+{j}" for i in range(2) for j in range(2)) + "\n" +
+                                        "\n".join(f"LDA $F8+{i}" for i in range(20)) + "\n" +
+                                        "TABLE .END")
+        assembler = Assembler()
+        self.assertEqual(expected, assembler.assemble(code))
+        # The addresses that do not fit zero-page change the sizes of the iterations
+        self.assertEqual(8 * 2 + 12 * 3, assembler.code_sizes[3])
+
+    def test_labels(self):
+        code = "ORG $1000\n" \
+               "      .REPT 2, I\n" \
+               "      LDX #I\n" \
+               "LOOP  DEX\n" \
+               "      BNE LOOP\n" \
+               "      .ENDR\n" \
+               "      JMP *"
+        assembler = Assembler()
+        results = assembler.assemble(code, add_entry=False)
+        self.assertEqual([(0x1000, [0xA2, 0x00, 0xCA, 0xD0, 0xFD, 0xA2, 0x01, 0xCA, 0xD0, 0xFD, 0x4C, 0x0A, 0x10])],
+                         results)
+        self.assertNotIn('LOOP', assembler.label_offsets)
+        self.assertEqual(results, link([(0x1000, assemble_object(code[10:]))], add_entry=False))
+
+    def test_assemble_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'main.asm')
+            with open(path, 'w') as writer:
+                writer.write("ORG $10\n.REPT 2\nNOP\n.ENDR")
+            self.assertEqual([(0x10, [0xEA, 0xEA])], Assembler().assemble_file(path, add_entry=False))
+
+    def test_errors(self):
+        cases = [
+            (".REPT 2\nNOP", "`.REPT` without `.ENDR` at line 1"),
+            (".ENDR", "`.ENDR` without `.REPT` at line 1"),
+            (".REPT 2\nORG $10\n.ENDR", "`ORG` is not allowed in `.REPT` at line 2"),
+            (".REPT 2\nL .ENDR", "Label is not allowed for `.ENDR` at line 2"),
+            (".REPT 2, 3\n.ENDR", "`.REPT` only accepts a count and the name of the variable at line 1"),
+            (".REPT -1\n.ENDR", "The count of `.REPT` should be a non-negative number at line 1"),
+            (".REPT N\n.ENDR\nN .BYTE 1", "Can not resolve label 'N' at line 1"),
+            (".REPT 2, I\nLDA #I+$FF\n.ENDR", "The value 0x100 is too large for the addressing at line 2"),
+        ]
+        for code, error in cases:
+            with self.assertRaises(AssembleError) as e:
+                Assembler().assemble(code)
+            self.assertEqual(f"AssembleError: {error}", str(e.exception), code)
+        with self.assertRaises(AssembleError) as e:
+            IncrementalAssembler(".REPT 2\n.ENDR")
+        self.assertEqual("AssembleError: `.REPT` is not supported by the incremental assembler at line 1",
+                         str(e.exception))
@@ -0,0 +1,82 @@
+import math
+from unittest import TestCase, skipIf
+
+from asm_6502 import Assembler, AssembleError, evaluate_table
+from asm_6502.table import np
+
+
+class TestAssembleTABLE(TestCase):
+
+    def test_table(self):
+        code = "ORG $1000\n" \
+               "SINE  .TABLE \"128 + 127 * SIN[I * PI * 0.0078125]\", 256\n" \
+               "ROWS  .WTABLE \"$0400 + I * 40\", 25\n" \
+               "LOW   .TABLE \"LO[$0400 + I * 40]\", 25\n" \
+               "DELTA .TABLE \"-I + %10\", 4"
+        expected = [round(128 + 127 * math.sin(i * math.pi * 0.0078125)) for i in range(256)]
+        for i in range(25):
+            expected += [(0x0400 + i * 40) & 0xFF, (0x0400 + i * 40) >> 8]
+        expected += [(0x0400 + i * 40) & 0xFF for i in range(25)]
+        expected += [0x02, 0x01, 0x00, 0xFF]
+        assembler = Assembler()
+        self.assertEqual([(0x1000, expected)], assembler.assemble(code, add_entry=False))
+        self.assertEqual([0, 256, 50, 25, 4], assembler.code_sizes)
+
+    def test_fallback(self):
+        cases = [
+            ("FLOOR[SQRT[I]] * 3", 100, False),
+            ("MAX[MIN[I - 10, 50], 0] + HI[I * 300]", 100, False),
+            ("ROUND[COS[I / 7] * 1000]", 500, True),
+            ("ABS[TAN[I / 100]] + CEIL[I / 3] + 1", 100, True),
+            ("7", 3, False),
+        ]
+        for expression, count, is_word in cases:
+            fallback = evaluate_table(expression, count, is_word=is_word, vectorized=False)
+            self.assertEqual(count * (2 if is_word else 1), len(fallback))
+            if np is not None:
+                self.assertEqual(fallback, evaluate_table(expression, count, is_word=is_word, vectorized=True))
+        self.assertEqual(bytes([7, 7, 7]), evaluate_table("7", 3, vectorized=False))
+
+    def test_division(self):
+        # The same integer division as the assembler, rounded towards the negative infinity
+        codes = Assembler().assemble(".BYTE " + ", ".join(f"[{i} - 7] / 2 + 8" for i in range(8)), add_entry=False)
+        for vectorized in [False, True] if np is not None else [False]:
+            self.assertEqual(bytes([0, 0, 1, 1, 2, 2, 3, 3]), evaluate_table("I / 2", 8, vectorized=vectorized))
+            self.assertEqual(bytes(codes[0][1]), evaluate_table("[I - 7] / 2 + 8", 8, vectorized=vectorized))
+            self.assertEqual(bytes([0, 1, 2, 4]), evaluate_table("FLOOR[SQRT[I * 3]] / 1 + ROUND[I / 3]", 4,
+                                                                 vectorized=vectorized))
+            for expression, error in [("I + 1 / 0", "The value at index 0 is not a number"),
+                                      ("1 / [I - 2] / 2", "The value at index 2 is not a number"),
+                                      ("SIN[I * 2 * PI / 256]", "The operand of `/` at index 1 is not an integer"),
+                                      ("PI / 2", "The operand of `/` at index 0 is not an integer")]:
+                with self.assertRaises(ValueError) as e:
+                    evaluate_table(expression, 4, vectorized=vectorized)
+                self.assertEqual(error, str(e.exception), (expression, vectorized))
+
+    @skipIf(np is None, 'NumPy is not installed')
+    def test_vectorized_errors(self):
+        with self.assertRaises(ValueError) as e:
+            evaluate_table("1 / [I - 2]", 4, vectorized=True)
+        self.assertEqual("The value at index 2 is not a number", str(e.exception))
+
+    def test_errors(self):
+        cases = [
+            (".TABLE \"I\"", "`.TABLE` only accepts an expression and a constant count at line 1"),
+            (".WTABLE \"I\", N\nN NOP", "`.WTABLE` only accepts an expression and a constant count at line 1"),
+            (".TABLE 1, 2", "List addressing is not allowed for `TABLE` at line 1"),
+            (".TABLE \"I * 2\", 200", "The value 256 at index 128 can not fit in a byte at line 1"),
+            (".WTABLE \"-I * $100\", 200", "The value -33024 at index 129 can not fit in a word at line 1"),
+            (".TABLE \"1 / [I - 2]\", 4", "The value at index 2 is not a number at line 1"),
+            (".TABLE \"SQRT[-1 - I]\", 4", "The value at index 0 is not a number at line 1"),
+            (".TABLE \"J\", 4", "Unknown name 'J' in the table at line 1"),
+            (".TABLE \"EXP[I]\", 4", "Unknown function 'EXP' in the table at line 1"),
+            (".TABLE \"MIN[I]\", 4", "Wrong number of arguments for 'MIN' in the table at line 1"),
+            (".TABLE \"I +\", 4", "Invalid expression 'I +' in the table at line 1"),
+            (".TABLE \"I ** 2\", 4", "The table only accepts numbers, `I`, `PI`, `+`, `-`, `*`, `/`, brackets and "
+                                     "the functions abs, ceil, cos, floor, hi, lo, max, min, round, sin, sqrt, tan "
+                                     "at line 1"),
+        ]
+        for code, error in cases:
+            with self.assertRaises(AssembleError) as e:
+                Assembler().assemble(code)
+            self.assertEqual(f"AssembleError: {error}", str(e.exception), code)
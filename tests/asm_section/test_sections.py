@@ -0,0 +1,121 @@
+import random
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, Placement, place_sections, assemble_sections, format_memory_map
+
+
+class TestSections(TestCase):
+
+    CODE = ".SECTION ZP\n" \
+           "PTR   .WORD 0\n" \
+           ".SECTION CODE\n" \
+           "START LDA #LO TABLE\n" \
+           "      STA PTR\n" \
+           "      JMP START\n" \
+           ".SECTION \"TABLE\"\n" \
+           "TABLE .BYTE 1, 2, 3\n" \
+           ".SECTION CODE\n" \
+           "      RTS"
+
+    def test_assemble_sections(self):
+        codes, placements = assemble_sections(self.CODE, {
+            'ZP': {'zero_page': True},
+            'CODE': {'address': 0x8000},
+            'TABLE': {'align': 0x100},
+        }, reserved=[(0x0100, 0x0200)])
+        self.assertEqual([
+            Placement('ZP', 0x0000, 2),
+            Placement('TABLE', 0x0200, 3),
+            Placement('CODE', 0x8000, 9),
+        ], placements)
+        expected = Assembler().assemble("ORG $0000\n"
+                                        "PTR   .WORD 0\n"
+                                        "ORG $0200\n"
+                                        "TABLE .BYTE 1, 2, 3\n"
+                                        "ORG $8000\n"
+                                        "START LDA #LO TABLE\n"
+                                        "      STA PTR\n"
+                                        "      JMP START\n"
+                                        "      RTS")
+        self.assertEqual(expected, codes)
+        self.assertEqual("$0000-$0001      2  ZP\n"
+                         "$0002-$00FF    254  (free)\n"
+                         "$0100-$01FF    256  (reserved)\n"
+                         "$0200-$0202      3  TABLE\n"
+                         "$0203-$7FFF  32253  (free)\n"
+                         "$8000-$8008      9  CODE\n"
+                         "$8009-$FFFF  32759  (free)",
+                         format_memory_map(placements, reserved=[(0x0100, 0x0200)]))
+
+    def test_zero_page_preference(self):
+        placements = place_sections([('A', 0x80), ('B', 0x80), ('ZP', 0x20)], {'ZP': {'zero_page': True}},
+                                    max_memory=0x300)
+        self.assertEqual([Placement('ZP', 0x00, 0x20), Placement('A', 0x100, 0x80), Placement('B', 0x180, 0x80)],
+                         placements)
+        # The zero page is used when there is no other space
+        placements = place_sections([('A', 0xF0), ('B', 0x80), ('C', 0x10)], max_memory=0x200)
+        self.assertEqual([Placement('B', 0x00, 0x80), Placement('C', 0x80, 0x10), Placement('A', 0x100, 0xF0)],
+                         placements)
+
+    def test_random_placements(self):
+        generator = random.Random(42)
+        sections = [(f'S{i}', generator.randint(0, 300)) for i in range(2000)]
+        constraints = {f'S{i}': {'align': generator.choice([2, 16, 256])} for i in range(0, 2000, 3)}
+        constraints['S1'] = {'address': 0x1234}
+        constraints['S4'] = {'zero_page': True}
+        placements = place_sections(sections, constraints, max_memory=0x100000, reserved=[(0x2000, 0x4000)])
+        self.assertEqual(len(sections), len(placements))
+        for prev, placement in zip(placements, placements[1:]):
+            self.assertLessEqual(prev.end, placement.address)
+        for placement in placements:
+            self.assertEqual(0, placement.address % constraints.get(placement.name, {}).get('align', 1))
+            self.assertFalse(placement.address < 0x4000 and 0x2000 < placement.end)
+        self.assertIn(Placement('S1', 0x1234, sections[1][1]), placements)
+        self.assertLess([p for p in placements if p.name == 'S4'][0].address, 0x100)
+
+    def test_fragmented_placements(self):
+        # Every other 4 bytes are fixed, so the floating sections fill the fragments between them
+        sections = [(f'F{i}', 4) for i in range(5000)] + [(f'S{i}', 1 + i % 4) for i in range(5000)]
+        constraints = {f'F{i}': {'address': 0x1000 + i * 8} for i in range(5000)}
+        reserved = [(0x100 + i * 16, 0x108 + i * 16) for i in range(0x0F0)]
+        placements = place_sections(sections, constraints, max_memory=0x10000, reserved=reserved)
+        self.assertEqual(len(sections), len(placements))
+        for prev, placement in zip(placements, placements[1:]):
+            self.assertLessEqual(prev.end, placement.address)
+        for placement in placements:
+            if placement.name.startswith('S'):
+                self.assertFalse(any(placement.address < end and start < placement.end for start, end in reserved))
+        # The best fit fills the gaps of the same size between the fixed sections
+        for placement in placements:
+            if placement.name.startswith('S') and placement.size == 4:
+                self.assertTrue(0x1000 <= placement.address < 0x1000 + 5000 * 8)
+                self.assertEqual(4, placement.address % 8)
+
+    def test_errors(self):
+        with self.assertRaises(AssembleError) as e:
+            place_sections([('A', 0x10), ('B', 0x10)], {'A': {'address': 0x100}, 'B': {'address': 0x108}})
+        self.assertEqual("AssembleError: Section 'B' at 0x108 overlaps section 'A'", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            place_sections([('A', 0x10), ('B', 0x10)], {'A': {'address': 0x100}, 'B': {'address': 0x1F8}},
+                           reserved=[(0x300, 0x400), (0x180, 0x200), (0x110, 0x120)])
+        self.assertEqual("AssembleError: Section 'B' at 0x1f8 overlaps the reserved memory [0x180, 0x200)",
+                         str(e.exception))
+        self.assertEqual([Placement('A', 0x100, 0x10), Placement('B', 0x200, 0x10)],
+                         place_sections([('A', 0x10), ('B', 0x10)], {'A': {'address': 0x100}, 'B': {'address': 0x200}},
+                                        reserved=[(0x300, 0x400), (0x180, 0x200), (0x110, 0x120)]))
+        with self.assertRaises(AssembleError) as e:
+            place_sections([('A', 0x100), ('B', 0x100)], max_memory=0x180)
+        self.assertEqual("AssembleError: Can not find free memory for section 'B' of 256 bytes", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            place_sections([('A', 0x10)], {'A': {'aligned': 2}})
+        self.assertEqual("AssembleError: Unknown constraints ['aligned'] for section 'A'", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            assemble_sections("NOP")
+        self.assertEqual("AssembleError: The instruction is not in any section at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            assemble_sections(".SECTION $10")
+        self.assertEqual("AssembleError: `.SECTION` only accepts a name at line 1", str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            Assembler().assemble(".SECTION CODE")
+        self.assertEqual("AssembleError: `.SECTION` is only allowed when the sections are placed by "
+                         "`assemble_sections` at line 1", str(e.exception))
@@ -0,0 +1,179 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from asm_6502 import SourceMap, apply_ips, apply_bps
+from asm_6502.cli import main
+
+
+class _Output(io.StringIO):
+
+    def __init__(self):
+        super().__init__()
+        self.buffer = io.BytesIO()
+
+
+class TestCommandLine(TestCase):
+
+    CODE = ".IFDEF PAL\n" \
+           "ORG $C000\n" \
+           ".ELSE\n" \
+           "ORG $8000\n" \
+           ".ENDIF\n" \
+           "START JMP START\n" \
+           ".INCLUDE \"data.asm\""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, 'main.asm')
+        with open(self.source, 'w') as writer:
+            writer.write(self.CODE)
+        os.makedirs(os.path.join(self.temp_dir.name, 'lib'))
+        with open(os.path.join(self.temp_dir.name, 'lib', 'data.asm'), 'w') as writer:
+            writer.write(".BYTE 1, 2")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _read(self, name: str) -> bytes:
+        with open(os.path.join(self.temp_dir.name, name), 'rb') as reader:
+            return reader.read()
+
+    def test_formats(self):
+        include = os.path.join(self.temp_dir.name, 'lib')
+        self.assertEqual(0, main([self.source, '-I', include, '--no-entry']))
+        self.assertEqual(bytes([0x4C, 0x00, 0x80, 0x01, 0x02]), self._read('main.bin'))
+        self.assertEqual(0, main([self.source, '-I', include, '-D', 'PAL', '-f', 'flat', '--fill', '$FF']))
+        image = self._read('main.rom')
+        self.assertEqual(0x10000, len(image))
+        self.assertEqual(bytes([0xFF, 0x4C, 0x00, 0xC0, 0x01, 0x02, 0xFF]), image[0xBFFF:0xC006])
+        self.assertEqual(bytes([0x00, 0xC0]), image[0xFFFC:0xFFFE])
+        output = os.path.join(self.temp_dir.name, 'out.hex')
+        self.assertEqual(0, main([self.source, '-I', include, '-o', output]))
+        self.assertEqual(b":058000004C00800102AC\n"
+                         b":02FFFC00008083\n"
+                         b":00000001FF\n", self._read('out.hex'))
+        output = os.path.join(self.temp_dir.name, 'out.s19')
+        self.assertEqual(0, main([self.source, '-I', include, '-D', 'PAL=0', '-o', output, '--no-entry']))
+        self.assertEqual(b"S0030000FC\n"
+                         b"S108C0004C00C0010228\n"
+                         b"S5030001FB\n"
+                         b"S903C0003C\n", self._read('out.s19'))
+
+    def test_stdio(self):
+        stdout = _Output()
+        with patch('sys.stdin', io.StringIO("NOP")), patch('sys.stdout', stdout):
+            self.assertEqual(0, main(['-f', 'ihex', '--program-entry', '0xFFFA']))
+        self.assertEqual(b":01000000EA15\n"
+                         b":02FFFA00000005\n"
+                         b":00000001FF\n", stdout.buffer.getvalue())
+
+    def test_flat_image(self):
+        stdout = _Output()
+        with patch('sys.stdout', stdout):
+            self.assertEqual(0, main([self.source, '-I', os.path.join(self.temp_dir.name, 'lib'), '-f', 'flat',
+                                      '--fill', '$EA', '--max-memory', '0x20000', '-o', '-']))
+        self.assertEqual(0, main([self.source, '-I', os.path.join(self.temp_dir.name, 'lib'), '-f', 'flat',
+                                  '--fill', '$EA', '--max-memory', '0x20000']))
+        self.assertEqual(0x20000, len(stdout.buffer.getvalue()))
+        self.assertEqual(stdout.buffer.getvalue(), self._read('main.rom'))
+
+    def test_patch(self):
+        include = os.path.join(self.temp_dir.name, 'lib')
+        self.assertEqual(0, main([self.source, '-I', include, '-f', 'flat']))
+        with open(os.path.join(self.temp_dir.name, 'lib', 'data.asm'), 'w') as writer:
+            writer.write(".BYTE 1, 3")
+        previous = os.path.join(self.temp_dir.name, 'main.rom')
+        self.assertEqual(0, main([self.source, '-I', include, '--patch-from', previous, '-o',
+                                  os.path.join(self.temp_dir.name, 'main.ips')]))
+        self.assertEqual(b'PATCH\x00\x80\x04\x00\x01\x03EOF', self._read('main.ips'))
+        self.assertEqual(0, main([self.source, '-I', include, '--patch-from', previous, '-f', 'bps']))
+        self.assertEqual(bytes(apply_bps(self._read('main.rom'), self._read('main.bps'))),
+                         apply_ips(self._read('main.rom'), self._read('main.ips')))
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(1, main([self.source, '-I', include, '-f', 'ips']))
+        self.assertEqual("The ips output needs the previous image from `--patch-from`\n", stderr.getvalue())
+
+    def test_source_map(self):
+        source_map = os.path.join(self.temp_dir.name, 'main.map')
+        self.assertEqual(0, main([self.source, '-I', os.path.join(self.temp_dir.name, 'lib'),
+                                  '--source-map', source_map]))
+        with open(source_map, 'rb') as reader:
+            source_map = SourceMap.from_bytes(reader.read())
+        self.assertEqual((self.source, 6), source_map.line_at(0x8002))
+        self.assertEqual(0x8003, source_map.address_of(1, os.path.join(self.temp_dir.name, 'lib', 'data.asm')))
+
+    def test_symbols(self):
+        args = [self.source, '-I', os.path.join(self.temp_dir.name, 'lib')]
+        self.assertEqual(0, main(args + ['--symbols', os.path.join(self.temp_dir.name, 'main.lbl')]))
+        self.assertEqual(b"al C:8000 .START\n", self._read('main.lbl'))
+        self.assertEqual(0, main(args + ['--symbols', os.path.join(self.temp_dir.name, 'main.txt')]))
+        self.assertEqual(b"[labels]\n00:8000 START\n", self._read('main.txt'))
+        self.assertEqual(0, main(args + ['--symbols', os.path.join(self.temp_dir.name, 'main.txt'),
+                                         '--symbol-format', 'fceux']))
+        self.assertEqual(b"$8000#START#\n", self._read('main.txt'))
+
+    def test_listing(self):
+        listing = os.path.join(self.temp_dir.name, 'main.lst')
+        self.assertEqual(0, main([self.source, '-I', os.path.join(self.temp_dir.name, 'lib'), '--listing', listing]))
+        self.assertEqual(b"8000                          4  ORG $8000\n"
+                         b"8000  4C 00 80         3      6  START JMP START\n"
+                         b"8003  01 02                   1  .BYTE 1, 2\n"
+                         b"\n"
+                         b"Blocks:\n"
+                         b"8000  START        3\n", self._read('main.lst'))
+
+    def test_page_crossings(self):
+        source = os.path.join(self.temp_dir.name, 'pages.asm')
+        with open(source, 'w') as writer:
+            writer.write("ORG $80FD\nLOOP INX\n.HOT\nBNE LOOP\n.ENDHOT")
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(0, main([source, '--page-crossings']))
+        self.assertEqual(f"{source}:4: the branch at $80FE to $80FD crosses a page\n", stderr.getvalue())
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(1, main([source, '--strict-pages']))
+        self.assertIn("The branch to 0x80fd crosses a page in a hot region at line 4", stderr.getvalue())
+
+    def test_cache_report(self):
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        args = [self.source, '-I', os.path.join(self.temp_dir.name, 'lib'), '--cache-dir', cache_dir]
+        for report in ["Parse cache: 0 hits, 2 misses; sizing cache: 0 hits, 2 misses; 0 evictions\n",
+                       "Parse cache: 2 hits, 0 misses; sizing cache: 2 hits, 0 misses; 0 evictions\n"]:
+            stderr = io.StringIO()
+            with patch('sys.stderr', stderr):
+                self.assertEqual(0, main(args))
+            self.assertEqual(report, stderr.getvalue())
+
+    def test_cache_report_on_error(self):
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(1, main([self.source, '--cache-dir', os.path.join(self.temp_dir.name, 'cache')]))
+        self.assertEqual(f"AssembleError: Can not find the file 'data.asm' at line 7 in '{self.source}'\n"
+                         "Parse cache: 0 hits, 1 misses; sizing cache: 0 hits, 0 misses; 0 evictions\n",
+                         stderr.getvalue())
+
+    def test_decode_error(self):
+        with open(os.path.join(self.temp_dir.name, 'lib', 'data.asm'), 'wb') as writer:
+            writer.write(b".BYTE 1\n; \xff")
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(1, main([self.source, '-I', os.path.join(self.temp_dir.name, 'lib')]))
+        self.assertTrue(stderr.getvalue().startswith("The source is not UTF-8: 'utf-8' codec can't decode byte 0xff"),
+                        stderr.getvalue())
+
+    def test_errors(self):
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(1, main([self.source]))
+        self.assertEqual(f"AssembleError: Can not find the file 'data.asm' at line 7 in '{self.source}'\n",
+                         stderr.getvalue())
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr):
+            self.assertEqual(1, main([self.source, '-I', os.path.join(self.temp_dir.name, 'lib'),
+                                      '-f', 'flat', '--max-memory', '0x9000']))
+        self.assertEqual("The codes at 0xfffc of 2 bytes are out of [0x0, 0x9000)\n", stderr.getvalue())
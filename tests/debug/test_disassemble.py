@@ -0,0 +1,119 @@
+import random
+from unittest import TestCase
+
+from asm_6502 import Addressing, Assembler, Disassembled, decode_table, disassemble, format_instruction, \
+    format_disassembly, instruction_lengths, instruction_chains, code_regions
+
+
+class TestDisassemble(TestCase):
+
+    def test_decode_table(self):
+        table = decode_table()
+        self.assertEqual(256, len(table))
+        self.assertEqual(('LDA', Addressing.IMMEDIATE, 2), table[0xA9])
+        self.assertEqual(('LDA', Addressing.ABSOLUTE_X, 3), table[0xBD])
+        self.assertEqual(('STX', Addressing.ZERO_PAGE_Y, 2), table[0x96])
+        self.assertEqual(('LDX', Addressing.ABSOLUTE_Y, 3), table[0xBE])
+        self.assertEqual(('JMP', Addressing.INDIRECT, 3), table[0x6C])
+        self.assertEqual(('BNE', Addressing.RELATIVE, 2), table[0xD0])
+        self.assertEqual(('ROR', Addressing.ACCUMULATOR, 1), table[0x6A])
+        self.assertEqual(('NOP', Addressing.ABSOLUTE_X, 3), table[0x1C])
+        self.assertEqual(('LAS', Addressing.ABSOLUTE_Y, 3), table[0xBB])
+        self.assertEqual(('BRK', Addressing.IMPLIED, 2), table[0x00])
+        self.assertEqual(('BRK', Addressing.IMPLIED, 1), decode_table(brk_size=1)[0x00])
+        # The aliases of the illegal opcodes are not generated by the assembler
+        self.assertIsNone(table[0x1A])
+        self.assertEqual(221, sum(entry is not None for entry in table))
+
+    def test_round_trip(self):
+        # Every opcode generated by the assembler is assembled back to the same bytes
+        for brk_size in [1, 2]:
+            for opcode, entry in enumerate(decode_table(brk_size)):
+                if entry is None:
+                    continue
+                for operand in [0x00, 0x7F, 0x80, 0xFF]:
+                    data = bytes([opcode] + [operand, operand ^ 0x5A][:entry[2] - 1])
+                    if entry[0] == 'BRK':
+                        data = bytes(brk_size)
+                    instructions = disassemble(data, origin=0x8000, brk_size=brk_size)
+                    self.assertEqual(1, len(instructions))
+                    source = format_disassembly(instructions)
+                    codes = Assembler(brk_size=brk_size).assemble(source, add_entry=False)
+                    self.assertEqual([(0x8000, list(data))], codes, source)
+
+    def test_program(self):
+        code = "ORG $C000\n" \
+               "START LDX #$00\n" \
+               "LOOP  LDA TABLE,X\n" \
+               "      STA $0200,X\n" \
+               "      INX\n" \
+               "      BNE LOOP\n" \
+               "      JSR SUB\n" \
+               "      JMP (VECTOR)\n" \
+               "SUB   ASL A\n" \
+               "      RTS\n" \
+               "TABLE .BYTE $FF, $02\n" \
+               "VECTOR .WORD START"
+        codes = Assembler().assemble(code, add_entry=False)
+        data = bytes(codes[0][1])
+        instructions = disassemble(data, origin=0xC000, entries=[0xC000])
+        self.assertEqual("ORG $C000\n"
+                         "    LDX #$00\n"
+                         "    LDA $C013,X\n"
+                         "    STA $0200,X\n"
+                         "    INX\n"
+                         "    BNE $C002\n"
+                         "    JSR $C011\n"
+                         "    JMP ($C015)\n"
+                         "    ASL A\n"
+                         "    RTS\n"
+                         "    .BYTE $FF\n"
+                         "    .BYTE $02\n"
+                         "    .BYTE $00\n"
+                         "    .BYTE $C0", format_disassembly(instructions))
+        self.assertEqual(codes, Assembler().assemble(format_disassembly(instructions), add_entry=False))
+        # The linear disassembly decodes the data as instructions, the incomplete one at the end is decoded as bytes
+        self.assertEqual(['ISC $0002,X', '.BYTE $C0'], [format_instruction(inst) for inst in disassemble(data)[-2:]])
+
+    def test_data(self):
+        self.assertEqual([
+            Disassembled(0x10, '.BYTE', Addressing.LIST, 0x1A, 1),
+            Disassembled(0x11, 'NOP', Addressing.IMPLIED, None, 1),
+            Disassembled(0x12, '.BYTE', Addressing.LIST, 0xAD, 1),
+            Disassembled(0x13, '.BYTE', Addressing.LIST, 0x34, 1),
+        ], disassemble(bytes([0x1A, 0xEA, 0xAD, 0x34]), origin=0x10))
+        # The instructions overlapping the decoded ones are not decoded
+        instructions = disassemble(bytes([0xD0, 0xFF, 0x60]), entries=[0])
+        self.assertEqual(['BNE $0001', 'RTS'], [format_instruction(inst) for inst in instructions])
+        instructions = disassemble(bytes([0xAD, 0x00, 0x60]), entries=[0, 2])
+        self.assertEqual(['.BYTE $AD', '.BYTE $00', 'RTS'], [format_instruction(inst) for inst in instructions])
+        self.assertEqual(['.BYTE $EA'], [format_instruction(inst) for inst in disassemble(b'\xEA', entries=[5])])
+
+    def test_format_org(self):
+        instructions = disassemble(b'\xEA', origin=0x10) + disassemble(b'\xEA', origin=0x20)
+        self.assertEqual("ORG $0010\n    NOP\nORG $0020\n    NOP", format_disassembly(instructions))
+
+    def test_instruction_lengths(self):
+        table = decode_table()
+        data = bytes(range(256))
+        self.assertEqual([0 if entry is None else entry[2] for entry in table], list(instruction_lengths(data)))
+        self.assertEqual(1, instruction_lengths(b'\x00', brk_size=1)[0])
+
+    def test_instruction_chains(self):
+        # LDA #$01, STA $0200, RTS, JAM, NOP, NOP, JMP $8000, ISC $01AD,X and the incomplete LDA $01
+        data = bytes([0xA9, 0x01, 0x8D, 0x00, 0x02, 0x60, 0x02, 0xEA, 0xEA, 0x4C, 0x00, 0x80, 0xFF, 0xAD, 0x01])
+        for vectorized in [False, None]:
+            counts, ends = instruction_chains(data, vectorized=vectorized)
+            self.assertEqual([3, 2, 2, 1, 1, 1, 1, 3, 2, 1, 1, 1, 1, 0, 0], list(counts))
+            self.assertEqual([6, 5, 6, 5, 5, 6, 7, 12, 12, 12, 12, 13, 15, 13, 14], list(ends))
+            self.assertEqual([(0x8000, 0x8006), (0x8007, 0x800C)],
+                             code_regions(data, origin=0x8000, min_instructions=2, vectorized=vectorized))
+            self.assertEqual([], code_regions(b'', vectorized=vectorized))
+
+    def test_instruction_chains_random(self):
+        rand = random.Random(0x6502)
+        data = bytes(rand.randrange(256) for _ in range(5000))
+        expected = instruction_chains(data, vectorized=False)
+        self.assertEqual(expected, instruction_chains(data))
+        self.assertEqual(code_regions(data, min_instructions=8, vectorized=False),
+                         code_regions(data, min_instructions=8))
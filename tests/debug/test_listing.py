@@ -0,0 +1,91 @@
+from unittest import TestCase
+
+from asm_6502 import Assembler, IncrementalAssembler, ListingEntry, instruction_cycles
+
+
+class TestListing(TestCase):
+
+    CODE = "ORG $C0F0\n" \
+           "START LDX #$00\n" \
+           "LOOP LDA TABLE,X\n" \
+           "  STA $0200,X\n" \
+           "  LDA PAGE,Y\n" \
+           "  LDA ($10),Y\n" \
+           "  INX\n" \
+           "  BNE LOOP\n" \
+           "  .REPT 2\n" \
+           "  NOP\n" \
+           "  .ENDR\n" \
+           "  BRK\n" \
+           "  JMP START\n" \
+           "TABLE .BYTE 1, 2, 3, 4, 5\n" \
+           "  ORG $C200\n" \
+           "PAGE .BYTE 0"
+
+    def test_instruction_cycles(self):
+        self.assertEqual((2, 2), instruction_cycles(b'\xEA', 0))
+        self.assertEqual((4, 5), instruction_cycles(b'\xBD\x01\x02', 0))
+        self.assertEqual((4, 4), instruction_cycles(b'\xBD\x00\x02', 0))
+        self.assertEqual((5, 5), instruction_cycles(b'\x9D\x01\x02', 0))
+        self.assertEqual((5, 6), instruction_cycles(b'\xB1\x00', 0))
+        self.assertEqual((8, 8), instruction_cycles(b'\xD3\x10', 0))
+        # The branches are taken in the same page or another page
+        self.assertEqual((2, 3), instruction_cycles(b'\xD0\x10', 0xC000))
+        self.assertEqual((2, 4), instruction_cycles(b'\xD0\xFC', 0xC000))
+        # The page of the target is compared with the page of the next instruction
+        self.assertEqual((2, 3), instruction_cycles(b'\xD0\x00', 0xC0FE))
+        self.assertEqual((2, 4), instruction_cycles(b'\xD0\xFE', 0xC0FE))
+
+    def test_listing(self):
+        assembler = Assembler()
+        assembler.assemble(self.CODE)
+        listing = assembler.listing()
+        self.assertEqual(14, len(listing))
+        self.assertEqual(ListingEntry(0xC0F2, b'\xBD\x07\xC1', (4, 5), 'LOOP', 'LDA', 3, None), listing.entries[2])
+        self.assertEqual((2, 4), listing.entries[7].cycles)
+        self.assertEqual((4, 4), listing.entries[8].cycles)
+        self.assertEqual((7, 7), listing.entries[9].cycles)
+        self.assertIsNone(listing.entries[11].cycles)
+        self.assertEqual([('START', 0xC0F0, 2, 2), ('LOOP', 0xC0F2, 36, 40)], listing.blocks())
+        self.assertEqual("C0F0                          1  ORG $C0F0\n"
+                         "C0F0  A2 00            2      2  START LDX #$00\n"
+                         "C0F2  BD 07 C1       4-5      3  LOOP LDA TABLE,X\n"
+                         "C0F5  9D 00 02         5      4    STA $0200,X\n"
+                         "C0F8  B9 00 C2         4      5    LDA PAGE,Y\n"
+                         "C0FB  B1 10          5-6      6    LDA ($10),Y\n"
+                         "C0FD  E8               2      7    INX\n"
+                         "C0FE  D0 F2          2-4      8    BNE LOOP\n"
+                         "C100  EA EA            4      9    .REPT 2\n"
+                         "C102  00 00            7     12    BRK\n"
+                         "C104  4C F0 C0         3     13    JMP START\n"
+                         "C107  01 02 03 ..            14  TABLE .BYTE 1, 2, 3, 4, 5\n"
+                         "C200                         15    ORG $C200\n"
+                         "C200  00                     16  PAGE .BYTE 0\n"
+                         "\n"
+                         "Blocks:\n"
+                         "C0F0  START        2\n"
+                         "C0F2  LOOP     36-40\n", listing.format({None: self.CODE}))
+        # The source lines are not required
+        self.assertEqual("C0F0  A2 00            2      2  START LDX", listing.format().splitlines()[1])
+
+    def test_descending_org(self):
+        # The segments are emitted in the order of the source, not the order of the addresses
+        assembler = Assembler()
+        assembler.assemble("ORG $1000\n"
+                           "START LDA #1\n"
+                           "      JMP SUB\n"
+                           "ORG $0800\n"
+                           "SUB   RTS")
+        self.assertEqual([ListingEntry(0x1000, b'\xA9\x01', (2, 2), 'START', 'LDA', 2, None),
+                          ListingEntry(0x1002, b'\x4C\x00\x08', (3, 3), None, 'JMP', 3, None),
+                          ListingEntry(0x0800, b'\x60', (6, 6), 'SUB', 'RTS', 5, None)],
+                         [entry for entry in assembler.listing().entries if entry.op not in {'ORG'}])
+
+    def test_brk_size(self):
+        assembler = Assembler(brk_size=1)
+        assembler.assemble(".REPT 2\nBRK\n.ENDR", add_entry=False)
+        self.assertEqual((14, 14), assembler.listing().entries[0].cycles)
+
+    def test_incremental(self):
+        assembler = IncrementalAssembler("ORG $8000\nLOOP INX\nBNE LOOP")
+        self.assertEqual([('LOOP', 0x8000, 4, 5)], assembler.listing().blocks())
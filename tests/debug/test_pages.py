@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from asm_6502 import Assembler, AssembleError, IncrementalAssembler, PageCrossing, assemble_configs
+
+
+class TestPageCrossings(TestCase):
+
+    CODE = "ORG $C0F0\n" \
+           "START LDX #$00\n" \
+           "LOOP LDA TABLE,X\n" \
+           "  STA TABLE,X\n" \
+           "  LDA TABLE+4,Y\n" \
+           "  LDA SMALL,X\n" \
+           "  LDA BUF,X\n" \
+           "  .HOT\n" \
+           "  INX\n" \
+           "  BNE LOOP\n" \
+           "  .ENDHOT\n" \
+           "  BEQ START\n" \
+           "  RTS\n" \
+           "  ORG $C1FB\n" \
+           "SMALL .BYTE 6, 7\n" \
+           "TABLE .BYTE 1, 2, 3\n" \
+           "  .BYTE 4, 5\n" \
+           "  ORG $C2FF\n" \
+           "BUF .RES 3"
+
+    def test_page_crossings(self):
+        assembler = Assembler()
+        assembler.assemble(self.CODE)
+        self.assertEqual([
+            PageCrossing(PageCrossing.TABLE, 0xC0F2, 0xC1FD, 'TABLE', False, 3, None),
+            PageCrossing(PageCrossing.TABLE, 0xC0FE, 0xC2FF, 'BUF', False, 7, None),
+            PageCrossing(PageCrossing.BRANCH, 0xC102, 0xC0F2, None, True, 10, None),
+            PageCrossing(PageCrossing.BRANCH, 0xC104, 0xC0F0, None, False, 12, None),
+        ], assembler.page_crossings())
+        self.assertEqual(assembler.page_crossings(), IncrementalAssembler(self.CODE).page_crossings())
+
+    def test_strict_pages(self):
+        with self.assertRaises(AssembleError) as e:
+            Assembler(strict_pages=True).assemble(self.CODE)
+        self.assertEqual("AssembleError: The branch to 0xc0f2 crosses a page in a hot region at line 10",
+                         str(e.exception))
+        with self.assertRaises(AssembleError) as e:
+            assemble_configs(self.CODE, [{}, {'strict_pages': True}])
+        self.assertEqual("AssembleError: The branch to 0xc0f2 crosses a page in a hot region at line 10",
+                         str(e.exception))
+        # The segments of the later lower addresses do not hide the crossings
+        code = self.CODE + "\n  ORG $0800\n  NOP\n  ORG $0900\n  NOP"
+        assembler = Assembler()
+        assembler.assemble(code)
+        self.assertEqual(4, len(assembler.page_crossings()))
+        with self.assertRaises(AssembleError) as e:
+            Assembler(strict_pages=True).assemble(code)
+        self.assertEqual("AssembleError: The branch to 0xc0f2 crosses a page in a hot region at line 10",
+                         str(e.exception))
+        code = self.CODE.replace("  .HOT\n", "").replace("  .ENDHOT\n", "")
+        Assembler(strict_pages=True).assemble(code)
+        code = self.CODE.replace("  .HOT\n", "").replace("LOOP LDA TABLE,X", ".HOT\nLOOP LDA TABLE,X")
+        with self.assertRaises(AssembleError) as e:
+            Assembler(strict_pages=True).assemble(code)
+        self.assertEqual("AssembleError: The access to the table 'TABLE' crosses a page in a hot region at line 4",
+                         str(e.exception))
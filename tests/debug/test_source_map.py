@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import Assembler, IncrementalAssembler, SourceMap
+
+
+class TestSourceMap(TestCase):
+
+    CODE = "ORG $8000\n" \
+           "START LDA #1\n" \
+           "      ; Comment\n" \
+           "      JMP START\n" \
+           "ORG $9000\n" \
+           "      .FILL 4, 1\n" \
+           "      NOP"
+
+    def test_lookup(self):
+        assembler = Assembler()
+        assembler.assemble(self.CODE)
+        source_map = assembler.source_map()
+        self.assertEqual(4, len(source_map))
+        self.assertEqual((None, 2), source_map.line_at(0x8001))
+        self.assertEqual((None, 4), source_map.line_at(0x8004))
+        self.assertEqual((None, 6), source_map.line_at(0x9003))
+        self.assertEqual((None, 7), source_map.line_at(0x9004))
+        self.assertIsNone(source_map.line_at(0x8005))
+        self.assertIsNone(source_map.line_at(0x7FFF))
+        self.assertIsNone(source_map.line_at(0xFFFC))
+        self.assertEqual(0x8000, source_map.address_of(1))
+        self.assertEqual(0x8002, source_map.address_of(3))
+        self.assertEqual(0x9004, source_map.address_of(7))
+        self.assertIsNone(source_map.address_of(8))
+        self.assertIsNone(source_map.address_of(1, 'lib.asm'))
+
+    def test_batch(self):
+        assembler = Assembler()
+        assembler.assemble(self.CODE)
+        source_map = assembler.source_map()
+        addresses = list(range(0x7FFE, 0x8008)) + list(range(0x8FFE, 0x9008))
+        expected = [source_map.index_at(address) for address in addresses]
+        for vectorized in [False, None]:
+            self.assertEqual(expected, list(source_map.indices_at(addresses, vectorized=vectorized)))
+            self.assertEqual([-1, -1, 2, 2, 4, 4, 4, -1, -1, -1, -1, -1, 6, 6, 6, 6, 7, -1, -1, -1],
+                             list(source_map.lines_at(addresses, vectorized=vectorized)))
+        self.assertEqual([-1, -1], list(SourceMap.from_instructions([], [], []).indices_at([0, 1])))
+
+    def test_included_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'lib.asm'), 'w') as writer:
+                writer.write("SUB LDX #0\n    RTS")
+            path = os.path.join(temp_dir, 'main.asm')
+            with open(path, 'w') as writer:
+                writer.write("JSR SUB\n.INCLUDE \"lib.asm\"")
+            assembler = Assembler(include_paths=[temp_dir])
+            assembler.assemble_file(path, add_entry=False)
+        source_map = assembler.source_map()
+        lib = os.path.join(temp_dir, 'lib.asm')
+        self.assertEqual([path, lib], source_map.files)
+        self.assertEqual((path, 1), source_map.line_at(0x0002))
+        self.assertEqual((lib, 2), source_map.line_at(0x0005))
+        self.assertEqual(0x0003, source_map.address_of(1, lib))
+
+    def test_incremental(self):
+        incremental = IncrementalAssembler(self.CODE)
+        incremental.edit(1, 1, ["      NOP", "      NOP"])
+        source_map = incremental.source_map()
+        assembler = Assembler()
+        assembler.assemble(incremental.text)
+        expected = assembler.source_map()
+        self.assertEqual((None, 4), source_map.line_at(0x8002))
+        self.assertEqual(expected.to_bytes(), source_map.to_bytes())
+
+    def test_bytes(self):
+        assembler = Assembler()
+        assembler.assemble(self.CODE)
+        source_map = assembler.source_map()
+        data = source_map.to_bytes()
+        self.assertEqual(b'A65M\x01\x01\x00\x00\x00\x04\x00\x00\x00\xFF\xFF', data[:15])
+        self.assertEqual(15 + 4 * 4 * 4, len(data))
+        loaded = SourceMap.from_bytes(data)
+        self.assertEqual(data, loaded.to_bytes())
+        self.assertEqual(source_map.line_at(0x9002), loaded.line_at(0x9002))
+        self.assertEqual(source_map.address_of(4), loaded.address_of(4))
+        for data, error in [(b'A65', "Invalid source map: missing the header"),
+                            (b'A65X\x01' + bytes(8), "Invalid source map: unknown magic or format"),
+                            (data[:-1], "Invalid source map: missing the entries")]:
+            with self.assertRaises(ValueError) as e:
+                SourceMap.from_bytes(data)
+            self.assertEqual(error, str(e.exception))
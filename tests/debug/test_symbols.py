@@ -0,0 +1,65 @@
+import io
+from unittest import TestCase
+
+from asm_6502 import Assembler, IncrementalAssembler, SymbolIndex, SYMBOL_FORMATS
+
+
+class TestSymbolIndex(TestCase):
+
+    CODE = "ORG $8000\n" \
+           "START LDA #1\n" \
+           "FIRST .RES 0\n" \
+           "SECOND NOP\n" \
+           "LOOP  JMP LOOP\n" \
+           "ORG $10\n" \
+           "PTR   .RES 2"
+
+    def setUp(self):
+        assembler = Assembler()
+        assembler.assemble(self.CODE)
+        self.symbols = assembler.symbol_index()
+
+    def test_sorted(self):
+        self.assertEqual(['PTR', 'START', 'FIRST', 'SECOND', 'LOOP'], self.symbols.names)
+        self.assertEqual([0x10, 0x8000, 0x8002, 0x8002, 0x8003], list(self.symbols.addresses))
+        self.assertEqual(0, len(SymbolIndex({})))
+        self.assertIsNone(SymbolIndex({}).nearest(0x8000))
+
+    def test_nearest(self):
+        self.assertEqual(('START', 0), self.symbols.nearest(0x8000))
+        self.assertEqual(('START', 1), self.symbols.nearest(0x8001))
+        self.assertEqual(('FIRST', 0), self.symbols.nearest(0x8002))
+        self.assertEqual(('LOOP', 0x7FFC), self.symbols.nearest(0xFFFF))
+        self.assertIsNone(self.symbols.nearest(0x0F))
+        self.assertEqual('FIRST', self.symbols.symbolize(0x8002))
+        self.assertEqual('PTR+$1', self.symbols.symbolize(0x11))
+        self.assertEqual('$000F', self.symbols.symbolize(0x0F))
+
+    def test_batch(self):
+        addresses = [0, 0x0F, 0x10, 0x11, 0x7FFF, 0x8000, 0x8002, 0x8003, 0x9000]
+        expected = [self.symbols.nearest_index(address) for address in addresses]
+        self.assertEqual([-1, -1, 0, 0, 0, 1, 2, 4, 4], expected)
+        for vectorized in [False, None]:
+            self.assertEqual(expected, list(self.symbols.nearest_indices(addresses, vectorized=vectorized)))
+            self.assertEqual([self.symbols.symbolize(address) for address in addresses],
+                             self.symbols.symbolize_all(addresses, vectorized=vectorized))
+        self.assertEqual([-1], list(SymbolIndex({}).nearest_indices([0])))
+
+    def test_incremental(self):
+        incremental = IncrementalAssembler(self.CODE)
+        incremental.edit(1, 1, ["      NOP"])
+        self.assertEqual(('START', 0), incremental.symbol_index().nearest(0x8001))
+
+    def test_formats(self):
+        expected = {
+            'vice': "al C:0010 .PTR\nal C:8000 .START\nal C:8002 .FIRST\nal C:8002 .SECOND\nal C:8003 .LOOP\n",
+            'fceux': "$0010#PTR#\n$8000#START#\n$8002#FIRST#\n$8002#SECOND#\n$8003#LOOP#\n",
+            'sym': "[labels]\n00:0010 PTR\n00:8000 START\n00:8002 FIRST\n00:8002 SECOND\n00:8003 LOOP\n",
+        }
+        for name, writer in SYMBOL_FORMATS.items():
+            stream = io.BytesIO()
+            writer(self.symbols, stream)
+            self.assertEqual(expected[name], stream.getvalue().decode('ascii'))
+        stream = io.BytesIO()
+        SYMBOL_FORMATS['sym'](SymbolIndex({'BANK': 0x12ABCD}), stream)
+        self.assertEqual(b"[labels]\n12:ABCD BANK\n", stream.getvalue())
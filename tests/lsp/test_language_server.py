@@ -0,0 +1,167 @@
+import io
+from unittest import TestCase
+
+from asm_6502.lsp import read_message, write_message, LanguageServer
+
+
+class TestLanguageServer(TestCase):
+
+    URI = 'file:///main.asm'
+    CODE = "START ORG $0080\n" \
+           "LOOP  DEX\n" \
+           "      BNE LOOP\n" \
+           "      JMP START"
+
+    def setUp(self) -> None:
+        self.output = io.BytesIO()
+        self.server = LanguageServer(self.output)
+        self.server.handle({'id': 0, 'method': 'initialize', 'params': {}})
+        self.server.handle({'method': 'textDocument/didOpen', 'params': {
+            'textDocument': {'uri': self.URI, 'version': 1, 'text': self.CODE},
+        }})
+
+    def messages(self):
+        stream = io.BytesIO(self.output.getvalue())
+        self.output.seek(0)
+        self.output.truncate()
+        messages = []
+        while True:
+            message = read_message(stream)
+            if message is None:
+                return messages
+            messages.append(message)
+
+    def request(self, method, line, character):
+        self.server.handle({'id': 1, 'method': method, 'params': {
+            'textDocument': {'uri': self.URI},
+            'position': {'line': line, 'character': character},
+        }})
+        return self.messages()[-1]['result']
+
+    def change(self, start, end, text):
+        self.server.handle({'method': 'textDocument/didChange', 'params': {
+            'textDocument': {'uri': self.URI, 'version': 2},
+            'contentChanges': [{
+                'range': {'start': {'line': start[0], 'character': start[1]},
+                          'end': {'line': end[0], 'character': end[1]}},
+                'text': text,
+            }],
+        }})
+
+    def test_initialize(self):
+        capabilities = self.messages()[0]['result']['capabilities']
+        self.assertTrue(capabilities['hoverProvider'])
+        self.assertTrue(capabilities['definitionProvider'])
+
+    def test_diagnostics(self):
+        self.messages()
+        self.server.flush(force=True)
+        self.assertEqual([], self.messages()[0]['params']['diagnostics'])
+        self.change((1, 6), (1, 9), 'DEX $')
+        self.server.flush(force=True)
+        diagnostics = self.messages()[0]['params']['diagnostics']
+        self.assertEqual(1, len(diagnostics))
+        self.assertEqual(1, diagnostics[0]['range']['start']['line'])
+        self.assertEqual("Illegal character '$' found at line 2, column 11", diagnostics[0]['message'])
+        self.change((1, 9), (1, 11), '\n      JMP END')
+        self.server.flush(force=True)
+        diagnostics = self.messages()[0]['params']['diagnostics']
+        self.assertEqual(2, diagnostics[0]['range']['start']['line'])
+        self.assertEqual("Can not resolve label 'END' at line 3", diagnostics[0]['message'])
+
+    def test_debounce(self):
+        self.messages()
+        self.server.flush()
+        self.assertEqual([], self.messages())
+        self.assertGreater(self.server.timeout(), 0.0)
+        self.server.debounce = 0.0
+        self.server.flush()
+        self.assertEqual(1, len(self.messages()))
+        self.assertIsNone(self.server.timeout())
+
+    def test_definition(self):
+        result = self.request('textDocument/definition', 2, 12)
+        self.assertEqual({'start': {'line': 1, 'character': 0}, 'end': {'line': 1, 'character': 4}},
+                         result['range'])
+        self.assertIsNone(self.request('textDocument/definition', 2, 7))
+        self.change((1, 0), (1, 0), 'LOOP  NOP\n\n')
+        result = self.request('textDocument/definition', 4, 12)
+        self.assertEqual(3, result['range']['start']['line'])
+        self.change((3, 0), (4, 0), '')
+        result = self.request('textDocument/definition', 3, 12)
+        self.assertEqual(1, result['range']['start']['line'])
+
+    def test_hover(self):
+        result = self.request('textDocument/hover', 2, 12)
+        self.assertEqual('`LOOP` = `$0080`\n\n`$0081`: `D0 FD`', result['contents']['value'])
+        result = self.request('textDocument/hover', 3, 7)
+        self.assertEqual('`$0083`: `4C 80 00`', result['contents']['value'])
+        self.assertIsNone(self.request('textDocument/hover', 0, 12))
+
+    def test_unknown_method(self):
+        self.server.handle({'id': 2, 'method': 'unknown/method'})
+        self.assertEqual(-32601, self.messages()[-1]['error']['code'])
+
+    def test_serve(self):
+        stream = io.BytesIO()
+        write_message(stream, {'id': 3, 'method': 'shutdown'})
+        write_message(stream, {'method': 'exit'})
+        stream.seek(0)
+        self.server.serve(stream)
+        self.assertFalse(self.server.running)
+        self.assertIsNone(self.messages()[-1]['result'])
+
+    def test_handler_errors(self):
+        self.messages()
+        self.server.handle({'id': 4, 'method': 'textDocument/hover', 'params': {'textDocument': {'uri': self.URI}}})
+        self.assertEqual(-32603, self.messages()[-1]['error']['code'])
+        self.server.handle({'method': 'textDocument/didChange', 'params': {
+            'textDocument': {'uri': 'file:///unknown.asm'}, 'contentChanges': [],
+        }})
+        self.assertEqual('window/logMessage', self.messages()[-1]['method'])
+        self.assertEqual('`LOOP` = `$0080`\n\n`$0081`: `D0 FD`',
+                         self.request('textDocument/hover', 2, 12)['contents']['value'])
+
+    def test_serve_malformed(self):
+        stream = io.BytesIO()
+        stream.write(b'Content-Length: 2\r\n\r\n{]')
+        write_message(stream, {'id': 3, 'method': 'shutdown'})
+        write_message(stream, {'method': 'exit'})
+        stream.seek(0)
+        self.server.serve(stream)
+        messages = self.messages()
+        self.assertEqual(-32700, messages[-2]['error']['code'])
+        self.assertIsNone(messages[-1]['result'])
+
+    def test_unsupported_fallback(self):
+        self.messages()
+        self.change((3, 0), (3, 0), '      .REPT 2\n      INX\n      .ENDR\n')
+        self.server.flush(force=True)
+        self.assertEqual([], self.messages()[0]['params']['diagnostics'])
+        self.assertEqual('`START` = `$0080`', self.request('textDocument/hover', 6, 13)['contents']['value'])
+        self.change((4, 6), (4, 9), 'JMP END')
+        self.server.flush(force=True)
+        diagnostics = self.messages()[0]['params']['diagnostics']
+        self.assertEqual(1, len(diagnostics))
+        self.assertEqual(4, diagnostics[0]['range']['start']['line'])
+        self.assertEqual("Can not resolve label 'END' at line 5", diagnostics[0]['message'])
+        self.change((3, 0), (6, 0), '')
+        self.assertEqual('`$0083`: `4C 80 00`', self.request('textDocument/hover', 3, 7)['contents']['value'])
+
+    def test_conditions(self):
+        self.messages()
+        self.change((3, 0), (3, 0), '      .IF 1\n      INX\n      .ELSE\n      JMP END\n      .ENDIF\n')
+        self.server.flush(force=True)
+        self.assertEqual([], self.messages()[0]['params']['diagnostics'])
+        self.assertEqual('`START` = `$0080`', self.request('textDocument/hover', 8, 13)['contents']['value'])
+        self.assertEqual(0, self.request('textDocument/definition', 8, 13)['range']['start']['line'])
+        self.change((3, 10), (3, 11), 'PAL')
+        self.server.flush(force=True)
+        diagnostics = self.messages()[0]['params']['diagnostics']
+        self.assertEqual(1, len(diagnostics))
+        self.assertEqual(3, diagnostics[0]['range']['start']['line'])
+        self.assertEqual("Can not resolve 'PAL' in the condition at line 4", diagnostics[0]['message'])
+        self.change((3, 6), (3, 13), '.IF 0')
+        self.server.flush(force=True)
+        diagnostics = self.messages()[0]['params']['diagnostics']
+        self.assertEqual("Can not resolve label 'END' at line 7", diagnostics[0]['message'])
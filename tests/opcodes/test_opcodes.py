@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from asm_6502 import Addressing, Assembler, Opcode, OPCODES, ENCODINGS
+
+
+class TestOpcodes(TestCase):
+
+    SOURCES = {
+        Addressing.IMPLIED: ('{}', []),
+        Addressing.ACCUMULATOR: ('{} A', []),
+        Addressing.IMMEDIATE: ('{} #$12', [0x12]),
+        Addressing.ZERO_PAGE: ('{} $12', [0x12]),
+        Addressing.ZERO_PAGE_X: ('{} $12,X', [0x12]),
+        Addressing.ZERO_PAGE_Y: ('{} $12,Y', [0x12]),
+        Addressing.ABSOLUTE: ('{} $1234', [0x34, 0x12]),
+        Addressing.ABSOLUTE_X: ('{} $1234,X', [0x34, 0x12]),
+        Addressing.ABSOLUTE_Y: ('{} $1234,Y', [0x34, 0x12]),
+        Addressing.INDIRECT: ('{} ($1234)', [0x34, 0x12]),
+        Addressing.INDEXED_INDIRECT: ('{} ($12,X)', [0x12]),
+        Addressing.INDIRECT_INDEXED: ('{} ($12),Y', [0x12]),
+        Addressing.RELATIVE: ('{} $0014', [0x12]),
+    }
+
+    def test_table(self):
+        self.assertEqual(256, len(OPCODES))
+        self.assertEqual(151, sum(opcode.documented for opcode in OPCODES))
+        self.assertEqual(Opcode('LDA', Addressing.ABSOLUTE_X, 3, 4, 1, True), OPCODES[0xBD])
+        self.assertEqual(Opcode('STA', Addressing.ABSOLUTE_X, 3, 5, 0, True), OPCODES[0x9D])
+        self.assertEqual(Opcode('BNE', Addressing.RELATIVE, 2, 2, 1, True), OPCODES[0xD0])
+        self.assertEqual(Opcode('JMP', Addressing.INDIRECT, 3, 5, 0, True), OPCODES[0x6C])
+        self.assertEqual(Opcode('DCP', Addressing.INDIRECT_INDEXED, 2, 8, 0, False), OPCODES[0xD3])
+        self.assertEqual(Opcode('NOP', Addressing.IMPLIED, 1, 2, 0, False), OPCODES[0x1A])
+        self.assertEqual(Opcode('SBC', Addressing.IMMEDIATE, 2, 2, 0, False), OPCODES[0xEB])
+
+    def test_encodings(self):
+        self.assertEqual(0xEA, ENCODINGS['NOP'][Addressing.IMPLIED])
+        self.assertEqual(0x80, ENCODINGS['NOP'][Addressing.IMMEDIATE])
+        self.assertEqual(0xE9, ENCODINGS['SBC'][Addressing.IMMEDIATE])
+        self.assertEqual(0x0B, ENCODINGS['ANC'][Addressing.IMMEDIATE])
+        self.assertEqual(0x02, ENCODINGS['JAM'][Addressing.IMPLIED])
+        self.assertEqual(221, sum(len(modes) for modes in ENCODINGS.values()))
+
+    def test_encoder(self):
+        # Every opcode of the encodings is generated by the assembler with the same operand
+        for op, modes in ENCODINGS.items():
+            for mode, code in modes.items():
+                source, operand = self.SOURCES[mode]
+                if op == 'BRK':
+                    operand = [0x00]
+                codes = Assembler().assemble(source.format(op), add_entry=False)
+                self.assertEqual([(0, [code] + operand)], codes, f'{op} {mode}')
@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+from asm_6502 import write_raw, write_flat, write_image, write_ihex, write_srec
+
+
+class TestOutput(TestCase):
+
+    CODES = [(0x8000, [0xA9, 0x01, 0x4C, 0x00, 0x80]), (0x8008, [0x01, 0x02]), (0xFFFC, [0x00, 0x80])]
+
+    def test_raw(self):
+        stream = io.BytesIO()
+        write_raw(self.CODES[:2], stream, fill=0xFF)
+        self.assertEqual(bytes([0xA9, 0x01, 0x4C, 0x00, 0x80, 0xFF, 0xFF, 0xFF, 0x01, 0x02]), stream.getvalue())
+        stream = io.BytesIO()
+        write_raw([], stream)
+        self.assertEqual(b'', stream.getvalue())
+
+    def test_flat(self):
+        stream = io.BytesIO()
+        write_flat(self.CODES, stream)
+        image = stream.getvalue()
+        self.assertEqual(0x10000, len(image))
+        self.assertEqual(bytes([0xA9, 0x01, 0x4C, 0x00, 0x80, 0x00]), image[0x8000:0x8006])
+        self.assertEqual(bytes([0x00, 0x80, 0x00]), image[0xFFFC:0xFFFF])
+        with self.assertRaises(ValueError) as e:
+            write_flat(self.CODES, io.BytesIO(), size=0x8000)
+        self.assertEqual("The codes at 0x8000 of 5 bytes are out of [0x0, 0x8000)", str(e.exception))
+
+    def test_image(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'image.rom')
+            for fill in [0x00, 0xFF]:
+                stream = io.BytesIO()
+                write_flat(self.CODES, stream, fill=fill)
+                write_image(self.CODES, path, fill=fill)
+                with open(path, 'rb') as reader:
+                    self.assertEqual(stream.getvalue(), reader.read())
+            # The image is replaced and the gaps are not written
+            size = 1 << 24
+            write_image([(0x10, [1, 2]), (size - 1, [3])], path, size=size)
+            self.assertEqual(size, os.path.getsize(path))
+            with open(path, 'rb') as reader:
+                self.assertEqual(bytes([0, 1, 2, 0]), reader.read(0x13)[0x0F:])
+                reader.seek(size - 2)
+                self.assertEqual(bytes([0, 3]), reader.read())
+            if hasattr(os.stat(path), 'st_blocks'):
+                self.assertLess(os.stat(path).st_blocks * 512, size // 2)
+            write_image([], path, size=0)
+            self.assertEqual(0, os.path.getsize(path))
+            with self.assertRaises(ValueError):
+                write_image(self.CODES, path, size=0x8000)
+
+    def test_ihex(self):
+        stream = io.BytesIO()
+        write_ihex(self.CODES, stream)
+        self.assertEqual(":05800000A9014C008005\n"
+                         ":02800800010273\n"
+                         ":02FFFC00008083\n"
+                         ":00000001FF\n", stream.getvalue().decode('ascii'))
+        stream = io.BytesIO()
+        write_ihex([(0xFFF0, list(range(20)))], stream, record_size=32)
+        self.assertEqual(":10FFF000000102030405060708090A0B0C0D0E0F89\n"
+                         ":020000040001F9\n"
+                         ":0400000010111213B6\n"
+                         ":00000001FF\n", stream.getvalue().decode('ascii'))
+
+    def test_srec(self):
+        stream = io.BytesIO()
+        write_srec(self.CODES, stream, record_size=4, entry=0x8000, header=b'HDR')
+        self.assertEqual("S00600004844521B\n"
+                         "S1078000A9014C0082\n"
+                         "S104800480F7\n"
+                         "S105800801026F\n"
+                         "S105FFFC00807F\n"
+                         "S5030004F8\n"
+                         "S90380007C\n", stream.getvalue().decode('ascii'))
+        stream = io.BytesIO()
+        write_srec([(0x12345, [0xAB])], stream)
+        self.assertEqual("S0030000FC\n"
+                         "S205012345ABE6\n"
+                         "S5030001FB\n"
+                         "S804000000FB\n", stream.getvalue().decode('ascii'))
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from asm_6502 import get_parser, ParseError, IncrementalParser
+
+
+class TestIncrementalParser(TestCase):
+
+    CODE = "START ORG $0080\n" \
+           "; Comment\n" \
+           "LOOP  LDA ($40),Y\n" \
+           "      BNE LOOP\n" \
+           "\n" \
+           "      .BYTE 1,2,3"
+
+    def test_same_as_parser(self):
+        parser = IncrementalParser(self.CODE)
+        self.assertEqual(get_parser().parse(self.CODE), parser.instructions)
+        self.assertEqual({}, parser.errors)
+
+    def test_edit(self):
+        parser = IncrementalParser(self.CODE)
+        parser.edit(2, 3, "LOOP  LDA ($40,X)")
+        self.assertEqual(get_parser().parse(parser.text), parser.instructions)
+        parser.edit(0, 0, ["      NOP", ""])
+        self.assertEqual(get_parser().parse(parser.text), parser.instructions)
+        self.assertEqual(8, parser.instructions[-1].line_num)
+        parser.edit(0, 3, [])
+        self.assertEqual(get_parser().parse(parser.text), parser.instructions)
+        self.assertEqual(5, parser.instructions[-1].line_num)
+
+    def test_cache(self):
+        parser = IncrementalParser("NOP\nNOP")
+        self.assertEqual(1, len(parser.cache))
+        parser.edit(0, 1, "INX")
+        self.assertIs(parser.cache["NOP"], parser.results[1])
+        self.assertEqual(2, len(parser.cache))
+
+    def test_errors(self):
+        parser = IncrementalParser(self.CODE)
+        parser.edit(3, 4, "      BNE LOOP,")
+        parser.edit(0, 0, "LDA $@0080")
+        self.assertEqual([1, 5], list(parser.errors.keys()))
+        self.assertEqual("ParseError: Illegal character '$' found at line 1, column 5", str(parser.errors[1]))
+        self.assertEqual("ParseError: Syntax error at line 5, column 16: '\\n'", str(parser.errors[5]))
+        with self.assertRaises(ParseError) as e:
+            parser.instructions
+        self.assertEqual(parser.errors[1].info, e.exception.info)
+        parser.edit(0, 1, [])
+        self.assertEqual("ParseError: Syntax error at line 4, column 16: '\\n'", str(parser.errors[4]))
+        parser.edit(3, 4, "      BNE LOOP")
+        self.assertEqual(get_parser().parse(self.CODE), parser.instructions)
@@ -0,0 +1,85 @@
+import random
+from unittest import TestCase
+
+from asm_6502 import Assembler, diff_runs, create_ips, apply_ips, create_bps, apply_bps
+
+
+class TestPatch(TestCase):
+
+    def test_diff_runs(self):
+        old = bytes(10000)
+        new = bytearray(old)
+        new[5] = new[7] = new[9000] = 1
+        self.assertEqual([(5, 6), (7, 8), (9000, 9001)], diff_runs(old, bytes(new)))
+        self.assertEqual([(5, 8), (9000, 9001)], diff_runs(old, bytes(new), merge_gap=1))
+        self.assertEqual([(5, 6), (7, 8), (9000, 9001), (10000, 10002)], diff_runs(old, bytes(new) + b'\0\0'))
+        self.assertEqual([], diff_runs(old, old[:100]))
+
+    def test_segments(self):
+        old = Assembler().assemble("ORG $8000\nSTART LDA #1\nJMP START")
+        new = Assembler().assemble("ORG $8000\nSTART LDA #2\nJMP START")
+        self.assertEqual([(0x8001, 0x8002)], diff_runs(old, new))
+        self.assertEqual(b'PATCH\x00\x80\x01\x00\x01\x02EOF', create_ips(old, new))
+        image = bytearray(0x10000)
+        image[0x8000:0x8005] = bytes([0xA9, 0x01, 0x4C, 0x00, 0x80])
+        image[0xFFFC:0xFFFE] = bytes([0x00, 0x80])
+        self.assertEqual(create_ips(old, new), create_ips(bytes(image), new))
+        image[0x8001] = 0x02
+        self.assertEqual(image, apply_ips(old, create_ips(old, new)))
+        self.assertEqual(image, apply_bps(old, create_bps(old, new)))
+
+    def test_ips(self):
+        old = bytes(0x100)
+        new = bytearray(old)
+        new[0x10:0x30] = b'\xFF' * 0x20
+        new[0x30] = new[0x33] = 0x01
+        self.assertEqual(b'PATCH'
+                         b'\x00\x00\x10\x00\x00\x00\x20\xFF'
+                         b'\x00\x00\x30\x00\x04\x01\x00\x00\x01'
+                         b'EOF', create_ips(old, bytes(new)))
+        self.assertEqual(b'PATCHEOF\x00\x00\x80', create_ips(old, old[:0x80]))
+        self.assertEqual(old[:0x80], apply_ips(old, create_ips(old, old[:0x80])))
+        self.assertEqual(old + b'\x01', apply_ips(old, create_ips(old, old + b'\x01')))
+
+    def test_ips_eof_offset(self):
+        old = bytes(0x454F50)
+        for changed in [slice(0x454F46, 0x454F47), slice(0x454F46, 0x454F46 + 40), slice(0x454F40, 0x454F4A)]:
+            new = bytearray(old)
+            new[changed] = b'\x01' * (changed.stop - changed.start)
+            patch = create_ips(old, bytes(new))
+            self.assertNotIn(b'EOF', patch[5:-3])
+            self.assertEqual(new, apply_ips(old, patch))
+
+    def test_ips_large_records(self):
+        old = bytes(0x30000)
+        new = bytes(random.Random(0).randrange(256) for _ in range(0x30000))
+        self.assertEqual(new, apply_ips(old, create_ips(old, new)))
+        with self.assertRaises(ValueError) as e:
+            create_ips(b'', bytes(0x1000001))
+        self.assertEqual("IPS can not patch the offsets above 0xffffff", str(e.exception))
+
+    def test_bps(self):
+        old = bytes(0x100)
+        new = bytearray(old)
+        new[0x10:0x12] = b'\x01\x02'
+        patch = create_bps(old, bytes(new))
+        self.assertEqual(b'BPS1\x00\x81\x00\x81\x80\xBC\x85\x01\x02\x34\x86', patch[:-12])
+        self.assertEqual(new, apply_bps(old, patch))
+        with self.assertRaises(ValueError) as e:
+            apply_bps(old[:-1] + b'\x01', patch)
+        self.assertEqual("The checksum of the source does not match the BPS patch", str(e.exception))
+        with self.assertRaises(ValueError) as e:
+            apply_bps(old, patch[:-1] + b'\x00')
+        self.assertEqual("Invalid BPS patch: the checksum of the patch does not match", str(e.exception))
+
+    def test_random(self):
+        rand = random.Random(42)
+        for _ in range(50):
+            old = bytes(rand.randrange(4) for _ in range(rand.randrange(2000)))
+            new = bytearray(old[:rand.randrange(len(old) + 1)] + bytes(rand.randrange(100)))
+            for _ in range(rand.randrange(8)):
+                start = rand.randrange(len(new) + 1)
+                new[start:start + rand.randrange(100)] = bytes([rand.randrange(3)]) * rand.randrange(100)
+            new = bytes(new)
+            self.assertEqual(new, apply_ips(old, create_ips(old, new)))
+            self.assertEqual(new, apply_bps(old, create_bps(old, new)))